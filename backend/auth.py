@@ -8,11 +8,14 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 import os
 
-from database import get_db
+from database import SessionLocal
+from caching import TTLCache
+from password_pool import ClientLimitExceeded, PasswordPoolSaturated, password_pool
 import models
 
 # Configuration
@@ -20,9 +23,20 @@ SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret_key_change_in_production")
 ALGORITHM = "HS256"  # Hashing algorithm for JWT
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Authenticated users are cached so protected routes don't query the
+# users table on every request. Changes made through /auth/me clear the
+# entry straight away; other API processes see them within the TTL.
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))  # seconds
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+_user_cache = TTLCache(maxsize=AUTH_USER_CACHE_SIZE, ttl=AUTH_USER_CACHE_TTL)
+
+# bcrypt cost: each +1 doubles the time per hash (12 is ~250 ms)
+# Changing it is safe: older hashes are upgraded when their user logs in
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
 # Password hashing context
 # Uses bcrypt algorithm - very secure for passwords
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 # OAuth2 scheme - tells FastAPI where to find the token
 # Tokens will be in the Authorization header: "Bearer <token>"
@@ -55,6 +69,39 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+# ============= Password Functions (async) =============
+# The request handlers use these: hashing runs in the password pool
+# (password_pool.py), never on the event loop or the shared thread pool
+
+async def run_password_job(client: str, fn, *args):
+    """
+    Run a slow password function in the password pool
+
+    Raises:
+        HTTPException: 429 if this client has too many hashes in flight,
+                       503 if the pool is full
+    """
+    try:
+        return await password_pool.run(client, fn, *args)
+    except ClientLimitExceeded:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts at once, please wait",
+            headers={"Retry-After": "1"}
+        )
+    except PasswordPoolSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login is busy, please try again shortly",
+            headers={"Retry-After": "2"}
+        )
+
+
+async def hash_password_async(password: str, client: str) -> str:
+    """hash_password, run in the password pool"""
+    return await run_password_job(client, pwd_context.hash, password)
+
+
 # ============= JWT Token Functions =============
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -79,7 +126,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
+    # iat (issued at) is part of the user cache key, see get_current_user
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
 
     # Encode the JWT
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
@@ -132,16 +180,99 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[models
     return user
 
 
+async def authenticate_user_async(
+    db: Session,
+    email: str,
+    password: str,
+    client: str
+) -> Optional[models.User]:
+    """
+    authenticate_user for async routes, with rehash-on-login
+
+    The user lookup runs in the thread pool and the bcrypt check in the
+    password pool. If the stored hash uses an old cost (BCRYPT_ROUNDS
+    changed since it was made), the password is re-hashed with the
+    current settings and saved, so costs can be tuned without resetting
+    anyone's password.
+
+    Args:
+        client: Client IP, for the per-client limit of the password pool
+
+    Returns:
+        User object if credentials are valid, None otherwise
+    """
+    user = await run_in_threadpool(
+        lambda: db.query(models.User).filter(models.User.email == email).first()
+    )
+
+    if not user:
+        # Spend the same time as a wrong password, so response times
+        # don't reveal which emails are registered
+        await run_password_job(client, pwd_context.dummy_verify)
+        return None
+
+    valid, new_hash = await run_password_job(
+        client, pwd_context.verify_and_update, password, user.hashed_password
+    )
+    if not valid:
+        return None  # Wrong password
+
+    if not user.is_active:
+        return None  # Account disabled
+
+    if new_hash:
+        user.hashed_password = new_hash
+        await run_in_threadpool(db.commit)
+        await run_in_threadpool(db.refresh, user)
+
+    return user
+
+
+# ============= User Cache =============
+
+def load_user(user_id: int) -> Optional[models.User]:
+    """
+    Load a user in its own short session and detach it
+
+    The returned object keeps its column values but is not attached to
+    any session, so it can be cached and shared between requests.
+    Routes that change the user must load their own copy
+    (see routers/auth.py update_profile).
+    """
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        if user is not None:
+            db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+def invalidate_user(user_id: int) -> None:
+    """Forget every cached copy of a user (call after changing the user)"""
+    _user_cache.discard_where(lambda key: key[0] == user_id)
+
+
+def user_cache_stats() -> dict:
+    """Cache counters for the /metrics endpoint"""
+    return _user_cache.stats()
+
+
 # ============= Dependency for Protected Routes =============
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> models.User:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> models.User:
     """
     Dependency that validates JWT token and returns current user
     Use this to protect routes that require authentication
 
+    The user is cached for AUTH_USER_CACHE_TTL seconds under
+    (user_id, token iat), so most requests skip the database. On a cache
+    miss the query runs in the thread pool, not on the event loop.
+
+    The returned user is detached from any session: read it freely, but
+    load the user again before changing it.
+
     Usage:
         @app.get("/protected")
         def protected_route(current_user: User = Depends(get_current_user)):
@@ -150,7 +281,7 @@ async def get_current_user(
             return {"message": f"Hello {current_user.username}"}
 
     Raises:
-        HTTPException: 401 if token is invalid or user not found
+        HTTPException: 401 if token is invalid, or user not found or deactivated
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -168,9 +299,16 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
 
-    # Get user from database
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    # Cached user, or get user from database
+    key = (user_id, payload.get("iat"))
+    user = _user_cache.get(key)
     if user is None:
+        user = await run_in_threadpool(load_user, user_id)
+        if user is None:
+            raise credentials_exception
+        _user_cache.set(key, user)
+
+    if not user.is_active:
         raise credentials_exception
 
     return user
@@ -178,8 +316,7 @@ async def get_current_user(
 
 # Optional: Dependency for optional authentication
 async def get_current_user_optional(
-    token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    token: Optional[str] = Depends(oauth2_scheme)
 ) -> Optional[models.User]:
     """
     Like get_current_user but doesn't raise error if no token
@@ -189,6 +326,6 @@ async def get_current_user_optional(
         return None
 
     try:
-        return await get_current_user(token, db)
+        return await get_current_user(token)
     except HTTPException:
         return None
@@ -0,0 +1,92 @@
+"""
+Benchmark: Color Matching
+Times the perceptual color metrics at the largest pattern size (200x200)
+against the full DMC catalog
+
+For each metric:
+- pixels -> threads: every distinct pixel color of a 200x200 image
+  matched against all catalog threads (the worst case)
+- palette -> threads: a 64 color palette matched against all threads
+  (what map_to_thread_colors and /threads/map do)
+- quantize: quantize_to_indices with 64 colors, reassigning pixels
+  with the metric
+
+Also checks how often the shortlist search used for ciede2000 picks the
+same thread as an exhaustive search, for the image's colors and for
+colors spread evenly over the RGB cube (what thread_lut.py tables cover).
+
+Run from the backend directory:
+    python -m benchmarks.bench_color_matching
+"""
+
+import timeit
+
+import numpy as np
+
+from benchmarks.bench_grid_encoding import make_test_image
+from color_science import METRICS, nearest, srgb_to_lab
+from image_processor import load_image, quantize_to_indices
+from thread_catalog import dmc_catalog, parse_hex_colors
+
+SIZE = 200
+NUM_COLORS = 64
+REPEAT = 3
+UNIFORM_COLORS = 20000
+
+
+def main():
+    image = load_image(make_test_image(), SIZE, SIZE)
+    pixels = np.asarray(image)
+    distinct = np.unique(pixels.reshape(-1, 3), axis=0)
+    _, palette = quantize_to_indices(image, NUM_COLORS)
+    palette_rgb = parse_hex_colors(palette)
+
+    lab_ms = min(timeit.repeat(lambda: srgb_to_lab(pixels), number=1, repeat=REPEAT)) * 1000
+    print(f"{SIZE}x{SIZE} image, {len(distinct)} distinct colors, "
+          f"{len(dmc_catalog)} threads, {NUM_COLORS} color palette")
+    print(f"sRGB -> Lab for all pixels: {lab_ms:.2f} ms\n")
+
+    print(f"{'metric':>10} {'pixels->threads ms':>19} {'palette->threads ms':>20} {'quantize ms':>12}")
+    for metric in METRICS:
+        pixels_ms = min(timeit.repeat(
+            lambda: dmc_catalog.nearest(distinct, metric),
+            number=1, repeat=REPEAT,
+        )) * 1000
+        palette_ms = min(timeit.repeat(
+            lambda: dmc_catalog.nearest(palette_rgb, metric),
+            number=1, repeat=REPEAT,
+        )) * 1000
+        quantize_ms = min(timeit.repeat(
+            lambda: quantize_to_indices(image, NUM_COLORS, metric),
+            number=1, repeat=REPEAT,
+        )) * 1000
+        print(f"{metric:>10} {pixels_ms:>19.2f} {palette_ms:>20.2f} {quantize_ms:>12.2f}")
+
+    # How often the perceptual picks differ from plain RGB
+    print()
+    rgb_picks, _ = dmc_catalog.nearest(distinct, "rgb")
+    for metric in METRICS[1:]:
+        picks, _ = dmc_catalog.nearest(distinct, metric)
+        print(f"{metric}: different thread than rgb for {np.mean(picks != rgb_picks):.0%} of colors")
+
+    # The ΔE76 shortlist against comparing every thread with CIEDE2000
+    print()
+    lab = srgb_to_lab(distinct)
+    exhaustive_ms = min(timeit.repeat(
+        lambda: nearest(lab, dmc_catalog.lab, "ciede2000", candidates=0),
+        number=1, repeat=1,
+    )) * 1000
+    shortlist, _ = nearest(lab, dmc_catalog.lab, "ciede2000")
+    exact, _ = nearest(lab, dmc_catalog.lab, "ciede2000", candidates=0)
+    print(f"ciede2000: exhaustive search {exhaustive_ms:.2f} ms, "
+          f"shortlist agrees for {np.mean(shortlist == exact):.2%} of colors")
+
+    uniform = srgb_to_lab(np.random.default_rng(0).integers(0, 256, (UNIFORM_COLORS, 3)))
+    shortlist, _ = nearest(uniform, dmc_catalog.lab, "ciede2000")
+    exact, _ = nearest(uniform, dmc_catalog.lab, "ciede2000", candidates=0)
+    print(f"ciede2000: shortlist agrees for {np.mean(shortlist == exact):.2%} "
+          f"of {UNIFORM_COLORS} uniform random colors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: Dithering
+Time and error of each dither method at the largest pattern size
+(200x200, 64 colors), next to a plain Python Floyd–Steinberg loop
+
+Run from the backend directory:
+    python -m benchmarks.bench_dithering
+"""
+
+import time
+import timeit
+
+import numpy as np
+
+from benchmarks.bench_grid_encoding import make_test_image
+from dithering import DITHER_METHODS
+from image_processor import load_image, palette_to_rgb, quantize_image
+
+SIZE = 200
+NUM_COLORS = 64
+REPEAT = 5
+
+
+def python_floyd_steinberg(pixels: np.ndarray, palette_rgb: np.ndarray) -> np.ndarray:
+    """Error diffusion one pixel at a time, as a naive implementation would do it"""
+    height, width = pixels.shape[:2]
+    work = pixels.astype(np.float64)
+    palette = palette_rgb.astype(np.float64)
+    indices = np.zeros((height, width), dtype=np.uint8)
+
+    for y in range(height):
+        for x in range(width):
+            old = work[y, x]
+            index = int(np.argmin(((palette - old) ** 2).sum(axis=1)))
+            indices[y, x] = index
+            error = old - palette[index]
+            if x + 1 < width:
+                work[y, x + 1] += error * 7 / 16
+            if y + 1 < height:
+                if x > 0:
+                    work[y + 1, x - 1] += error * 3 / 16
+                work[y + 1, x] += error * 5 / 16
+                if x + 1 < width:
+                    work[y + 1, x + 1] += error * 1 / 16
+    return indices
+
+
+def main():
+    image = load_image(make_test_image(), SIZE, SIZE)
+
+    print(f"{SIZE}x{SIZE}, {NUM_COLORS} colors")
+    print(f"{'dither':>16} {'total ms':>10} {'mse':>9}")
+    for method in DITHER_METHODS:
+        seconds = min(timeit.repeat(
+            lambda: quantize_image(image, NUM_COLORS, dither=method),
+            number=1, repeat=REPEAT,
+        ))
+        result = quantize_image(image, NUM_COLORS, dither=method)
+        print(f"{method:>16} {seconds * 1000:>10.2f} {result.mse:>9.2f}")
+
+    palette_rgb = palette_to_rgb(quantize_image(image, NUM_COLORS).palette)
+    started = time.perf_counter()
+    python_floyd_steinberg(np.asarray(image), palette_rgb)
+    print(f"{'python loop fs':>16} {(time.perf_counter() - started) * 1000:>10.2f} {'':>9}"
+          f"  (dithering only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: Grid Encoding
+Compares the old per-pixel grid building loop with the vectorized
+index lookup used by process_image_for_crossstitch
+
+Run from the backend directory:
+    python -m benchmarks.bench_grid_encoding
+"""
+
+import io
+import timeit
+
+import numpy as np
+from PIL import Image
+
+from image_processor import (
+    load_image,
+    rgb_to_hex,
+    process_image_to_indices,
+    indices_to_hex_grid,
+)
+
+SIZES = [50, 100, 200]
+NUM_COLORS = 16
+REPEAT = 5
+
+
+def make_test_image(size: int = 800) -> bytes:
+    """Create a noisy gradient PNG so quantization has real work to do"""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, size)
+    gradient = np.stack(np.meshgrid(x, x[::-1]) + [np.full((size, size), 128.0)], axis=-1)
+    noise = rng.normal(0, 20, gradient.shape)
+    pixels = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def legacy_encode(image_bytes: bytes, width: int, height: int, num_colors: int):
+    """The original implementation: quantize back to RGB, then format every pixel"""
+    image = load_image(image_bytes, width, height)  # Same decode as the current path
+    quantized = image.quantize(colors=num_colors, method=2).convert('RGB')
+    img_array = np.array(quantized)
+
+    grid_data = []
+    for row in img_array:
+        grid_row = []
+        for pixel in row:
+            grid_row.append(rgb_to_hex(tuple(pixel)))
+        grid_data.append(grid_row)
+
+    unique_colors = np.unique(img_array.reshape(-1, 3), axis=0)
+    palette = [rgb_to_hex(tuple(color)) for color in unique_colors]
+    return grid_data, palette
+
+
+def vectorized_encode(image_bytes: bytes, width: int, height: int, num_colors: int):
+    """The current implementation: quantize to indices, one lookup for the grid"""
+    indices, palette = process_image_to_indices(image_bytes, width, height, num_colors)
+    return indices_to_hex_grid(indices, palette), palette
+
+
+def main():
+    image_bytes = make_test_image()
+
+    print(f"{'size':>8} {'legacy ms':>12} {'vectorized ms':>15} {'speedup':>9}")
+    for size in SIZES:
+        # Both paths must produce exactly the same pattern
+        assert legacy_encode(image_bytes, size, size, NUM_COLORS) == \
+            vectorized_encode(image_bytes, size, size, NUM_COLORS)
+
+        legacy = min(timeit.repeat(
+            lambda: legacy_encode(image_bytes, size, size, NUM_COLORS),
+            number=1, repeat=REPEAT,
+        ))
+        vectorized = min(timeit.repeat(
+            lambda: vectorized_encode(image_bytes, size, size, NUM_COLORS),
+            number=1, repeat=REPEAT,
+        ))
+        print(f"{size:>4}x{size:<3} {legacy * 1000:>12.2f} {vectorized * 1000:>15.2f} "
+              f"{legacy / vectorized:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
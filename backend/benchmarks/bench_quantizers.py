@@ -0,0 +1,33 @@
+"""
+Benchmark: Quantization Engines
+Time and quantization error (MSE) of every registered engine
+
+Run from the backend directory:
+    python -m benchmarks.bench_quantizers
+"""
+
+from benchmarks.bench_grid_encoding import make_test_image
+from image_processor import load_image, quantize_image
+from quantizers import available_quantizers
+
+SIZES = [50, 100, 200]
+COLOR_COUNTS = [16, 64]
+REPEAT = 3
+
+
+def main():
+    image_bytes = make_test_image()
+
+    print(f"{'size':>8} {'colors':>7} {'engine':>14} {'ms':>9} {'mse':>9}")
+    for size in SIZES:
+        image = load_image(image_bytes, size, size)
+        for num_colors in COLOR_COUNTS:
+            for engine in available_quantizers():
+                runs = [quantize_image(image, num_colors, quantizer=engine) for _ in range(REPEAT)]
+                best = min(run.seconds for run in runs)
+                print(f"{size:>4}x{size:<3} {num_colors:>7} {engine:>14} "
+                      f"{best * 1000:>9.2f} {runs[0].mse:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
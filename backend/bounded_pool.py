@@ -0,0 +1,181 @@
+"""
+Bounded Worker Pool
+An executor that refuses work instead of queueing it without limit
+
+Shared by the image worker pool (processes, image_workers.py) and the
+password hashing pool (threads, password_pool.py):
+
+- at most max_workers tasks run at once
+- at most queue_limit tasks are running or waiting; beyond that new work
+  is rejected straight away with PoolSaturated (routes answer 503)
+- the executor is created on first use and can be shut down and recreated
+- if a worker dies mid-task (killed for memory, a crash in a C library)
+  the broken executor is replaced, so one crash doesn't fail every later
+  call; the calls that were running get PoolBroken (also answered 503)
+- counters (completed, failed, rejected, average time) for /metrics
+
+Subclasses only say which executor to create.
+"""
+
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import BrokenExecutor, Executor
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool already has queue_limit tasks running or waiting"""
+
+
+class PoolBroken(PoolSaturated):
+    """
+    Raised when a worker died while running the task
+
+    The task is not retried (the input may be what killed the worker), but
+    the pool has started fresh workers, so later calls work again.
+    """
+
+
+class BoundedPool(ABC):
+    """
+    Executor with a limit on tasks in flight, plus usage counters
+
+    Usage:
+        class MyPool(BoundedPool):
+            def _create_executor(self):
+                return ThreadPoolExecutor(max_workers=self.max_workers)
+
+        pool = MyPool(max_workers=2, queue_limit=8)
+        result = await pool.run(some_function, arg1, arg2)
+    """
+
+    # Exception raised when full (subclasses may use a subclass of PoolSaturated)
+    saturated_error = PoolSaturated
+
+    def __init__(self, max_workers: int, queue_limit: int):
+        self.max_workers = max(1, max_workers)
+        self.queue_limit = max(self.max_workers, queue_limit)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.total_seconds = 0.0
+
+    @abstractmethod
+    def _create_executor(self) -> Executor:
+        """A new executor with max_workers workers"""
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            return self._executor
+
+    def start(self) -> None:
+        """Create the workers now instead of on first use"""
+        self._get_executor()
+
+    def shutdown(self) -> None:
+        """Stop the workers (a later run() starts new ones)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _discard_broken(self, executor: Executor) -> None:
+        # Several tasks fail together when a pool breaks; only the first
+        # one to get here replaces it (the next call creates a new one)
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False)
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self.in_flight >= self.queue_limit:
+                self.rejected += 1
+                raise self.saturated_error()
+            self.in_flight += 1
+
+    def _release(self, started: float, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.total_seconds += time.monotonic() - started
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """
+        Run fn(*args) in the pool and wait for the result
+
+        Raises:
+            PoolSaturated: if the pool is full (nothing was started)
+            PoolBroken: if a worker died while running fn
+        """
+        self._acquire()
+        started = time.monotonic()
+        ok = False
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                result = await loop.run_in_executor(executor, fn, *args)
+            except BrokenExecutor:
+                self._discard_broken(executor)
+                raise PoolBroken()
+            ok = True
+            return result
+        finally:
+            self._release(started, ok)
+
+    def submit_and_wait(self, fn: Callable, *args: Any) -> Any:
+        """
+        Blocking version of run() for code outside the event loop
+
+        Raises:
+            PoolSaturated: if the pool is full (nothing was started)
+            PoolBroken: if a worker died while running fn
+        """
+        self._acquire()
+        started = time.monotonic()
+        ok = False
+        try:
+            executor = self._get_executor()
+            try:
+                result = executor.submit(fn, *args).result()
+            except BrokenExecutor:
+                self._discard_broken(executor)
+                raise PoolBroken()
+            ok = True
+            return result
+        finally:
+            self._release(started, ok)
+
+    def stats(self) -> Dict[str, Any]:
+        """Usage counters for the /metrics endpoint"""
+        with self._lock:
+            active = min(self.in_flight, self.max_workers)
+            finished = self.completed + self.failed
+            return {
+                "max_workers": self.max_workers,
+                "queue_limit": self.queue_limit,
+                "active": active,
+                "queued": self.in_flight - active,
+                "utilization": active / self.max_workers,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+                "avg_task_ms": (self.total_seconds / finished * 1000) if finished else 0.0,
+            }
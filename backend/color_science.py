@@ -0,0 +1,340 @@
+"""
+Color Science
+Perceptual color distances (CIELAB, ΔE76 / ΔE94 / CIEDE2000), vectorized
+
+Euclidean distance in RGB doesn't match how different two colors look:
+it overstates differences between greens and understates them between
+dark blues, so "closest" thread picks can be visibly wrong. CIELAB
+is designed so that distances roughly match perceived differences, and
+the ΔE formulas refine that further:
+
+    rgb        Euclidean distance in sRGB (fast, what the frontend uses)
+    cie76      Euclidean distance in Lab
+    cie94      ΔE94 (graphic arts weights), corrects chroma and hue
+    ciede2000  CIEDE2000, the current standard (slowest, most accurate)
+
+Everything works on whole arrays at once: colors are converted to Lab in
+one batch, and nearest() compares a chunk of colors against the target
+colors in a single broadcast (see nearest() for the shortlist that keeps
+CIEDE2000 fast).
+
+Configuration (environment variables):
+    COLOR_METRIC               Default metric for thread matching (default: ciede2000)
+    COLOR_NEAREST_CANDIDATES   Shortlist size for ciede2000 searches
+                               (default: 16, 0 = compare against every target)
+"""
+
+import os
+from typing import Tuple
+
+import numpy as np
+
+METRICS = ("rgb", "cie76", "cie94", "ciede2000")
+DEFAULT_METRIC = os.getenv("COLOR_METRIC", "ciede2000")
+
+# Pairs compared per broadcast step in nearest() (bounds temporary memory)
+PAIRS_PER_CHUNK = 1 << 18
+
+# ciede2000 only compares this many ΔE76-closest targets per color
+# (an approximation, see nearest(); 0 = exact)
+NEAREST_CANDIDATES = int(os.getenv("COLOR_NEAREST_CANDIDATES", "16"))
+
+# sRGB (D65) -> XYZ
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_WHITE_D65 = np.array([0.95047, 1.0, 1.08883])
+
+
+def _linearize(channel: np.ndarray) -> np.ndarray:
+    """Undo the sRGB gamma curve (input 0-1)"""
+    return np.where(
+        channel <= 0.04045,
+        channel / 12.92,
+        ((channel + 0.055) / 1.055) ** 2.4
+    )
+
+
+# Every 8-bit channel value, already linearized
+_LINEAR_LUT = _linearize(np.arange(256) / 255.0)
+
+
+def check_metric(metric: str) -> str:
+    """Return metric if it is known, else raise ValueError"""
+    if metric not in METRICS:
+        raise ValueError(f"Unknown color metric {metric!r}. Choose from: {', '.join(METRICS)}")
+    return metric
+
+
+def srgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """
+    Convert sRGB colors to CIELAB (D65 white point)
+
+    Args:
+        rgb: Array of shape (..., 3) with 0-255 channel values
+
+    Returns:
+        float64 array of the same shape holding (L, a, b)
+
+    Example:
+        srgb_to_lab(np.array([[255, 0, 0]]))   # -> [[53.24, 80.09, 67.20]]
+    """
+    rgb = np.asarray(rgb)
+    if rgb.dtype == np.uint8:
+        linear = _LINEAR_LUT[rgb]  # Table lookup instead of pow() per pixel
+    else:
+        linear = _linearize(np.clip(rgb, 0, 255) / 255.0)
+
+    xyz = (linear @ _RGB_TO_XYZ.T) / _WHITE_D65
+
+    delta = 6 / 29
+    f = np.where(xyz > delta ** 3, np.cbrt(xyz), xyz / (3 * delta ** 2) + 4 / 29)
+
+    lab = np.empty(f.shape, dtype=np.float64)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def to_metric_space(rgb: np.ndarray, metric: str) -> np.ndarray:
+    """
+    Coordinates a metric compares: float RGB for "rgb", Lab for the rest
+    """
+    if check_metric(metric) == "rgb":
+        return np.asarray(rgb, dtype=np.float64)
+    return srgb_to_lab(np.asarray(rgb))
+
+
+# ============= Distance Formulas =============
+# All take broadcastable (..., 3) arrays and return distances of the
+# broadcast shape. For ΔE94 the first argument is the reference color.
+
+def delta_e_76(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """ΔE76: Euclidean distance in Lab (also used for "rgb" on RGB input)"""
+    diff = lab1 - lab2
+    return np.sqrt(np.sum(diff * diff, axis=-1))
+
+
+def delta_e_94(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """ΔE94 with graphic arts weights (kL=1, K1=0.045, K2=0.015)"""
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    C1 = np.hypot(a1, b1)
+    C2 = np.hypot(a2, b2)
+    dL = L1 - L2
+    dC = C1 - C2
+    da = a1 - a2
+    db = b1 - b2
+    dH_squared = np.maximum(da * da + db * db - dC * dC, 0)
+
+    SC = 1 + 0.045 * C1
+    SH = 1 + 0.015 * C1
+    return np.sqrt(dL * dL + (dC / SC) ** 2 + dH_squared / (SH * SH))
+
+
+def delta_e_2000(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """
+    CIEDE2000 (Sharma, Wu & Dalal 2005 formulation, kL = kC = kH = 1)
+    """
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    # Adjust a* so neutral colors are handled better
+    C_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    C_mean7 = C_mean ** 7
+    G = 0.5 * (1 - np.sqrt(C_mean7 / (C_mean7 + 25.0 ** 7)))
+    a1p = (1 + G) * a1
+    a2p = (1 + G) * a2
+
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+    chroma_product = C1p * C2p
+    neutral = chroma_product == 0
+
+    # Differences
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, np.where(dhp < -180, dhp + 360, dhp))
+    dhp = np.where(neutral, 0, dhp)
+    dHp = 2 * np.sqrt(chroma_product) * np.sin(np.radians(dhp / 2))
+
+    # Means
+    Lp_mean = (L1 + L2) / 2
+    Cp_mean = (C1p + C2p) / 2
+    h_sum = h1p + h2p
+    hp_mean = np.where(
+        np.abs(h1p - h2p) <= 180,
+        h_sum / 2,
+        np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2)
+    )
+    hp_mean = np.where(neutral, h_sum, hp_mean)
+
+    # Weighting functions
+    T = (1
+         - 0.17 * np.cos(np.radians(hp_mean - 30))
+         + 0.24 * np.cos(np.radians(2 * hp_mean))
+         + 0.32 * np.cos(np.radians(3 * hp_mean + 6))
+         - 0.20 * np.cos(np.radians(4 * hp_mean - 63)))
+    d_theta = 30 * np.exp(-((hp_mean - 275) / 25) ** 2)
+    Cp_mean7 = Cp_mean ** 7
+    RC = 2 * np.sqrt(Cp_mean7 / (Cp_mean7 + 25.0 ** 7))
+    L_offset = (Lp_mean - 50) ** 2
+    SL = 1 + 0.015 * L_offset / np.sqrt(20 + L_offset)
+    SC = 1 + 0.045 * Cp_mean
+    SH = 1 + 0.015 * Cp_mean * T
+    RT = -np.sin(np.radians(2 * d_theta)) * RC
+
+    L_term = dLp / SL
+    C_term = dCp / SC
+    H_term = dHp / SH
+    return np.sqrt(L_term ** 2 + C_term ** 2 + H_term ** 2 + RT * C_term * H_term)
+
+
+DISTANCE_FUNCTIONS = {
+    "rgb": delta_e_76,
+    "cie76": delta_e_76,
+    "cie94": delta_e_94,
+    "ciede2000": delta_e_2000,
+}
+
+
+def color_distance(colors1: np.ndarray, colors2: np.ndarray, metric: str) -> np.ndarray:
+    """
+    Distance between colors already in metric space (see to_metric_space)
+    """
+    return DISTANCE_FUNCTIONS[check_metric(metric)](colors1, colors2)
+
+
+def squared_euclidean(points: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    (M, N) squared Euclidean distances via |p|^2 - 2 p.t + |t|^2
+
+    One matrix multiply instead of an (M, N, 3) difference array. Exact
+    for integer RGB input (every intermediate fits a float64 exactly).
+    """
+    squared = (
+        np.einsum('ij,ij->i', points, points)[:, None]
+        - 2 * (points @ targets.T)
+        + np.einsum('ij,ij->i', targets, targets)[None, :]
+    )
+    return np.maximum(squared, 0, out=squared)
+
+
+def nearest(
+    points: np.ndarray,
+    targets: np.ndarray,
+    metric: str,
+    candidates: int = NEAREST_CANDIDATES
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the closest target for each point
+
+    "rgb" and "cie76" are plain Euclidean distances and are searched
+    with one matrix multiply per chunk. ciede2000 costs ~50x more per
+    pair, so each point is first narrowed down to its `candidates`
+    closest targets by ΔE76 (cheap), and only those are compared with
+    the full formula. With 16 candidates against the DMC catalog the
+    shortlist picks the same thread as a full search for ~99.8% of the
+    distinct colors of a photo, but only ~94% of uniformly spread RGB
+    colors (see benchmarks/bench_color_matching.py): it is an
+    approximation for per-request work. Pass candidates=0 to compare
+    against every target (thread_lut.py does, its tables are built once).
+    cie94 is always compared against every target: its chroma weighting
+    differs too much from ΔE76 for the shortlist to be reliable.
+
+    Args:
+        points: (M, 3) colors in metric space
+        targets: (N, 3) colors in metric space
+        metric: One of METRICS
+        candidates: Shortlist size for ciede2000 (0 = no shortlist)
+
+    Returns:
+        Tuple of (target_indices, distances), both length M.
+        Ties go to the first target.
+
+    Example:
+        lab = srgb_to_lab(pixels)
+        index, distance = nearest(lab, catalog_lab, "ciede2000")
+    """
+    distance_fn = DISTANCE_FUNCTIONS[check_metric(metric)]
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    targets = np.asarray(targets, dtype=np.float64).reshape(-1, 3)
+
+    euclidean = distance_fn is delta_e_76
+    shortlist = metric == "ciede2000" and 0 < candidates < len(targets)
+    width = candidates if shortlist else len(targets)
+
+    indices = np.empty(len(points), dtype=np.intp)
+    distances = np.empty(len(points), dtype=np.float64)
+    chunk = max(1, PAIRS_PER_CHUNK // max(width, 1))
+
+    for start in range(0, len(points), chunk):
+        block = points[start:start + chunk]
+        rows = np.arange(len(block))
+
+        if euclidean:
+            squared = squared_euclidean(block, targets)
+            best = squared.argmin(axis=1)
+            indices[start:start + len(block)] = best
+            distances[start:start + len(block)] = np.sqrt(squared[rows, best])
+            continue
+
+        if shortlist:
+            # Closest targets by ΔE76, kept in target order so ties still go to the first
+            squared = squared_euclidean(block, targets)
+            shortlisted = np.sort(
+                np.argpartition(squared, candidates - 1, axis=1)[:, :candidates],
+                axis=1
+            )
+        else:
+            shortlisted = np.broadcast_to(np.arange(len(targets)), (len(block), len(targets)))
+
+        pairwise = distance_fn(block[:, None, :], targets[shortlisted])
+        pick = pairwise.argmin(axis=1)
+        indices[start:start + len(block)] = shortlisted[rows, pick]
+        distances[start:start + len(block)] = pairwise[rows, pick]
+
+    return indices, distances
+
+
+# ============= Palette Assignment =============
+
+def reassign_pixels(pixels: np.ndarray, palette_rgb: np.ndarray, metric: str) -> np.ndarray:
+    """
+    Map every pixel to its closest palette color under metric
+
+    Each distinct pixel color is converted and compared once, so a
+    200x200 image costs at most 40000 comparisons per palette color
+    (usually far fewer).
+
+    Args:
+        pixels: (height, width, 3) uint8 RGB array
+        palette_rgb: (N, 3) uint8 palette
+        metric: One of METRICS
+
+    Returns:
+        (height, width) array of palette indices
+    """
+    height, width = pixels.shape[:2]
+
+    # Pack RGB into one integer per pixel so np.unique works on 1D data
+    flat = pixels.reshape(-1, 3).astype(np.uint32)
+    packed = (flat[:, 0] << 16) | (flat[:, 1] << 8) | flat[:, 2]
+    unique, inverse = np.unique(packed, return_inverse=True)
+
+    unique_rgb = np.stack([(unique >> 16) & 0xFF, (unique >> 8) & 0xFF, unique & 0xFF], axis=1)
+    closest, _ = nearest(
+        to_metric_space(unique_rgb.astype(np.uint8), metric),
+        to_metric_space(palette_rgb, metric),
+        metric
+    )
+
+    dtype = np.uint8 if len(palette_rgb) <= 256 else np.uint16
+    return closest.astype(dtype)[inverse].reshape(height, width)
@@ -0,0 +1,303 @@
+"""
+Design Data Codec
+Compact binary storage format for design grids
+
+Designs arrive from the frontend as a JSON string like:
+    {"grid": [["#FF0000", "TRANSPARENT", ...], ...], "palette": ["#FF0000", ...]}
+
+Storing that as text costs ~10 bytes per stitch before JSON overhead.
+Instead we store each distinct cell value once (the color table) and the
+grid as an array of uint8/uint16 indices into that table, zlib compressed.
+
+Binary layout (version 1):
+    magic      3 bytes   b"CSP"
+    version    uint8     1
+    flags      uint8     bit 0 = body is zlib compressed, bit 1 = uint16 indices
+    width      uint16    grid width in cells
+    height     uint16    grid height in cells
+    body:
+        header_len   uint32
+        header       JSON {"colors": [...], "fields": {...}}
+        indices      width * height uint8/uint16 values, row by row
+
+"fields" holds every key of the original JSON object except "grid"
+(usually just "palette"), so decoding gives back the same data.
+"""
+
+import json
+import os
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from image_processor import grid_to_indices, indices_to_hex_grid
+
+MAGIC = b"CSP"
+FORMAT_VERSION = 1
+
+FLAG_ZLIB = 0x01
+FLAG_UINT16 = 0x02
+
+# Fixed-size prefix: magic, version, flags, width, height
+_PREFIX = struct.Struct(">3sBBHH")
+_HEADER_LEN = struct.Struct(">I")
+
+MAX_COLORS = 65535  # uint16 indices
+ZLIB_LEVEL = 6
+
+# "compact" stores new designs in the binary format, "json" keeps plain text
+DESIGN_STORAGE_FORMAT = os.getenv("DESIGN_STORAGE_FORMAT", "compact")
+
+
+class DesignCodecError(ValueError):
+    """Raised when a stored blob cannot be decoded"""
+
+
+# ============= Grid Packing =============
+
+def pack_grid(
+    indices: np.ndarray,
+    colors: List[str],
+    fields: Optional[Dict[str, Any]] = None,
+    compress: bool = True
+) -> bytes:
+    """
+    Pack a grid of color indices into the compact binary format
+
+    Args:
+        indices: 2D array of indices into colors (height x width)
+        colors: Distinct cell values ("#RRGGBB", "TRANSPARENT", ...)
+        fields: Other keys of the design JSON (e.g. {"palette": [...]})
+        compress: zlib compress the body (default: True)
+
+    Returns:
+        Encoded bytes, ready for Design.design_blob
+    """
+    if len(colors) > MAX_COLORS:
+        raise ValueError(f"Too many distinct colors ({len(colors)} > {MAX_COLORS})")
+
+    height, width = indices.shape
+    flags = 0
+
+    if len(colors) > 256:
+        flags |= FLAG_UINT16
+        index_bytes = indices.astype(">u2").tobytes()
+    else:
+        index_bytes = indices.astype(np.uint8).tobytes()
+
+    header = json.dumps(
+        {"colors": list(colors), "fields": fields or {}},
+        separators=(",", ":")
+    ).encode("utf-8")
+    body = _HEADER_LEN.pack(len(header)) + header + index_bytes
+
+    if compress:
+        flags |= FLAG_ZLIB
+        body = zlib.compress(body, ZLIB_LEVEL)
+
+    return _PREFIX.pack(MAGIC, FORMAT_VERSION, flags, width, height) + body
+
+
+def unpack_grid(blob: bytes) -> Tuple[np.ndarray, List[str], Dict[str, Any]]:
+    """
+    Unpack the compact binary format
+
+    Returns:
+        Tuple of (indices, colors, fields)
+        - indices: 2D array (height x width) of indices into colors
+        - colors: Distinct cell values
+        - fields: Other keys of the design JSON
+    """
+    if len(blob) < _PREFIX.size:
+        raise DesignCodecError("Design blob is truncated")
+
+    magic, version, flags, width, height = _PREFIX.unpack_from(blob)
+    if magic != MAGIC:
+        raise DesignCodecError("Not a compact design blob")
+    if version != FORMAT_VERSION:
+        raise DesignCodecError(f"Unsupported design format version {version}")
+
+    body = blob[_PREFIX.size:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    (header_len,) = _HEADER_LEN.unpack_from(body)
+    header_end = _HEADER_LEN.size + header_len
+    header = json.loads(body[_HEADER_LEN.size:header_end].decode("utf-8"))
+
+    dtype = np.dtype(">u2") if flags & FLAG_UINT16 else np.dtype(np.uint8)
+    indices = np.frombuffer(body, dtype=dtype, offset=header_end, count=width * height)
+
+    return indices.reshape(height, width), header["colors"], header["fields"]
+
+
+def blob_grid_size(blob: bytes) -> Tuple[int, int]:
+    """
+    (height, width) of a compact blob's grid, read from its fixed prefix
+    without decompressing anything
+    """
+    if len(blob) < _PREFIX.size:
+        raise DesignCodecError("Design blob is truncated")
+    magic, _, _, width, height = _PREFIX.unpack_from(blob)
+    if magic != MAGIC:
+        raise DesignCodecError("Not a compact design blob")
+    return height, width
+
+
+def json_grid_size(design_data: str) -> Optional[Tuple[int, int]]:
+    """
+    (height, width) of a design JSON string's grid: the number of rows and
+    the length of the first one (what the editor shows, even for ragged
+    grids). None if there is no grid.
+    """
+    try:
+        grid = json.loads(design_data).get("grid")
+    except (TypeError, ValueError, AttributeError):
+        return None
+    if not isinstance(grid, list) or not grid or not isinstance(grid[0], list):
+        return None
+    return len(grid), len(grid[0])
+
+
+# ============= JSON <-> Binary =============
+
+def grid_from_json(design_data: str) -> Optional[Tuple[np.ndarray, List[str], Dict[str, Any]]]:
+    """
+    Parse a design JSON string into (indices, colors, fields)
+
+    Returns None when the JSON doesn't look like a design grid
+    (not an object, missing/ragged "grid", non-string cells, ...).
+    """
+    try:
+        data = json.loads(design_data)
+    except (TypeError, ValueError):
+        return None
+
+    if not isinstance(data, dict):
+        return None
+
+    grid = data.get("grid")
+    if not isinstance(grid, list) or not grid or not all(isinstance(row, list) for row in grid):
+        return None
+
+    width = len(grid[0])
+    if width == 0 or any(len(row) != width for row in grid):
+        return None  # Ragged or empty rows
+    if not all(isinstance(cell, str) for row in grid for cell in row):
+        return None
+    if len(grid) > 0xFFFF or width > 0xFFFF:
+        return None
+
+    indices, colors = grid_to_indices(grid)
+    if len(colors) > MAX_COLORS:
+        return None
+
+    fields = {key: value for key, value in data.items() if key != "grid"}
+    return indices, colors, fields
+
+
+def grid_to_json(indices: np.ndarray, colors: List[str], fields: Dict[str, Any]) -> str:
+    """
+    Build the design JSON string clients expect from (indices, colors, fields)
+    """
+    data = {"grid": indices_to_hex_grid(indices, colors)}
+    data.update(fields)
+    return json.dumps(data, separators=(",", ":"))
+
+
+def encode_design_data(design_data: str) -> Optional[bytes]:
+    """
+    Convert a design JSON string into the compact binary format
+
+    Returns None when the JSON can't be packed (see grid_from_json).
+    Callers should then keep storing the original text.
+
+    Example:
+        blob = encode_design_data('{"grid": [["#FF0000"]], "palette": ["#FF0000"]}')
+    """
+    parsed = grid_from_json(design_data)
+    if parsed is None:
+        return None
+    return pack_grid(*parsed)
+
+
+def decode_design_data(blob: bytes) -> str:
+    """
+    Convert a compact binary design back into the JSON string clients expect
+    """
+    return grid_to_json(*unpack_grid(blob))
+
+
+# ============= Cell Edits =============
+
+TRANSPARENT = "TRANSPARENT"  # Same marker the frontend uses for empty cells
+
+
+def apply_cell_edits(
+    indices: np.ndarray,
+    colors: List[str],
+    runs: List[Tuple[int, int, int, int, str]],
+    edits: List[Tuple[int, int, str]]
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    Apply cell edits to a grid without rebuilding it
+
+    Runs are applied first, then single-cell edits, each in the order given.
+    Coordinates must already be checked against the grid size.
+
+    Args:
+        indices: 2D array of indices into colors (height x width)
+        colors: Distinct cell values
+        runs: Rectangles to fill, as (x, y, width, height, color)
+        edits: Single cells to set, as (x, y, color)
+
+    Returns:
+        Tuple of (indices, colors) with unused colors dropped
+    """
+    colors = list(colors)
+    positions = {color: i for i, color in enumerate(colors)}
+
+    def color_index(color: str) -> int:
+        if color not in positions:
+            positions[color] = len(colors)
+            colors.append(color)
+        return positions[color]
+
+    run_indices = [color_index(run[4]) for run in runs]
+    edit_indices = [color_index(edit[2]) for edit in edits]
+    if len(colors) > MAX_COLORS:
+        raise ValueError(f"Too many distinct colors ({len(colors)} > {MAX_COLORS})")
+
+    # Widen to uint16 if the new colors don't fit in a byte (also makes a writable copy)
+    dtype = np.uint8 if len(colors) <= 256 else np.uint16
+    indices = indices.astype(dtype, copy=True)
+
+    for (x, y, width, height, _), index in zip(runs, run_indices):
+        indices[y:y + height, x:x + width] = index
+
+    if edits:
+        xs = np.fromiter((edit[0] for edit in edits), dtype=np.intp, count=len(edits))
+        ys = np.fromiter((edit[1] for edit in edits), dtype=np.intp, count=len(edits))
+        indices[ys, xs] = np.array(edit_indices, dtype=dtype)
+
+    # Drop colors that no cell uses any more
+    used = np.unique(indices)
+    if len(used) < len(colors):
+        lookup = np.zeros(len(colors), dtype=dtype)
+        lookup[used] = np.arange(len(used), dtype=dtype)
+        indices = lookup[indices]
+        colors = [colors[i] for i in used]
+
+    return indices, colors
+
+
+def used_palette(indices: np.ndarray, colors: List[str]) -> List[str]:
+    """
+    Colors used in the grid in first-appearance order, without TRANSPARENT
+    (matches how the Designer view builds its "palette" field)
+    """
+    used, first_seen = np.unique(indices, return_index=True)
+    ordered = used[np.argsort(first_seen)]
+    return [colors[i] for i in ordered if colors[i] != TRANSPARENT]
@@ -0,0 +1,146 @@
+"""
+Dithering
+Spread quantization error over neighbouring stitches instead of
+rounding every pixel to its nearest palette color
+
+Without dithering, smooth gradients become flat bands of color. Both
+methods here work on whole arrays (no Python loop per pixel):
+
+    ordered           Bayer matrix: each pixel is nudged by a fixed
+                      threshold from an 8x8 tiled pattern before it is
+                      matched to the palette. Pure NumPy, and stable:
+                      editing one area doesn't change the rest.
+    floyd_steinberg   Error diffusion: each pixel's rounding error is
+                      pushed onto the pixels right and below it. Done by
+                      Pillow's C implementation (always RGB distance).
+
+Both take the palette the quantizer already chose, so they work with
+every engine in quantizers.py and with DMC thread palettes.
+"""
+
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from color_science import reassign_pixels, squared_euclidean
+
+DITHER_METHODS = ("none", "ordered", "floyd_steinberg")
+
+# Size of the Bayer threshold matrix (must be a power of 2)
+BAYER_SIZE = 8
+
+
+def check_dither(method: str) -> str:
+    """Return method if it is known, else raise ValueError"""
+    if method not in DITHER_METHODS:
+        raise ValueError(f"Unknown dither method {method!r}. Choose from: {', '.join(DITHER_METHODS)}")
+    return method
+
+
+def bayer_matrix(size: int = BAYER_SIZE) -> np.ndarray:
+    """
+    Bayer threshold matrix scaled to -0.5 .. 0.5
+
+    Built by the usual recursion: M(2n) = [[4M, 4M+2], [4M+3, 4M+1]]
+    """
+    matrix = np.zeros((1, 1), dtype=np.float64)
+    while matrix.shape[0] < size:
+        matrix = np.block([
+            [4 * matrix, 4 * matrix + 2],
+            [4 * matrix + 3, 4 * matrix + 1],
+        ])
+    return (matrix + 0.5) / matrix.size - 0.5
+
+
+def palette_spacing(palette_rgb: np.ndarray) -> float:
+    """
+    Typical distance between neighbouring palette colors
+    (median distance from each color to its closest other color)
+    """
+    if len(palette_rgb) < 2:
+        return 0.0
+    colors = palette_rgb.astype(np.float64)
+    squared = squared_euclidean(colors, colors)
+    np.fill_diagonal(squared, np.inf)
+    return float(np.median(np.sqrt(squared.min(axis=1))))
+
+
+def ordered_dither(
+    pixels: np.ndarray,
+    palette_rgb: np.ndarray,
+    metric: str = "rgb",
+    spread: Optional[float] = None
+) -> np.ndarray:
+    """
+    Ordered (Bayer) dithering to a fixed palette
+
+    Args:
+        pixels: (height, width, 3) uint8 RGB array
+        palette_rgb: (N, 3) uint8 palette
+        metric: Color distance for matching (see color_science.py)
+        spread: Threshold strength in RGB units
+                (default: palette_spacing, so sparse palettes dither more)
+
+    Returns:
+        (height, width) array of palette indices
+    """
+    height, width = pixels.shape[:2]
+    if spread is None:
+        spread = palette_spacing(palette_rgb)
+
+    # Tile the threshold matrix over the image, the same offset for all channels
+    reps = (-(-height // BAYER_SIZE), -(-width // BAYER_SIZE))
+    thresholds = np.tile(bayer_matrix(), reps)[:height, :width, None]
+
+    nudged = np.clip(pixels + thresholds * spread, 0, 255).round().astype(np.uint8)
+    return reassign_pixels(nudged, palette_rgb, metric)
+
+
+def floyd_steinberg(image: Image.Image, palette_rgb: np.ndarray) -> np.ndarray:
+    """
+    Floyd–Steinberg error diffusion to a fixed palette (Pillow, in C)
+
+    Args:
+        image: RGB image
+        palette_rgb: (N, 3) uint8 palette, at most 256 colors
+
+    Returns:
+        (height, width) array of palette indices
+    """
+    if len(palette_rgb) > 256:
+        raise ValueError("Floyd-Steinberg dithering supports at most 256 colors")
+
+    # Pillow palettes have 256 slots; fill the spare ones with the first
+    # color so no pixel gets matched to an unused (black) slot
+    padded = np.concatenate([palette_rgb, np.repeat(palette_rgb[:1], 256 - len(palette_rgb), axis=0)])
+    palette_image = Image.new("P", (1, 1))
+    palette_image.putpalette(padded.astype(np.uint8).tobytes())
+
+    dithered = image.quantize(palette=palette_image, dither=Image.Dither.FLOYDSTEINBERG)
+    indices = np.asarray(dithered)
+
+    # Spare slots are copies of slot 0
+    return np.where(indices < len(palette_rgb), indices, 0).astype(np.uint8)
+
+
+def dither_to_palette(
+    image: Image.Image,
+    palette_rgb: np.ndarray,
+    method: str,
+    metric: str = "rgb"
+) -> Optional[np.ndarray]:
+    """
+    Dither an image to a fixed palette
+
+    Returns:
+        (height, width) array of palette indices, or None for method "none"
+
+    Raises:
+        ValueError: on an unknown method
+    """
+    if check_dither(method) == "ordered":
+        return ordered_dither(np.asarray(image), palette_rgb, metric)
+    if method == "floyd_steinberg":
+        return floyd_steinberg(image, palette_rgb)
+    return None
@@ -0,0 +1,402 @@
+"""
+DMC Thread Catalog
+Every DMC embroidery floss color as (code, name, hex)
+
+Same data and order as frontend/src/utils/dmcColors.js
+(source: https://github.com/seanockert/rgb-to-dmc). Keep the two in sync
+so the backend and the browser pick the same thread for a color.
+"""
+
+from typing import List, Tuple
+
+# (388 colors; the frontend list repeats a few entries, kept once here)
+DMC_THREADS: List[Tuple[str, str, str]] = [
+    ("3713", "Salmon Very Light", "#FFE2E2"),
+    ("761", "Salmon Light", "#FFC9C9"),
+    ("760", "Salmon", "#F5ADAD"),
+    ("3712", "Salmon Medium", "#F18787"),
+    ("3328", "Salmon Dark", "#E36D6D"),
+    ("347", "Salmon Very Dark", "#BF2D2D"),
+    ("353", "Peach", "#FED7CC"),
+    ("352", "Coral Light", "#FD9C97"),
+    ("351", "Coral", "#E96A67"),
+    ("350", "Coral Medium", "#E04848"),
+    ("349", "Coral Dark", "#D21035"),
+    ("817", "Coral Red Very Dark", "#BB051F"),
+    ("3708", "Melon Light", "#FFCBD5"),
+    ("3706", "Melon Medium", "#FFADBC"),
+    ("3705", "Melon Dark", "#FF7992"),
+    ("3801", "Melon Very Dark", "#E74967"),
+    ("666", "Bright Red", "#E31D42"),
+    ("321", "Red", "#C72B3B"),
+    ("304", "Red Medium", "#B71F33"),
+    ("498", "Red Dark", "#A7132B"),
+    ("816", "Garnet", "#9B1127"),
+    ("815", "Garnet Medium", "#891323"),
+    ("814", "Garnet Dark", "#7D0E1D"),
+    ("894", "Carnation Very Light", "#FFB5CC"),
+    ("893", "Carnation Light", "#FF96BA"),
+    ("892", "Carnation Medium", "#FF709F"),
+    ("891", "Carnation Dark", "#FF5382"),
+    ("957", "Geranium Pale", "#FDCACA"),
+    ("956", "Geranium", "#FD97A1"),
+    ("309", "Rose Deep", "#DC536C"),
+    ("3824", "Apricot Light", "#FECCCB"),
+    ("3341", "Apricot", "#FEA694"),
+    ("3340", "Apricot Medium", "#FE7860"),
+    ("608", "Bright Orange", "#FD5D2C"),
+    ("606", "Bright Orange Red", "#FA3C0E"),
+    ("3827", "Golden Brown Pale", "#FBB47F"),
+    ("977", "Golden Brown Light", "#DB854A"),
+    ("976", "Golden Brown Medium", "#C26934"),
+    ("3826", "Golden Brown", "#A2552B"),
+    ("975", "Golden Brown Dark", "#833E1F"),
+    ("402", "Mahogany Very Light", "#FEAE96"),
+    ("3776", "Mahogany Light", "#D37A56"),
+    ("301", "Mahogany Medium", "#B65838"),
+    ("400", "Mahogany Dark", "#8E3926"),
+    ("300", "Mahogany Very Dark", "#752C1A"),
+    ("3823", "Yellow Ultra Pale", "#FFFAE7"),
+    ("3855", "Autumn Gold Light", "#FBD0A2"),
+    ("3854", "Autumn Gold Medium", "#F2A464"),
+    ("3853", "Autumn Gold Dark", "#F18830"),
+    ("3852", "Straw Very Dark", "#CD9A3E"),
+    ("445", "Lemon Light", "#FFFC9C"),
+    ("307", "Lemon", "#FEFC41"),
+    ("973", "Canary Bright", "#FFFC00"),
+    ("444", "Lemon Dark", "#FFD900"),
+    ("3078", "Golden Yellow Very Light", "#FFF9CC"),
+    ("727", "Topaz Very Light", "#FFF7A5"),
+    ("726", "Topaz Light", "#FCDC00"),
+    ("725", "Topaz", "#FFC600"),
+    ("972", "Canary Deep", "#FF9900"),
+    ("745", "Yellow Light Pale", "#FFF6D1"),
+    ("744", "Yellow Pale", "#FEEC00"),
+    ("743", "Yellow Medium", "#FED12C"),
+    ("742", "Tangerine Light", "#FFAD00"),
+    ("741", "Tangerine Medium", "#FF8C00"),
+    ("740", "Tangerine", "#FF7C00"),
+    ("970", "Pumpkin Light", "#FF7614"),
+    ("947", "Burnt Orange", "#FF5000"),
+    ("946", "Burnt Orange Medium", "#E33100"),
+    ("900", "Burnt Orange Dark", "#D06D00"),
+    ("721", "Orange Spice Medium", "#FB7558"),
+    ("720", "Orange Spice Dark", "#E84E34"),
+    ("3825", "Pumpkin Pale", "#FDB485"),
+    ("922", "Copper Light", "#E17653"),
+    ("921", "Copper", "#C75A3A"),
+    ("920", "Copper Medium", "#B04729"),
+    ("919", "Red Copper", "#8C3721"),
+    ("918", "Red Copper Dark", "#7C301A"),
+    ("3770", "Tawny Very Light", "#FFF0D8"),
+    ("945", "Tawny", "#FBC199"),
+    ("3856", "Mahogany Ultra Very Light", "#FFC49D"),
+    ("3774", "Sportsman Flesh Very Light", "#FEDFC6"),
+    ("950", "Sportsman Flesh Light", "#EFB598"),
+    ("407", "Desert Sand Medium", "#D5A787"),
+    ("3772", "Desert Sand Very Dark", "#A67D5E"),
+    ("632", "Desert Sand Ultra Very Dark", "#8E6856"),
+    ("3047", "Yellow Beige Light", "#FFE8BC"),
+    ("3046", "Yellow Beige Medium", "#E6C491"),
+    ("3045", "Yellow Beige Dark", "#CE9E6D"),
+    ("167", "Yellow Beige Very Dark", "#AD8255"),
+    ("746", "Off White", "#FCF9F3"),
+    ("677", "Old Gold Very Light", "#F9F1CC"),
+    ("422", "Hazelnut Brown Light", "#CFA661"),
+    ("3828", "Hazelnut Brown", "#B67D50"),
+    ("420", "Hazelnut Brown Dark", "#9A6A45"),
+    ("869", "Hazelnut Brown Very Dark", "#7F5845"),
+    ("3042", "Antique Violet Light", "#DDD6CA"),
+    ("3041", "Antique Violet Medium", "#B8AA9B"),
+    ("535", "Ash Gray Very Light", "#575351"),
+    ("3782", "Mocha Brown Light", "#D4BBA9"),
+    ("3032", "Mocha Brown Medium", "#C2A383"),
+    ("3790", "Beige Gray Ultra Dark", "#98836F"),
+    ("3781", "Mocha Brown Dark", "#71634E"),
+    ("3021", "Brown Gray Very Dark", "#594D43"),
+    ("905", "Parrot Green Dark", "#589E1D"),
+    ("904", "Parrot Green Very Dark", "#458520"),
+    ("472", "Avocado Green Ultra Light", "#D8E989"),
+    ("471", "Avocado Green Very Light", "#B4C968"),
+    ("470", "Avocado Green Light", "#8BA14C"),
+    ("469", "Avocado Green", "#6F8037"),
+    ("937", "Avocado Green Medium", "#546A2E"),
+    ("936", "Avocado Green Very Dark", "#475525"),
+    ("935", "Avocado Green Dark", "#3B4625"),
+    ("934", "Black Avocado Green", "#343B21"),
+    ("523", "Fern Green Light", "#BFCBAB"),
+    ("3053", "Green Gray", "#A7B496"),
+    ("3052", "Green Gray Medium", "#908F7C"),
+    ("3051", "Green Gray Dark", "#5D6555"),
+    ("524", "Fern Green Very Light", "#D2D9C7"),
+    ("522", "Fern Green", "#999F96"),
+    ("520", "Fern Green Dark", "#4F5E49"),
+    ("3364", "Pine Green", "#84916B"),
+    ("3363", "Pine Green Medium", "#6E7B60"),
+    ("3362", "Pine Green Dark", "#5B6852"),
+    ("164", "Forest Green Light", "#C2CFC2"),
+    ("989", "Forest Green", "#73916E"),
+    ("988", "Forest Green Medium", "#5B7D5A"),
+    ("987", "Forest Green Dark", "#486D48"),
+    ("986", "Forest Green Very Dark", "#3A5D3A"),
+    ("772", "Pine Green Very Light", "#D0DCBF"),
+    ("3348", "Yellow Green Light", "#C0D68C"),
+    ("3347", "Yellow Green Medium", "#80A960"),
+    ("3346", "Hunter Green", "#59884F"),
+    ("3345", "Hunter Green Dark", "#3F6B3B"),
+    ("895", "Hunter Green Very Dark", "#26593A"),
+    ("704", "Chartreuse Bright", "#BAD557"),
+    ("703", "Chartreuse", "#9FB522"),
+    ("702", "Kelly Green", "#73A61D"),
+    ("701", "Green Light", "#5E9524"),
+    ("700", "Green Bright", "#338522"),
+    ("699", "Green", "#24762A"),
+    ("907", "Parrot Green Light", "#B9DB56"),
+    ("906", "Parrot Green Medium", "#83BF39"),
+    ("166", "Moss Green Medium Light", "#A8A540"),
+    ("165", "Moss Green Very Light", "#EAE67F"),
+    ("581", "Moss Green", "#8E8C3A"),
+    ("580", "Moss Green Dark", "#7C7D3A"),
+    ("734", "Olive Green Light", "#C7B882"),
+    ("733", "Olive Green Medium", "#C0A968"),
+    ("732", "Olive Green", "#A59057"),
+    ("731", "Olive Green Dark", "#7C7442"),
+    ("730", "Olive Green Very Dark", "#685E38"),
+    ("3013", "Khaki Green Light", "#C0C095"),
+    ("3012", "Khaki Green Medium", "#A9A074"),
+    ("3011", "Khaki Green Dark", "#8C8561"),
+    ("372", "Mustard Light", "#C8AC6E"),
+    ("371", "Mustard", "#B7975A"),
+    ("370", "Mustard Medium", "#A8874E"),
+    ("834", "Golden Olive Very Light", "#D3B983"),
+    ("833", "Golden Olive Light", "#C49F61"),
+    ("832", "Golden Olive", "#B78E51"),
+    ("831", "Golden Olive Medium", "#A3774B"),
+    ("830", "Golden Olive Dark", "#8E6B41"),
+    ("829", "Golden Olive Very Dark", "#815C38"),
+    ("613", "Drab Brown Very Light", "#DCB895"),
+    ("612", "Drab Brown Light", "#C59966"),
+    ("611", "Drab Brown", "#AD7E4E"),
+    ("610", "Drab Brown Dark", "#9B6F3D"),
+    ("842", "Beige Brown Very Light", "#D4B596"),
+    ("841", "Beige Brown Light", "#B89E87"),
+    ("840", "Beige Brown Medium", "#9C8570"),
+    ("839", "Beige Brown Dark", "#7A6956"),
+    ("838", "Beige Brown Very Dark", "#5F564C"),
+    ("3072", "Beaver Gray Very Light", "#DFE0DD"),
+    ("648", "Beaver Gray Light", "#BBBCB3"),
+    ("647", "Beaver Gray Medium", "#B0ACA2"),
+    ("646", "Beaver Gray Dark", "#87867E"),
+    ("645", "Beaver Gray Very Dark", "#6C6C69"),
+    ("844", "Beaver Gray Ultra Dark", "#58595A"),
+    ("762", "Pearl Gray Very Light", "#E8E8E8"),
+    ("415", "Pearl Gray", "#CFCFD2"),
+    ("318", "Steel Gray Light", "#B3B4B2"),
+    ("414", "Steel Gray Dark", "#9C9C9E"),
+    ("168", "Pewter Very Light", "#D2D0D1"),
+    ("169", "Pewter Light", "#A6A4A6"),
+    ("317", "Pewter Gray", "#75787B"),
+    ("413", "Pewter Gray Dark", "#5B5E61"),
+    ("3799", "Pewter Gray Very Dark", "#4D4E51"),
+    ("310", "Black", "#000000"),
+    ("3865", "Winter White", "#FCFCFC"),
+    ("blanc", "White", "#FFFFFF"),
+    ("ecru", "Ecru", "#EFEBD1"),
+    ("B5200", "Snow White", "#FFFFFF"),
+    ("3753", "Antique Blue Ultra Very Light", "#DBE4E9"),
+    ("3752", "Antique Blue Very Light", "#C1D1DB"),
+    ("932", "Antique Blue Light", "#9BBECD"),
+    ("931", "Antique Blue Medium", "#73A1B3"),
+    ("930", "Antique Blue Dark", "#5888A0"),
+    ("3750", "Antique Blue Very Dark", "#3C6D88"),
+    ("828", "Sky Blue Very Light", "#D1EEF1"),
+    ("3761", "Sky Blue Light", "#C4DDE1"),
+    ("519", "Sky Blue", "#9FBFD5"),
+    ("518", "Wedgewood Light", "#6A8BA6"),
+    ("3760", "Wedgewood Medium", "#516F8A"),
+    ("517", "Wedgewood Dark", "#3E5C6E"),
+    ("3842", "Wedgewood Very Dark", "#2D4959"),
+    ("813", "Blue Light", "#B0CDE3"),
+    ("826", "Blue Medium", "#70A8CC"),
+    ("825", "Blue Dark", "#4689BA"),
+    ("824", "Blue Very Dark", "#356C9E"),
+    ("996", "Electric Blue Medium", "#36C9DD"),
+    ("3843", "Electric Blue", "#1699C0"),
+    ("995", "Electric Blue Dark", "#007EA1"),
+    ("3846", "Turquoise Bright Light", "#06C6C7"),
+    ("3845", "Turquoise Bright Medium", "#00A8A8"),
+    ("3844", "Turquoise Bright Dark", "#007F94"),
+    ("3809", "Turquoise Very Dark", "#00677B"),
+    ("747", "Sky Blue Very Light", "#DFF5F6"),
+    ("3766", "Peacock Blue Light", "#9BCEDD"),
+    ("807", "Peacock Blue", "#6BA5B9"),
+    ("806", "Peacock Blue Dark", "#2F8FA1"),
+    ("3765", "Peacock Blue Very Dark", "#197485"),
+    ("3811", "Turquoise Very Light", "#C9ECEB"),
+    ("598", "Turquoise Light", "#94D7D6"),
+    ("597", "Turquoise", "#52C0BE"),
+    ("3810", "Turquoise Dark", "#4CAAA9"),
+    ("3808", "Turquoise Ultra Very Dark", "#40888C"),
+    ("928", "Slate Green Very Light", "#D8E1DD"),
+    ("927", "Slate Green Light", "#B4C7C1"),
+    ("926", "Slate Green Medium", "#86A39F"),
+    ("3768", "Slate Green Dark", "#5E8786"),
+    ("3817", "Celadon Green Light", "#9FC4BF"),
+    ("3816", "Celadon Green", "#6F9E97"),
+    ("3815", "Celadon Green Dark", "#4E7874"),
+    ("3814", "Aquamarine", "#367671"),
+    ("502", "Blue Green", "#5A8985"),
+    ("501", "Blue Green Dark", "#3D6D6A"),
+    ("500", "Blue Green Very Dark", "#0F4F4B"),
+    ("3849", "Teal Green Light", "#59B093"),
+    ("3848", "Teal Green Medium", "#3A9E8A"),
+    ("3847", "Teal Green Dark", "#248870"),
+    ("3812", "Seagreen Very Dark", "#168666"),
+    ("943", "Aquamarine Medium", "#33A684"),
+    ("3813", "Blue Green Light", "#B6D5CA"),
+    ("964", "Seagreen Light", "#A6DAD0"),
+    ("959", "Seagreen Medium", "#74BFB3"),
+    ("958", "Seagreen Dark", "#41A798"),
+    ("3818", "Emerald Green Ultra Very Dark", "#116B5A"),
+    ("563", "Jade Light", "#B6DDCE"),
+    ("562", "Jade Medium", "#5FA97F"),
+    ("505", "Jade Green", "#31826A"),
+    ("504", "Blue Green Very Light", "#B5DDD2"),
+    ("503", "Blue Green Medium", "#90BEB0"),
+    ("561", "Jade Very Dark", "#2F6955"),
+    ("3850", "Bright Green Dark", "#208A73"),
+    ("993", "Aquamarine Very Light", "#C9E1DB"),
+    ("992", "Aquamarine Light", "#8FC3BB"),
+    ("991", "Aquamarine Dark", "#307764"),
+    ("966", "Jade Very Light", "#B2D5BE"),
+    ("564", "Jade Very Light", "#CEE5D8"),
+    ("913", "Nile Green Medium", "#6FB48E"),
+    ("912", "Emerald Green Light", "#198B5D"),
+    ("911", "Emerald Green Medium", "#187455"),
+    ("910", "Emerald Green Dark", "#115E42"),
+    ("909", "Emerald Green Very Dark", "#1F5741"),
+    ("3851", "Green Bright Light", "#63B58B"),
+    ("3819", "Moss Green Light", "#DDD74E"),
+    ("3820", "Straw Dark", "#CFA939"),
+    ("3371", "Black Brown", "#231F20"),
+    ("433", "Brown Medium", "#925632"),
+    ("801", "Coffee Brown Dark", "#653D2C"),
+    ("898", "Coffee Brown Very Dark", "#4B2F2A"),
+    ("938", "Coffee Brown Ultra Dark", "#35251F"),
+    ("3031", "Mocha Brown Very Dark", "#483828"),
+    ("779", "Cocoa Dark", "#5C3D2E"),
+    ("712", "Cream", "#FFFEF0"),
+    ("739", "Tan Ultra Very Light", "#FFF3D7"),
+    ("738", "Tan Very Light", "#FCE1BA"),
+    ("437", "Tan Light", "#E9B67D"),
+    ("436", "Tan", "#CB8E53"),
+    ("435", "Brown Very Light", "#A66A38"),
+    ("434", "Brown Light", "#945528"),
+    ("543", "Beige Brown Ultra Very Light", "#F4E7D3"),
+    ("3864", "Mocha Beige Light", "#CAB5A5"),
+    ("3863", "Mocha Beige Medium", "#A6917B"),
+    ("3862", "Mocha Beige Dark", "#887362"),
+    ("3861", "Cocoa Light", "#A37E66"),
+    ("3860", "Cocoa", "#826653"),
+    ("3859", "Rosewood Light", "#AF8874"),
+    ("3858", "Rosewood Medium", "#976D5C"),
+    ("3857", "Rosewood Dark", "#70463D"),
+    ("3778", "Terra Cotta Light", "#DB9D86"),
+    ("356", "Terra Cotta Medium", "#C67866"),
+    ("3830", "Terra Cotta", "#B25C48"),
+    ("355", "Terra Cotta Dark", "#98463A"),
+    ("3777", "Terra Cotta Very Dark", "#84392D"),
+    ("758", "Terra Cotta Very Light", "#F3D1C3"),
+    ("3779", "Terra Cotta Ultra Very Light", "#FAE4DD"),
+    ("951", "Tawny Light", "#FFD7B0"),
+    ("3834", "Grape Dark", "#69375E"),
+    ("3835", "Grape Medium", "#904979"),
+    ("3836", "Grape Light", "#B57593"),
+    ("3837", "Lavender Ultra Dark", "#563C56"),
+    ("3838", "Lavender Blue Dark", "#587CA0"),
+    ("3839", "Lavender Blue Medium", "#7898BA"),
+    ("3840", "Lavender Blue Light", "#A8BDD5"),
+    ("3841", "Pale Baby Blue", "#C9DCEA"),
+    ("800", "Delft Blue Pale", "#CBD3E3"),
+    ("809", "Delft Blue", "#95ABCA"),
+    ("799", "Delft Blue Medium", "#7595BB"),
+    ("798", "Delft Blue Dark", "#526F9B"),
+    ("797", "Royal Blue", "#1C3D73"),
+    ("796", "Royal Blue Dark", "#17305C"),
+    ("820", "Royal Blue Very Dark", "#1A244A"),
+    ("162", "Blue Ultra Very Light", "#C9D3E5"),
+    ("827", "Blue Very Light", "#BBCEE1"),
+    ("3325", "Baby Blue Light", "#C5DBE9"),
+    ("3755", "Baby Blue", "#99C2DC"),
+    ("334", "Baby Blue Medium", "#6C9AC5"),
+    ("322", "Baby Blue Dark", "#5684AC"),
+    ("312", "Baby Blue Very Dark", "#2F5373"),
+    ("803", "Baby Blue Ultra Very Dark", "#2A3F5F"),
+    ("336", "Navy Blue", "#1F3A5F"),
+    ("823", "Navy Blue Dark", "#17274A"),
+    ("939", "Navy Blue Very Dark", "#0F203C"),
+    ("157", "Cornflower Blue Very Light", "#B2C4DB"),
+    ("156", "Cornflower Blue Medium Light", "#8FAFD6"),
+    ("3756", "Baby Blue Ultra Very Light", "#E2F1FC"),
+    ("775", "Baby Blue Very Light", "#D7E8F0"),
+    ("794", "Cornflower Blue Light", "#8FB4D3"),
+    ("793", "Cornflower Blue Medium", "#7799BC"),
+    ("792", "Cornflower Blue Dark", "#5C7FA1"),
+    ("158", "Cornflower Blue Medium Very Dark", "#3C5F79"),
+    ("791", "Cornflower Blue Very Dark", "#384E66"),
+    ("3807", "Cornflower Blue", "#567490"),
+    ("3806", "Cyclamen Pink Light", "#FFAECA"),
+    ("3805", "Cyclamen Pink", "#EC5796"),
+    ("3804", "Cyclamen Pink Dark", "#DF2A74"),
+    ("776", "Pink Medium", "#FFA5BF"),
+    ("899", "Rose Medium", "#F56D93"),
+    ("335", "Rose", "#EE3773"),
+    ("326", "Rose Very Dark", "#C6254B"),
+    ("151", "Dusty Rose Very Light", "#FAD8DB"),
+    ("3354", "Dusty Rose Light", "#FBBFC8"),
+    ("3733", "Dusty Rose", "#F69EB1"),
+    ("3731", "Dusty Rose Very Dark", "#C24867"),
+    ("3350", "Dusty Rose Ultra Dark", "#C13959"),
+    ("150", "Dusty Rose Ultra Very Dark", "#A81945"),
+    ("3689", "Mauve Light", "#FAC9CF"),
+    ("3688", "Mauve Medium", "#E8A1AC"),
+    ("3687", "Mauve", "#D97185"),
+    ("3803", "Mauve Dark", "#AA395B"),
+    ("3685", "Mauve Very Dark", "#8B1A47"),
+    ("605", "Cranberry Very Light", "#FFB4C4"),
+    ("604", "Cranberry Light", "#FF9EB8"),
+    ("603", "Cranberry", "#FF6D9E"),
+    ("602", "Cranberry Medium", "#E14978"),
+    ("601", "Cranberry Dark", "#CF2456"),
+    ("600", "Cranberry Very Dark", "#CF084B"),
+    ("3609", "Plum Ultra Light", "#F6A9CE"),
+    ("3608", "Plum Very Light", "#EF72AB"),
+    ("3607", "Plum Light", "#D4428A"),
+    ("718", "Plum", "#C91F6C"),
+    ("917", "Plum Medium", "#AC135A"),
+    ("915", "Plum Dark", "#9C1450"),
+    ("3802", "Antique Mauve Very Dark", "#75234B"),
+    ("3743", "Antique Violet Very Light", "#DDDAE1"),
+    ("3740", "Antique Violet Dark", "#9F8496"),
+    ("316", "Antique Mauve Medium", "#CF709F"),
+    ("3726", "Antique Mauve Dark", "#AB517A"),
+    ("315", "Antique Mauve Very Dark", "#824A67"),
+    ("902", "Garnet Very Dark", "#83193E"),
+    ("3727", "Antique Mauve Light", "#FFADCA"),
+    ("3721", "Shell Pink Dark", "#A03656"),
+    ("221", "Shell Pink Very Dark", "#853555"),
+    ("778", "Antique Mauve Very Light", "#E1B4C5"),
+    ("554", "Violet Light", "#E0C4DB"),
+    ("553", "Violet", "#A878AC"),
+    ("552", "Violet Medium", "#7A3E7D"),
+    ("550", "Violet Very Dark", "#522D5B"),
+    ("3747", "Blue Violet Very Light", "#CDD7EA"),
+    ("341", "Blue Violet Light", "#9FB7D7"),
+    ("340", "Blue Violet Medium", "#AA9ACA"),
+    ("155", "Blue Violet Medium Dark", "#8A75B0"),
+    ("333", "Blue Violet Very Dark", "#6F5A8E"),
+    ("208", "Lavender Very Dark", "#893B67"),
+    ("211", "Lavender Light", "#E4CFDE"),
+    ("210", "Lavender Medium", "#D4A9D2"),
+    ("209", "Lavender Dark", "#AD76AD"),
+]
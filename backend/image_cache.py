@@ -0,0 +1,234 @@
+"""
+Processed Image Cache
+Remembers the result of processing an upload, keyed by its content
+
+People often upload the same photo several times while trying different
+settings. The cache key is the SHA-256 of the uploaded bytes plus every
+processing parameter, so an identical request is answered from cache
+without decoding the image at all.
+
+Two tiers:
+- Memory: LRU of the most recent IMAGE_CACHE_ENTRIES results (per process)
+- Disk (optional): .npz files under IMAGE_CACHE_DIR, shared by all
+  processes and kept across restarts, capped at IMAGE_CACHE_DISK_MB
+
+Configuration (environment variables):
+    IMAGE_CACHE_ENTRIES   Results kept in memory (default: 256, 0 disables)
+    IMAGE_CACHE_DIR       Directory for the disk tier (default: unset = no disk tier)
+    IMAGE_CACHE_DISK_MB   Disk tier size limit in megabytes (default: 512)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from caching import TTLCache
+from quantizers import DEFAULT_QUANTIZER
+
+logger = logging.getLogger(__name__)
+
+IMAGE_CACHE_ENTRIES = int(os.getenv("IMAGE_CACHE_ENTRIES", "256"))
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR") or None
+IMAGE_CACHE_DISK_MB = int(os.getenv("IMAGE_CACHE_DISK_MB", "512"))
+
+# Check the disk tier's size every this many writes
+_PRUNE_EVERY = 32
+
+# (indices, palette, preview_png_bytes)
+CachedResult = Tuple[np.ndarray, List[str], bytes]
+
+
+def file_digest(path: str, chunk_size: int = 64 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in chunks"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def cache_key(
+    digest: str,
+    target_width: int,
+    target_height: int,
+    num_colors: int,
+    method: str = DEFAULT_QUANTIZER,
+    **options: Any
+) -> str:
+    """
+    Build the cache key for processing an upload with given parameters
+
+    Args:
+        digest: SHA-256 hex digest of the upload (file_digest, or the
+            digest upload_ingest computes while streaming it to disk)
+        target_width, target_height, num_colors: Pattern parameters
+        method: Quantization method name
+        options: Anything else that changes the output (preview size, ...)
+
+    Returns:
+        Hex string, safe to use as a file name
+    """
+    params = dict(options, w=target_width, h=target_height, n=num_colors, m=method)
+    raw = digest + json.dumps(params, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ProcessedImageCache:
+    """
+    Two-tier (memory LRU + optional disk) cache of processed uploads
+
+    Usage:
+        key = cache_key(file_digest(path), 50, 50, 16, cell=10)
+        cached = image_cache.get(key)
+        if cached is None:
+            cached = process(...)
+            image_cache.put(key, cached)
+        indices, palette, preview_bytes = cached
+    """
+
+    def __init__(self, max_entries: int, directory: Optional[str], disk_limit_mb: int):
+        self.memory = TTLCache(maxsize=max(max_entries, 1), ttl=None)
+        self.memory_enabled = max_entries > 0
+        self.directory = directory
+        self.disk_limit_bytes = disk_limit_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+    def _path(self, key: str) -> str:
+        # Two-character subdirectories keep each directory small
+        return os.path.join(self.directory, key[:2], f"{key}.npz")
+
+    def _count(self, counter: str) -> None:
+        # Routes and import workers use the cache from several threads at once
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Return the cached result, or None"""
+        if self.memory_enabled:
+            cached = self.memory.get(key)
+            if cached is not None:
+                self._count("memory_hits")
+                return cached
+
+        if self.directory:
+            cached = self._read_disk(key)
+            if cached is not None:
+                self._count("disk_hits")
+                if self.memory_enabled:
+                    self.memory.set(key, cached)
+                return cached
+
+        self._count("misses")
+        return None
+
+    def put(self, key: str, result: CachedResult) -> None:
+        """Store a result in memory and, if configured, on disk"""
+        if self.memory_enabled:
+            self.memory.set(key, result)
+        if self.directory:
+            self._write_disk(key, result)
+
+    def _read_disk(self, key: str) -> Optional[CachedResult]:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                result = (data["indices"], data["palette"].tolist(), data["preview"].tobytes())
+            os.utime(path)  # Mark as recently used for pruning
+            return result
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Dropping unreadable image cache file %s", path)
+            self._remove(path)
+            return None
+
+    def _write_disk(self, key: str, result: CachedResult) -> None:
+        indices, palette, preview_bytes = result
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file then rename, so readers never see half a file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    indices=indices,
+                    palette=np.array(palette, dtype=str),
+                    preview=np.frombuffer(preview_bytes, dtype=np.uint8),
+                )
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning("Could not write image cache file %s", path, exc_info=True)
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % _PRUNE_EVERY == 0
+        if prune:
+            self.prune_disk()
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def prune_disk(self) -> None:
+        """Delete least recently used disk entries until under the size limit"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".npz"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        entries.sort()  # Oldest first
+        for _, size, path in entries:
+            if total <= self.disk_limit_bytes:
+                break
+            self._remove(path)
+            total -= size
+            self._count("disk_evictions")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the /metrics endpoint"""
+        with self._lock:
+            memory_hits, disk_hits, misses = self.memory_hits, self.disk_hits, self.misses
+            disk_evictions = self.disk_evictions
+        lookups = memory_hits + disk_hits + misses
+        return {
+            "memory_entries": len(self.memory) if self.memory_enabled else 0,
+            "memory_hits": memory_hits,
+            "disk_hits": disk_hits,
+            "misses": misses,
+            "hit_rate": (memory_hits + disk_hits) / lookups if lookups else 0.0,
+            "memory_evictions": self.memory.evictions,
+            "disk_evictions": disk_evictions,
+            "disk_enabled": bool(self.directory),
+        }
+
+
+# Shared cache used by the image routes and import jobs
+image_cache = ProcessedImageCache(IMAGE_CACHE_ENTRIES, IMAGE_CACHE_DIR, IMAGE_CACHE_DISK_MB)
@@ -5,8 +5,18 @@ Handles image upload, pixelation, and color quantization for cross-stitch patter
 
 from PIL import Image
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple, Union
 import io
+import time
+
+from color_science import DEFAULT_METRIC, check_metric, nearest, reassign_pixels
+from thread_catalog import get_catalog
+from thread_lut import get_thread_lut
+from dithering import check_dither, dither_to_palette
+from quantizers import DEFAULT_QUANTIZER, QuantizeResult, get_quantizer, quantization_error
+
+# "adaptive" picks the best num_colors for the image, "dmc" picks DMC threads
+PALETTE_MODES = ("adaptive", "dmc")
 
 
 def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
@@ -20,11 +30,307 @@ def rgb_to_hex(rgb: Tuple[int, int, int]) -> str:
     return '#{:02x}{:02x}{:02x}'.format(int(rgb[0]), int(rgb[1]), int(rgb[2]))
 
 
+def compact_palette(indices: np.ndarray, palette_rgb: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+    """
+    Drop unused palette entries and sort the rest by RGB value
+
+    Quantizers may return palette slots that no pixel uses (or the same
+    color twice). This remaps the index grid so it only points at the
+    colors that actually appear, in the same order np.unique would give.
+
+    Args:
+        indices: 2D array of palette indices (height x width)
+        palette_rgb: Array of RGB palette entries, shape (N, 3)
+
+    Returns:
+        Tuple of (indices, palette)
+        - indices: 2D uint8/uint16 array indexing into palette
+        - palette: List of unique hex colors, sorted by RGB
+    """
+    used = np.unique(indices)
+    colors, remap = np.unique(palette_rgb[used], axis=0, return_inverse=True)
+
+    # Lookup table: old palette slot -> new palette position
+    dtype = np.uint8 if len(colors) <= 256 else np.uint16
+    lookup = np.zeros(len(palette_rgb), dtype=dtype)
+    lookup[used] = remap.reshape(-1)
+
+    palette = [rgb_to_hex(tuple(color)) for color in colors]
+    return lookup[indices], palette
+
+
+def indices_to_hex_grid(indices: np.ndarray, palette: List[str]) -> List[List[str]]:
+    """
+    Build the 2D hex color grid from palette indices in one step
+
+    Example:
+        indices_to_hex_grid(np.array([[0, 1]]), ["#000000", "#ffffff"])
+        # Returns: [["#000000", "#ffffff"]]
+    """
+    lookup = np.array(palette, dtype=object)
+    return lookup[indices].tolist()
+
+
+# Modes Image.reduce() can box-average directly
+REDUCIBLE_MODES = {'RGB', 'RGBA', 'L', 'LA'}
+
+
+def open_image(image_source: Union[bytes, str]) -> Image.Image:
+    """
+    Open an image from raw bytes or a file path (only reads the header)
+    """
+    if isinstance(image_source, (bytes, bytearray)):
+        return Image.open(io.BytesIO(image_source))
+    return Image.open(image_source)
+
+
+def load_image(image_source: Union[bytes, str], target_width: int, target_height: int) -> Image.Image:
+    """
+    Decode an image and pixelate it to the target size
+
+    image_source is either the raw file bytes or a path to the file.
+    Passing a path lets Pillow read the file as it decodes, instead of
+    needing the whole upload in memory first.
+
+    Same steps as /images/batch (decode_image, then pixelate), so uploads,
+    batches and import jobs always produce the same pixels.
+
+    Returns:
+        RGB image of size (target_width, target_height)
+    """
+    return pixelate(decode_image(image_source, target_width, target_height), target_width, target_height)
+
+
+def decode_image(image_source: Union[bytes, str], min_width: int, min_height: int) -> Image.Image:
+    """
+    Decode an image to RGB, shrunk early but kept at least min_width x min_height
+
+    Work is done at (close to) the pattern size as early as possible, so
+    time and memory depend on the pattern size rather than the photo size:
+    1. JPEGs are decoded at 1/2, 1/4 or 1/8 scale straight from the DCT data
+    2. Other large images are box-reduced by a whole factor before anything else
+    3. Alpha is composited onto white only after that
+
+    The result can be pixelated to any size up to the minimum (see
+    pixelate), so several pattern sizes can share one decode.
+    """
+
+    # Open image (this only reads the header)
+    image = open_image(image_source)
+
+    # JPEG: ask the decoder for a smaller image (never smaller than the minimum)
+    # Other formats ignore this
+    image.draft(None, (min_width, min_height))
+
+    # Shrink by a whole factor while still at least the minimum size
+    factor = min(image.width // min_width, image.height // min_height)
+    if factor >= 2 and image.mode in REDUCIBLE_MODES:
+        image = image.reduce(factor)
+
+    # Convert to RGB (remove alpha channel if present)
+    if image.mode == 'P':
+        image = image.convert('RGBA')  # Palette images may have a transparent color
+    if image.mode in ('RGBA', 'LA'):
+        # Composite onto a white background
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        return background
+
+    return image.convert('RGB')
+
+
+def pixelate(image: Image.Image, target_width: int, target_height: int) -> Image.Image:
+    """
+    Shrink a decoded RGB image to the pattern size (blocky, no smoothing)
+    """
+    factor = min(image.width // target_width, image.height // target_height)
+    if factor >= 2:
+        image = image.reduce(factor)
+    return image.resize((target_width, target_height), Image.Resampling.NEAREST)
+
+
+def quantize_to_indices(
+    image: Image.Image,
+    num_colors: int = 16,
+    metric: str = "rgb",
+    quantizer: str = DEFAULT_QUANTIZER
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    Reduce an RGB image to num_colors and return palette indices
+
+    quantizer picks the engine (see quantizers.py; default: Pillow's fast
+    octree). With a perceptual metric ("cie76", "cie94", "ciede2000", see
+    color_science.py) every pixel is then reassigned to the palette color
+    that looks closest, instead of the one the quantizer picked in RGB.
+
+    Returns:
+        Tuple of (indices, palette)
+        - indices: 2D uint8 array (height x width)
+        - palette: List of unique hex colors, sorted by RGB
+
+    Raises:
+        ValueError: on an unknown quantizer or metric
+    """
+
+    # Reduce colors using quantization
+    # This groups similar colors together into an adaptive palette
+    indices, palette_rgb = get_quantizer(quantizer)(image, num_colors)
+
+    if check_metric(metric) != "rgb":
+        indices = reassign_pixels(np.asarray(image), palette_rgb[:indices.max() + 1], metric)
+
+    return compact_palette(indices, palette_rgb)
+
+
+def quantize_image(
+    image: Image.Image,
+    num_colors: int = 16,
+    metric: Optional[str] = None,
+    quantizer: str = DEFAULT_QUANTIZER,
+    palette_mode: str = "adaptive",
+    thread_codes: Optional[List[str]] = None,
+    dither: str = "none"
+) -> QuantizeResult:
+    """
+    Quantize with any palette mode / engine and measure the run
+
+    With dither ("ordered" or "floyd_steinberg", see dithering.py) the
+    palette is still chosen as usual, then pixels are dithered onto it.
+
+    Returns:
+        QuantizeResult with indices, palette, the engine used
+        ("dmc_lut" for palette_mode="dmc", "+<dither>" when dithered),
+        time taken and error (MSE)
+
+    Raises:
+        ValueError: on an unknown palette mode, metric, quantizer,
+                    thread code or dither method
+    """
+    metric = resolve_metric(palette_mode, metric)
+    check_dither(dither)
+    started = time.perf_counter()
+
+    if palette_mode == "dmc":
+        indices, palette = quantize_to_threads(image, num_colors, thread_codes, metric)
+        engine = "dmc_lut"
+    else:
+        indices, palette = quantize_to_indices(image, num_colors, metric, quantizer)
+        engine = quantizer
+
+    if dither != "none" and len(palette) > 1:
+        palette_rgb = palette_to_rgb(palette)
+        indices, palette = compact_palette(dither_to_palette(image, palette_rgb, dither, metric), palette_rgb)
+        engine = f"{engine}+{dither}"
+
+    seconds = time.perf_counter() - started
+    mse = quantization_error(np.asarray(image), indices, palette_to_rgb(palette))
+    return QuantizeResult(indices, palette, engine, seconds, mse)
+
+
+def quantize_to_threads(
+    image: Image.Image,
+    num_colors: int = 16,
+    thread_codes: Optional[List[str]] = None,
+    metric: str = DEFAULT_METRIC
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    Reduce an RGB image straight to DMC thread colors in a single pass
+
+    Instead of quantizing to an adaptive palette and then mapping that
+    palette to threads (two lossy steps), every pixel is looked up in a
+    precomputed RGB cube of nearest threads (see thread_lut.py). The
+    num_colors most used threads are kept, and pixels on any other
+    thread move to the kept thread closest to it.
+
+    Args:
+        image: RGB image
+        num_colors: Maximum number of threads in the result
+        thread_codes: Only use these DMC codes (default: whole catalog)
+        metric: Color distance for picking threads (see color_science.py)
+
+    Returns:
+        Tuple of (indices, palette) like quantize_to_indices;
+        every palette color is a thread color
+
+    Raises:
+        ValueError: on unknown thread codes or metric
+    """
+    lut = get_thread_lut(thread_codes, metric)
+    catalog = lut.catalog
+    thread_indices = lut.lookup(np.asarray(image))
+
+    # Keep the most used threads
+    counts = np.bincount(thread_indices.ravel(), minlength=len(catalog))
+    used = np.flatnonzero(counts)
+    if len(used) > num_colors:
+        keep = used[np.argsort(-counts[used], kind='stable')[:num_colors]]
+
+        # Dropped thread -> closest kept thread, then one lookup for the whole grid
+        coordinates = catalog.coordinates(metric)
+        closest, _ = nearest(coordinates[used], coordinates[keep], metric)
+        remap = np.zeros(len(catalog), dtype=np.intp)
+        remap[used] = keep[closest]
+        thread_indices = remap[thread_indices]
+
+    return compact_palette(thread_indices, catalog.rgb.astype(np.uint8))
+
+
+def resolve_metric(palette_mode: str, metric: Optional[str] = None) -> str:
+    """
+    Check palette_mode / metric and fill in the default metric
+
+    The adaptive palette defaults to "rgb" (the quantizer's own choice);
+    thread palettes default to COLOR_METRIC, since thread picks are
+    exactly where RGB distance goes wrong.
+
+    Raises:
+        ValueError: on an unknown palette mode or metric
+    """
+    if palette_mode not in PALETTE_MODES:
+        raise ValueError(f"Unknown palette mode {palette_mode!r}. Choose from: {', '.join(PALETTE_MODES)}")
+    if metric is None:
+        return DEFAULT_METRIC if palette_mode == "dmc" else "rgb"
+    return check_metric(metric)
+
+
+def process_image_to_indices(
+    image_source: Union[bytes, str],
+    target_width: int,
+    target_height: int,
+    num_colors: int = 16,
+    metric: Optional[str] = None,
+    palette_mode: str = "adaptive",
+    thread_codes: Optional[List[str]] = None,
+    quantizer: str = DEFAULT_QUANTIZER,
+    dither: str = "none"
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    Process an uploaded image into palette indices
+
+    Same pipeline as process_image_for_crossstitch, but skips building the
+    hex grid. Use this when the caller can work with indices directly
+    (previews, compact storage). image_source is raw bytes or a file path.
+
+    Returns:
+        Tuple of (indices, palette)
+        - indices: 2D uint8 array (target_height x target_width)
+        - palette: List of unique hex colors, sorted by RGB
+    """
+    image = load_image(image_source, target_width, target_height)
+    result = quantize_image(image, num_colors, metric, quantizer, palette_mode, thread_codes, dither)
+    return result.indices, result.palette
+
+
 def process_image_for_crossstitch(
-    image_bytes: bytes,
+    image_bytes: Union[bytes, str],
     target_width: int,
     target_height: int,
-    num_colors: int = 16
+    num_colors: int = 16,
+    metric: Optional[str] = None,
+    palette_mode: str = "adaptive",
+    thread_codes: Optional[List[str]] = None,
+    quantizer: str = DEFAULT_QUANTIZER,
+    dither: str = "none"
 ) -> Tuple[List[List[str]], List[str]]:
     """
     Process an uploaded image into a cross-stitch pattern
@@ -33,13 +339,21 @@ def process_image_for_crossstitch(
     1. Opens the image
     2. Resizes to target dimensions (pixelates)
     3. Reduces colors to specified palette size
+       (palette_mode="dmc": straight to DMC thread colors in one pass)
     4. Returns grid of colors and the color palette
 
     Args:
-        image_bytes: Raw image file bytes
+        image_bytes: Raw image file bytes (or a path to the image file)
         target_width: Desired pattern width (in stitches)
         target_height: Desired pattern height (in stitches)
         num_colors: Number of colors to reduce to (2-64)
+        metric: Color distance used to assign pixels to palette colors
+                ("rgb", "cie76", "cie94" or "ciede2000"; default: see resolve_metric)
+        palette_mode: "adaptive" (colors picked for this image) or
+                      "dmc" (only DMC thread colors)
+        thread_codes: With palette_mode="dmc", only use these DMC codes
+        quantizer: Engine for the adaptive palette (see quantizers.py)
+        dither: "none", "ordered" (Bayer) or "floyd_steinberg"
 
     Returns:
         Tuple of (grid_data, palette)
@@ -56,82 +370,98 @@ def process_image_for_crossstitch(
         # grid = [["#FF0000", "#00FF00", ...], [...], ...]
         # palette = ["#FF0000", "#00FF00", "#0000FF", ...]
     """
+    indices, palette = process_image_to_indices(
+        image_bytes,
+        target_width,
+        target_height,
+        num_colors,
+        metric,
+        palette_mode,
+        thread_codes,
+        quantizer,
+        dither
+    )
+
+    # Build grid data (2D array of hex colors) with a single lookup
+    # instead of formatting every pixel separately
+    grid_data = indices_to_hex_grid(indices, palette)
 
-    # Open image from bytes
-    image = Image.open(io.BytesIO(image_bytes))
+    return grid_data, palette
 
-    # Convert to RGB (remove alpha channel if present)
-    if image.mode in ('RGBA', 'LA', 'P'):
-        # Create white background
-        background = Image.new('RGB', image.size, (255, 255, 255))
-        if image.mode == 'P':
-            image = image.convert('RGBA')
-        background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
-        image = background
-    else:
-        image = image.convert('RGB')
 
-    # Resize to target dimensions (this pixelates the image)
-    # NEAREST = no smoothing, gives blocky pixel effect
-    image = image.resize((target_width, target_height), Image.Resampling.NEAREST)
+def grid_to_indices(grid_data: List[List[str]]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Convert a 2D grid of colors into palette indices
 
-    # Reduce colors using quantization
-    # This groups similar colors together
-    # Method 1: Using PIL's quantize (adaptive palette)
-    quantized = image.quantize(colors=num_colors, method=2)  # method=2 is median cut
-    quantized = quantized.convert('RGB')
-
-    # Convert image to numpy array for easier manipulation
-    img_array = np.array(quantized)
-
-    # Build grid data (2D array of hex colors)
-    grid_data = []
-    for row in img_array:
-        grid_row = []
-        for pixel in row:
-            hex_color = rgb_to_hex(tuple(pixel))
-            grid_row.append(hex_color)
-        grid_data.append(grid_row)
-
-    # Extract unique colors to create palette
-    pixels = img_array.reshape(-1, 3)  # Flatten to list of RGB values
-    unique_colors = np.unique(pixels, axis=0)
-    palette = [rgb_to_hex(tuple(color)) for color in unique_colors]
+    Inverse of indices_to_hex_grid. Any cell value is allowed (including
+    "TRANSPARENT"), each distinct value becomes one palette entry.
 
-    return grid_data, palette
+    Returns:
+        Tuple of (indices, palette)
+    """
+    cells = np.array(grid_data, dtype=str)
+    if cells.size == 0:
+        return np.zeros((len(grid_data), 0), dtype=np.uint8), []
 
+    palette, inverse = np.unique(cells, return_inverse=True)
+    dtype = np.uint8 if len(palette) <= 256 else np.uint16
+    return inverse.reshape(cells.shape).astype(dtype), palette.tolist()
 
-def create_preview_image(grid_data: List[List[str]], cell_size: int = 10) -> bytes:
+
+def palette_to_rgb(palette: List[str], default: Tuple[int, int, int] = (255, 255, 255)) -> np.ndarray:
     """
-    Create a preview image from grid data
+    Convert a palette of hex colors to an (N, 3) uint8 array
+    Entries that are not hex colors (like "TRANSPARENT") use the default color
+    """
+    rgb = np.empty((len(palette), 3), dtype=np.uint8)
+    for i, color in enumerate(palette):
+        try:
+            rgb[i] = hex_to_rgb(color)
+        except (ValueError, TypeError, AttributeError):
+            rgb[i] = default
+    return rgb
+
+
+def render_preview(
+    indices: np.ndarray,
+    palette: List[str],
+    cell_size: int = 10,
+    grid_line_color: Optional[str] = None
+) -> bytes:
+    """
+    Render a preview PNG from palette indices
+
+    Builds the image at one pixel per stitch, then scales every pixel up
+    to a cell_size x cell_size block with NumPy (no per-pixel Python loops).
 
     Args:
-        grid_data: 2D list of hex colors
+        indices: 2D array of palette indices (height x width)
+        palette: List of hex colors the indices point into
         cell_size: Size of each cell in pixels (default: 10x10)
+        grid_line_color: Optional hex color for lines between cells
 
     Returns:
         PNG image bytes
     """
-    height = len(grid_data)
-    width = len(grid_data[0]) if height > 0 else 0
-
-    # Create image
-    img_width = width * cell_size
-    img_height = height * cell_size
-    image = Image.new('RGB', (img_width, img_height), 'white')
-
-    # Draw each cell
-    pixels = image.load()
-    for y, row in enumerate(grid_data):
-        for x, hex_color in enumerate(row):
-            rgb = hex_to_rgb(hex_color)
-            # Fill cell_size x cell_size block
-            for dy in range(cell_size):
-                for dx in range(cell_size):
-                    px = x * cell_size + dx
-                    py = y * cell_size + dy
-                    if px < img_width and py < img_height:
-                        pixels[px, py] = rgb
+    height, width = indices.shape[:2]
+
+    # One pixel per stitch: look up every cell's RGB value at once
+    stitches = palette_to_rgb(palette)[indices] if len(palette) else \
+        np.full((height, width, 3), 255, dtype=np.uint8)
+
+    # Blow each stitch up to a cell_size x cell_size block
+    pixels = np.repeat(np.repeat(stitches, cell_size, axis=0), cell_size, axis=1)
+
+    # Draw a line along the top and left edge of every cell,
+    # plus the bottom and right edge of the whole pattern
+    if grid_line_color and cell_size > 1 and pixels.size:
+        line_rgb = hex_to_rgb(grid_line_color)
+        pixels[::cell_size, :] = line_rgb
+        pixels[:, ::cell_size] = line_rgb
+        pixels[-1, :] = line_rgb
+        pixels[:, -1] = line_rgb
+
+    image = Image.fromarray(np.ascontiguousarray(pixels), 'RGB')
 
     # Save to bytes
     img_byte_arr = io.BytesIO()
@@ -140,59 +470,43 @@ def create_preview_image(grid_data: List[List[str]], cell_size: int = 10) -> byt
     return img_byte_arr.getvalue()
 
 
-# Example DMC thread color palette (subset)
-# DMC is a popular cross-stitch thread brand
-DMC_COLORS = {
-    "310": "#000000",  # Black
-    "B5200": "#FFFFFF",  # White
-    "321": "#C1272D",  # Red
-    "798": "#2B4C8F",  # Blue
-    "907": "#AFCD3A",  # Green
-    "741": "#FF8C00",  # Orange
-    "208": "#912F80",  # Purple
-    "3853": "#F27B3A",  # Orange
-    "3812": "#00A390",  # Teal
-    "725": "#FFC700",  # Yellow
-    # Add more as needed
-}
+def create_preview_image(
+    grid_data: List[List[str]],
+    cell_size: int = 10,
+    grid_line_color: Optional[str] = None
+) -> bytes:
+    """
+    Create a preview image from grid data
 
+    Args:
+        grid_data: 2D list of hex colors
+        cell_size: Size of each cell in pixels (default: 10x10)
+        grid_line_color: Optional hex color for lines between cells
 
-def map_to_thread_colors(palette: List[str], thread_palette: dict = DMC_COLORS) -> dict:
+    Returns:
+        PNG image bytes
+    """
+    indices, palette = grid_to_indices(grid_data)
+    return render_preview(indices, palette, cell_size, grid_line_color)
+
+
+def map_to_thread_colors(
+    palette: List[str],
+    thread_palette: Optional[dict] = None,
+    metric: str = DEFAULT_METRIC
+) -> dict:
     """
     Map color palette to actual thread colors (like DMC)
 
     Args:
         palette: List of hex colors from design
-        thread_palette: Dictionary of thread code -> hex color
+        thread_palette: Optional dictionary of thread code -> hex color
+                        (default: the full DMC catalog, see thread_catalog.py)
+        metric: Color distance (default: COLOR_METRIC, normally "ciede2000")
 
     Returns:
         Dictionary mapping design color -> thread info
-        Example: {"#FF0000": {"code": "321", "hex": "#C1272D", "name": "Red"}}
+        Example: {"#FF0000": {"code": "666", "name": "Bright Red", "hex": "#E31D42", ...}}
     """
-    mapping = {}
-
-    for color in palette:
-        rgb = hex_to_rgb(color)
-
-        # Find closest thread color
-        min_distance = float('inf')
-        closest_thread = None
-
-        for thread_code, thread_hex in thread_palette.items():
-            thread_rgb = hex_to_rgb(thread_hex)
-
-            # Calculate color distance (Euclidean in RGB space)
-            distance = sum((a - b) ** 2 for a, b in zip(rgb, thread_rgb)) ** 0.5
-
-            if distance < min_distance:
-                min_distance = distance
-                closest_thread = (thread_code, thread_hex)
-
-        if closest_thread:
-            mapping[color] = {
-                "code": closest_thread[0],
-                "hex": closest_thread[1],
-                "original": color
-            }
-
-    return mapping
+    catalog = get_catalog(thread_palette)
+    return {match["original"]: match for match in catalog.match_palette(palette, metric)}
@@ -0,0 +1,177 @@
+"""
+Image Worker Pool
+Runs CPU-heavy image processing in separate processes
+
+Decoding, quantizing and rendering previews can take hundreds of
+milliseconds. Doing that inside an async route blocks the whole event
+loop, so every other request waits. Instead routes hand the work to a
+ProcessPoolExecutor and await the result.
+
+The pool is bounded: at most IMAGE_QUEUE_LIMIT jobs may be running or
+waiting at once. Past that, new work is rejected right away (the route
+answers 503) instead of piling up in memory.
+
+Configuration (environment variables):
+    IMAGE_WORKERS       Number of worker processes (default: CPU count)
+    IMAGE_QUEUE_LIMIT   Max jobs running + waiting (default: 4 per worker)
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from image_processor import (
+    decode_image,
+    load_image,
+    pixelate,
+    quantize_image,
+    render_preview
+)
+from quantizers import DEFAULT_QUANTIZER
+# PoolSaturated and PoolBroken are re-exported for the image routes and import jobs
+from bounded_pool import BoundedPool, PoolBroken, PoolSaturated
+
+IMAGE_WORKERS = max(1, int(os.getenv("IMAGE_WORKERS", str(os.cpu_count() or 2))))
+IMAGE_QUEUE_LIMIT = max(1, int(os.getenv("IMAGE_QUEUE_LIMIT", str(IMAGE_WORKERS * 4))))
+
+
+class ImageWorkerPool(BoundedPool):
+    """
+    Bounded process pool with usage counters (see bounded_pool.py)
+
+    Usage:
+        pool = ImageWorkerPool(max_workers=4, queue_limit=16)
+        result = await pool.run(some_function, arg1, arg2)
+
+    some_function must be a module-level function (it is pickled
+    and sent to a worker process), and so must its arguments.
+    """
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # "spawn" starts clean interpreters instead of forking the
+        # API process (with its DB connections and threads)
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+
+# Shared pool used by the image routes
+image_pool = ImageWorkerPool(IMAGE_WORKERS, IMAGE_QUEUE_LIMIT)
+
+
+# ============= Worker Functions =============
+# These run inside the worker processes
+
+def quantize_and_render(
+    image: Image.Image,
+    num_colors: int,
+    cell_size: int,
+    grid_line_color: Optional[str],
+    color_metric: Optional[str] = None,
+    palette_mode: str = "adaptive",
+    thread_codes: Optional[List[str]] = None,
+    quantizer: str = DEFAULT_QUANTIZER,
+    dither: str = "none"
+) -> Tuple[np.ndarray, List[str], bytes, Dict[str, Any]]:
+    """
+    Quantize a pixelated image and render its preview
+
+    Returns:
+        Tuple of (indices, palette, preview_png_bytes, quantizer_report)
+        quantizer_report is QuantizeResult.report(): engine, seconds, mse
+    """
+    result = quantize_image(
+        image, num_colors, color_metric, quantizer, palette_mode, thread_codes, dither
+    )
+    preview_bytes = render_preview(
+        result.indices,
+        result.palette,
+        cell_size=cell_size,
+        grid_line_color=grid_line_color
+    )
+    return result.indices, result.palette, preview_bytes, result.report()
+
+
+def run_upload_pipeline(
+    image_path: str,
+    target_width: int,
+    target_height: int,
+    num_colors: int,
+    *options: Any
+) -> Tuple[np.ndarray, List[str], bytes, Dict[str, Any]]:
+    """
+    Full /images/upload processing: decode, quantize and render the preview
+
+    options are the remaining quantize_and_render arguments
+    (cell_size, grid_line_color, color_metric, ...)
+    """
+    image = load_image(image_path, target_width, target_height)
+    return quantize_and_render(image, num_colors, *options)
+
+
+def run_decode_variants(
+    image_path: str,
+    sizes: List[Tuple[int, int]]
+) -> Dict[Tuple[int, int], np.ndarray]:
+    """
+    /images/batch stage 1: decode the upload once and pixelate it to every size
+
+    Returns:
+        {(width, height): RGB pixels as a (height, width, 3) uint8 array}
+    """
+    image = decode_image(
+        image_path,
+        max(width for width, _ in sizes),
+        max(height for _, height in sizes)
+    )
+    return {size: np.asarray(pixelate(image, *size)) for size in set(sizes)}
+
+
+def run_variant_pipeline(
+    pixels: np.ndarray,
+    num_colors: int,
+    *options: Any
+) -> Tuple[np.ndarray, List[str], bytes, Dict[str, Any]]:
+    """
+    /images/batch stage 2 (one per variant): quantize and render the preview
+
+    options are the remaining quantize_and_render arguments
+    """
+    return quantize_and_render(Image.fromarray(pixels, "RGB"), num_colors, *options)
+
+
+def run_decode_stage(image_path: str, target_width: int, target_height: int) -> np.ndarray:
+    """
+    Import job stage 1: decode the stored upload and pixelate it
+
+    Returns:
+        RGB pixels as a (target_height, target_width, 3) uint8 array
+    """
+    return np.asarray(load_image(image_path, target_width, target_height))
+
+
+def run_quantize_stage(
+    pixels: np.ndarray,
+    num_colors: int,
+    color_metric: Optional[str] = None,
+    palette_mode: str = "adaptive",
+    thread_codes: Optional[List[str]] = None,
+    quantizer: str = DEFAULT_QUANTIZER,
+    dither: str = "none"
+) -> Tuple[np.ndarray, List[str], Dict[str, Any]]:
+    """
+    Import job stage 2: reduce the pixelated image to num_colors
+    (same options as /images/upload)
+
+    Returns:
+        Tuple of (indices, palette, quantizer_report)
+    """
+    result = quantize_image(
+        Image.fromarray(pixels, "RGB"), num_colors, color_metric, quantizer, palette_mode, thread_codes, dither
+    )
+    return result.indices, result.palette, result.report()
@@ -0,0 +1,483 @@
+"""
+Image Import Jobs
+Background processing for image uploads
+
+POST /images/jobs stores the upload on disk, creates an ImportJob row and
+returns straight away. Worker threads claim queued jobs from the database
+and run them through the pipeline stages in the image worker pool:
+
+    decode (pixelate) -> quantize -> preview -> succeeded
+
+Each stage updates the job's stage/progress so clients can poll
+GET /images/jobs/{id}. Because jobs live in the database, they survive
+restarts: a job left "running" by a crashed worker is picked up again
+once it hasn't made progress for IMPORT_JOB_STALE_SECONDS.
+
+While a worker has a job (including while it waits for a free slot in a
+busy image pool) a heartbeat thread refreshes the job's updated_at every
+IMPORT_JOB_HEARTBEAT_SECONDS, so slow jobs aren't mistaken for dead ones.
+Every write a worker makes is conditional on the attempt it claimed: if
+the job was taken over anyway, the old worker stops without storing a
+result or deleting the upload.
+
+Workers can run inside the API process (IMPORT_JOB_WORKERS threads, the
+default) or in a separate process so processing scales on its own:
+
+    IMPORT_JOB_WORKERS=0 uvicorn main:app ...   # API only
+    python -m import_jobs                       # worker only
+
+Configuration (environment variables):
+    IMPORT_JOB_DIR            Where uploads wait for processing
+    IMPORT_JOB_WORKERS        Worker threads started with the API (default: 1)
+    IMPORT_JOB_POLL_SECONDS   How often idle workers check for jobs (default: 1)
+    IMPORT_JOB_STALE_SECONDS  When a silent "running" job is retried (default: 300)
+    IMPORT_JOB_HEARTBEAT_SECONDS  How often a running job is marked alive
+                              (default: a tenth of IMPORT_JOB_STALE_SECONDS)
+    IMPORT_JOB_MAX_ATTEMPTS   Give up on a job after this many tries (default: 3)
+    IMPORT_JOB_BUSY_SECONDS   Fail a job that waited this long for a free slot
+                              in the image pool (default: 600)
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from database import DB_MIGRATE_ON_STARTUP, SessionLocal, upgrade_database
+import models
+from image_processor import indices_to_hex_grid, render_preview
+from image_workers import image_pool, run_decode_stage, run_quantize_stage, PoolBroken, PoolSaturated
+from quantizers import DEFAULT_QUANTIZER, quantizer_stats
+from preview_store import PREVIEW_TTL_HOURS, save_preview
+from image_cache import image_cache, cache_key, file_digest
+
+logger = logging.getLogger(__name__)
+
+IMPORT_JOB_DIR = os.getenv("IMPORT_JOB_DIR", "/app/data/jobs")
+IMPORT_JOB_WORKERS = int(os.getenv("IMPORT_JOB_WORKERS", "1"))
+IMPORT_JOB_POLL_SECONDS = float(os.getenv("IMPORT_JOB_POLL_SECONDS", "1"))
+IMPORT_JOB_STALE_SECONDS = int(os.getenv("IMPORT_JOB_STALE_SECONDS", "300"))
+IMPORT_JOB_MAX_ATTEMPTS = int(os.getenv("IMPORT_JOB_MAX_ATTEMPTS", "3"))
+IMPORT_JOB_BUSY_SECONDS = float(os.getenv("IMPORT_JOB_BUSY_SECONDS", "600"))
+IMPORT_JOB_HEARTBEAT_SECONDS = float(
+    os.getenv("IMPORT_JOB_HEARTBEAT_SECONDS", str(max(1, IMPORT_JOB_STALE_SECONDS / 10)))
+)
+
+# Settings of jobs submitted without options (the /images/upload defaults)
+DEFAULT_JOB_OPTIONS = {
+    "preview_cell_size": 10,
+    "grid_line_color": None,
+    "color_metric": "rgb",
+    "palette_mode": "adaptive",
+    "thread_codes": None,
+    "quantizer": DEFAULT_QUANTIZER,
+    "dither": "none",
+}
+
+# Job status values
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobFailed(Exception):
+    """Raised by a stage when the job can't succeed (bad image, ...)"""
+
+
+class JobLost(Exception):
+    """Raised when another worker has taken over the job (it looked stale)"""
+
+
+# ============= Submitting =============
+
+def submit_job(
+    db: Session,
+    owner_id: int,
+    upload_path: str,
+    target_width: int,
+    target_height: int,
+    num_colors: int,
+    options: Optional[dict] = None
+) -> models.ImportJob:
+    """
+    Queue an upload for processing
+
+    The file at upload_path (a spooled upload) is moved into
+    IMPORT_JOB_DIR, where it stays until the job finishes.
+
+    options may override any of DEFAULT_JOB_OPTIONS (already validated,
+    with color_metric resolved and thread_codes sorted, as /upload does).
+
+    Returns:
+        The new ImportJob (status "queued")
+    """
+    os.makedirs(IMPORT_JOB_DIR, exist_ok=True)
+
+    job_id = uuid.uuid4().hex
+    input_path = os.path.join(IMPORT_JOB_DIR, f"{job_id}.upload")
+    shutil.move(upload_path, input_path)
+
+    job = models.ImportJob(
+        id=job_id,
+        owner_id=owner_id,
+        status=QUEUED,
+        progress=0,
+        attempts=0,
+        target_width=target_width,
+        target_height=target_height,
+        num_colors=num_colors,
+        options=json.dumps(options) if options else None,
+        input_path=input_path,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    wake_workers()
+    return job
+
+
+# ============= Claiming =============
+
+def claim_next_job(db: Session) -> Optional[models.ImportJob]:
+    """
+    Take the oldest runnable job, so no other worker picks it up
+
+    Runnable means queued, or running but silent for longer than
+    IMPORT_JOB_STALE_SECONDS (its worker died). The claim is a
+    conditional UPDATE, so if two workers race only one wins.
+    """
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=IMPORT_JOB_STALE_SECONDS)
+
+    runnable = or_(
+        models.ImportJob.status == QUEUED,
+        (models.ImportJob.status == RUNNING) & (models.ImportJob.updated_at < stale_before),
+    )
+
+    candidates = db.query(models.ImportJob.id)\
+        .filter(runnable)\
+        .order_by(models.ImportJob.created_at)\
+        .limit(10)\
+        .all()
+
+    for (job_id,) in candidates:
+        claimed = db.query(models.ImportJob)\
+            .filter(models.ImportJob.id == job_id, runnable)\
+            .update({
+                models.ImportJob.status: RUNNING,
+                models.ImportJob.stage: None,
+                models.ImportJob.progress: 0,
+                models.ImportJob.attempts: models.ImportJob.attempts + 1,
+                models.ImportJob.updated_at: datetime.now(timezone.utc),
+            }, synchronize_session=False)
+        db.commit()
+
+        if claimed:
+            return db.get(models.ImportJob, job_id)
+
+    return None
+
+
+# ============= Processing =============
+
+def _owned(job: models.ImportJob):
+    """Filter matching the job only while it is still this worker's attempt"""
+    return (
+        (models.ImportJob.id == job.id)
+        & (models.ImportJob.status == RUNNING)
+        & (models.ImportJob.attempts == job.attempts)
+    )
+
+
+def _set_stage(db: Session, job: models.ImportJob, stage: str, progress: int) -> None:
+    updated = db.query(models.ImportJob)\
+        .filter(_owned(job))\
+        .update({
+            models.ImportJob.stage: stage,
+            models.ImportJob.progress: progress,
+            models.ImportJob.updated_at: datetime.now(timezone.utc),  # Heartbeat for stale detection
+        }, synchronize_session=False)
+    db.commit()
+    if not updated:
+        raise JobLost()
+
+
+def _run_heartbeat(job_id: str, attempt: int, stop: threading.Event) -> None:
+    while not stop.wait(IMPORT_JOB_HEARTBEAT_SECONDS):
+        db = SessionLocal()
+        try:
+            alive = db.query(models.ImportJob)\
+                .filter(
+                    models.ImportJob.id == job_id,
+                    models.ImportJob.status == RUNNING,
+                    models.ImportJob.attempts == attempt,
+                )\
+                .update({models.ImportJob.updated_at: datetime.now(timezone.utc)}, synchronize_session=False)
+            db.commit()
+        except Exception:
+            logger.exception("Import job %s heartbeat failed", job_id)
+            alive = True  # Try again next time
+        finally:
+            db.close()
+        if not alive:
+            return  # Finished, or taken over by another worker
+
+
+@contextmanager
+def _heartbeat(job: models.ImportJob):
+    """Keep refreshing the job's updated_at while the block runs"""
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=_run_heartbeat,
+        args=(job.id, job.attempts, stop),
+        name=f"import-heartbeat-{job.id[:8]}",
+        daemon=True,
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+
+
+def _run_in_pool(fn, *args):
+    """
+    Run a stage in the image pool, waiting for a free slot if it is busy
+    (the job's heartbeat keeps it alive meanwhile)
+
+    Raises:
+        JobFailed: the pool stayed full for IMPORT_JOB_BUSY_SECONDS,
+                   or a worker crashed while running the stage
+    """
+    deadline = time.monotonic() + IMPORT_JOB_BUSY_SECONDS
+    while True:
+        try:
+            return image_pool.submit_and_wait(fn, *args)
+        except PoolBroken:
+            # Retrying could crash the new workers the same way
+            raise JobFailed("The image worker stopped while processing this image")
+        except PoolSaturated:
+            if time.monotonic() >= deadline:
+                raise JobFailed("Image processing stayed busy for too long, please try again later")
+            time.sleep(IMPORT_JOB_POLL_SECONDS)
+
+
+def _finish(db: Session, job: models.ImportJob, status: str, result: Optional[dict] = None,
+            error: Optional[str] = None) -> None:
+    values = {
+        models.ImportJob.status: status,
+        models.ImportJob.result: json.dumps(result) if result is not None else None,
+        models.ImportJob.error: error,
+        models.ImportJob.finished_at: datetime.now(timezone.utc),
+    }
+    if status == SUCCEEDED:
+        values[models.ImportJob.progress] = 100
+    updated = db.query(models.ImportJob)\
+        .filter(_owned(job))\
+        .update(values, synchronize_session=False)
+    db.commit()
+    if not updated:
+        raise JobLost()
+
+    # The upload is no longer needed once the job is done either way
+    if job.input_path and os.path.exists(job.input_path):
+        os.remove(job.input_path)
+
+
+def process_job(db: Session, job: models.ImportJob) -> None:
+    """
+    Run a claimed job through every stage and store the result
+    """
+    # Keep the values as claimed: job.attempts identifies this attempt, and
+    # must not be reloaded from the row (which a takeover would change)
+    db.expunge(job)
+
+    try:
+        if job.attempts > IMPORT_JOB_MAX_ATTEMPTS:
+            _finish(db, job, FAILED, error="Gave up after repeated worker failures")
+            return
+
+        with _heartbeat(job):
+            try:
+                _process_stages(db, job)
+            except JobLost:
+                raise
+            except Exception as e:
+                logger.exception("Import job %s failed", job.id)
+                db.rollback()
+                _finish(db, job, FAILED, error=f"Error processing image: {str(e)}")
+    except JobLost:
+        db.rollback()
+        logger.warning("Import job %s was taken over by another worker, dropping this attempt", job.id)
+
+
+def _process_stages(db: Session, job: models.ImportJob) -> None:
+    if not job.input_path or not os.path.exists(job.input_path):
+        raise JobFailed("Uploaded image is missing")
+
+    options = dict(DEFAULT_JOB_OPTIONS, **json.loads(job.options or "{}"))
+
+    # Same image with the same settings already processed (here or by
+    # /images/upload, same key)? Skip the stages
+    key = cache_key(
+        file_digest(job.input_path),
+        job.target_width,
+        job.target_height,
+        job.num_colors,
+        method=options["quantizer"],
+        cell=options["preview_cell_size"],
+        lines=options["grid_line_color"],
+        metric=options["color_metric"],
+        palette=options["palette_mode"],
+        threads=options["thread_codes"],
+        dither=options["dither"]
+    )
+    cached = image_cache.get(key)
+
+    if cached is None:
+        _set_stage(db, job, "decode", 10)
+        pixels = _run_in_pool(run_decode_stage, job.input_path, job.target_width, job.target_height)
+
+        _set_stage(db, job, "quantize", 40)
+        indices, palette, report = _run_in_pool(
+            run_quantize_stage,
+            pixels,
+            job.num_colors,
+            options["color_metric"],
+            options["palette_mode"],
+            options["thread_codes"],
+            options["quantizer"],
+            options["dither"]
+        )
+        quantizer_stats.record(report)
+
+        _set_stage(db, job, "preview", 70)
+        preview_bytes = _run_in_pool(
+            render_preview, indices, palette, options["preview_cell_size"], options["grid_line_color"]
+        )
+
+        cached = (indices, palette, preview_bytes)
+        image_cache.put(key, cached)
+
+    indices, palette, preview_bytes = cached
+    preview_url = save_preview(preview_bytes)
+
+    _finish(db, job, SUCCEEDED, result={
+        "width": job.target_width,
+        "height": job.target_height,
+        "grid_data": json.dumps(indices_to_hex_grid(indices, palette)),
+        "palette": palette,
+        "preview_url": preview_url,
+    })
+
+
+# ============= Workers =============
+
+_wake = threading.Event()
+_stop = threading.Event()
+_threads: List[threading.Thread] = []
+
+
+def wake_workers() -> None:
+    """Tell idle in-process workers a new job is waiting"""
+    _wake.set()
+
+
+def run_worker(stop_event: threading.Event = _stop) -> None:
+    """
+    Worker loop: claim a job, process it, repeat until stop_event is set
+    """
+    while not stop_event.is_set():
+        db = SessionLocal()
+        try:
+            job = claim_next_job(db)
+            if job is not None:
+                process_job(db, job)
+                continue
+        except Exception:
+            logger.exception("Import worker error")
+        finally:
+            db.close()
+
+        # Nothing to do: sleep until woken or the poll interval passes
+        _wake.wait(IMPORT_JOB_POLL_SECONDS)
+        _wake.clear()
+
+
+def start_workers(count: int = IMPORT_JOB_WORKERS) -> None:
+    """Start worker threads inside this process (called on API startup)"""
+    _stop.clear()
+    for i in range(count):
+        thread = threading.Thread(target=run_worker, name=f"import-worker-{i}", daemon=True)
+        thread.start()
+        _threads.append(thread)
+
+
+def stop_workers() -> None:
+    """Ask worker threads to stop (called on API shutdown)"""
+    _stop.set()
+    _wake.set()
+    _threads.clear()
+
+
+def recent_preview_urls() -> List[str]:
+    """
+    Preview URLs of jobs that finished within PREVIEW_TTL_HOURS
+
+    Passed to the preview sweeper, so a finished job's preview_url keeps
+    working for that long even if the previews go over their disk quota.
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=PREVIEW_TTL_HOURS)
+    db = SessionLocal()
+    try:
+        results = db.query(models.ImportJob.result)\
+            .filter(models.ImportJob.status == SUCCEEDED, models.ImportJob.finished_at >= since)\
+            .all()
+    finally:
+        db.close()
+
+    urls = []
+    for (result,) in results:
+        try:
+            url = json.loads(result).get("preview_url")
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if url:
+            urls.append(url)
+    return urls
+
+
+def job_stats(db: Session) -> dict:
+    """Number of jobs per status, for the /metrics endpoint"""
+    counts = db.query(models.ImportJob.status, func.count(models.ImportJob.id))\
+        .group_by(models.ImportJob.status)\
+        .all()
+    return {
+        "workers_in_process": len(_threads),
+        "jobs": {job_status: count for job_status, count in counts},
+    }
+
+
+if __name__ == "__main__":
+    # Standalone worker process: python -m import_jobs
+    logging.basicConfig(level=logging.INFO)
+    if DB_MIGRATE_ON_STARTUP:
+        # The worker may start before the API: make sure import_jobs exists
+        upgrade_database()
+    logger.info("Import worker started (pool of %d processes)", image_pool.max_workers)
+    try:
+        run_worker()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        image_pool.shutdown()
@@ -3,23 +3,39 @@ Main FastAPI Application
 Entry point for the backend API server
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from typing import Optional
 import os
+import secrets
 
 # Import database setup
-from database import engine, Base
+from database import DB_MIGRATE_ON_STARTUP, async_engine, get_db, pool_stats, upgrade_database
+from sqlalchemy.orm import Session
 import models
 
 # Import routers
-from routers import auth, designs, images
-
-# Create database tables
-# This runs when the app starts and creates tables if they don't exist
-print("Creating database tables...")
-Base.metadata.create_all(bind=engine)
-print("Database tables created!")
+from routers import auth, designs, images, threads
+from image_workers import image_pool
+import import_jobs
+from image_cache import image_cache
+from preview_store import UPLOADS_DIR, preview_store, start_sweeper, stop_sweeper
+from upload_ingest import MAX_FILE_SIZE
+from quantizers import quantizer_stats
+from auth import user_cache_stats
+from password_pool import password_pool
+from thumbnails import start_backfill
+
+# Create or upgrade database tables
+# This runs when the app starts: the Alembic migrations in migrations/
+# create missing tables and add columns that newer code needs, so old
+# databases keep working (create_all alone never changes existing tables)
+if DB_MIGRATE_ON_STARTUP:
+    print("Upgrading database schema...")
+    upgrade_database()
+    print("Database schema up to date!")
 
 # Create FastAPI app instance
 app = FastAPI(
@@ -44,11 +60,30 @@ app.add_middleware(
     allow_headers=["*"],      # Allow all headers
 )
 
+# ============= Upload Size Limit =============
+# Refuse oversized image uploads from their Content-Length header, before
+# the multipart body is read at all. Uploads without a length are still
+# capped while being copied (see upload_ingest.py).
+
+MAX_UPLOAD_BODY = MAX_FILE_SIZE + 1024 * 1024  # File plus room for form fields
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    if request.method == "POST" and request.url.path.startswith("/images"):
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BODY:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024} MB"},
+            )
+    return await call_next(request)
+
+
 # ============= Static Files =============
 # Serve uploaded images
-uploads_dir = "/app/uploads"
-os.makedirs(uploads_dir, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
+os.makedirs(UPLOADS_DIR, exist_ok=True)
+app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
 
 # ============= Include Routers =============
 # Each router handles a different part of the API
@@ -62,6 +97,39 @@ app.include_router(designs.router, prefix="/designs", tags=["Designs"])
 # Image processing routes (upload, pixelate)
 app.include_router(images.router, prefix="/images", tags=["Image Processing"])
 
+# Thread catalog routes (DMC colors, nearest-thread matching)
+app.include_router(threads.router, prefix="/threads", tags=["Threads"])
+
+
+# ============= Startup / Shutdown =============
+
+@app.on_event("startup")
+def start_workers():
+    """
+    Start the image worker processes so the first upload doesn't wait for them,
+    the import job workers (unless IMPORT_JOB_WORKERS=0), the preview sweeper
+    and the backfill of missing design thumbnails
+    """
+    image_pool.start()
+    import_jobs.start_workers()
+    start_sweeper(in_use=import_jobs.recent_preview_urls)
+    start_backfill()
+
+
+@app.on_event("shutdown")
+def stop_workers():
+    """Stop the import job workers, the preview sweeper and the worker pools"""
+    import_jobs.stop_workers()
+    stop_sweeper()
+    image_pool.shutdown()
+    password_pool.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_database():
+    """Close the async engine's connections"""
+    await async_engine.dispose()
+
 
 # ============= Root Endpoint =============
 @app.get("/")
@@ -87,6 +155,57 @@ def health_check():
     return {"status": "healthy"}
 
 
+# ============= Metrics Access =============
+# /metrics shows pool sizes, queue depths and cache usage - enough to time
+# a load spike - so it is off unless METRICS_TOKEN is set, and then needs
+# the header "Authorization: Bearer <METRICS_TOKEN>" (give it to your
+# monitoring only; it is not a user token)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)):
+    """Raise 404 if metrics are disabled, 401 without the right token"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {METRICS_TOKEN}".encode("utf-8")
+    if not secrets.compare_digest((authorization or "").encode("utf-8"), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+def metrics(db: Session = Depends(get_db)):
+    """
+    Runtime counters for monitoring and capacity planning
+
+    Requires METRICS_TOKEN (see above); returns 404 when it isn't set
+
+    - image_workers: process pool size, active/queued jobs, rejections
+    - import_jobs: import jobs per status
+    - image_cache: processed upload cache hits/misses
+    - design_counts: cache behind the design listing totals
+    - quantizers: runs, average time and error per quantization engine
+    - previews: preview files on disk, bytes used, dedup hits, evictions
+    - auth_users: cache of authenticated users (hits skip the users query)
+    - password_hashing: bcrypt pool load and rejected logins
+    - database: connection pool usage and checkout waits (sync and async engines)
+    """
+    return {
+        "image_workers": image_pool.stats(),
+        "import_jobs": import_jobs.job_stats(db),
+        "image_cache": image_cache.stats(),
+        "design_counts": designs.design_count_stats(),
+        "quantizers": quantizer_stats.stats(),
+        "previews": preview_store.stats(),
+        "auth_users": user_cache_stats(),
+        "password_hashing": password_pool.stats(),
+        "database": pool_stats(),
+    }
+
+
 # ============= API Documentation =============
 # FastAPI automatically generates interactive API docs
 # Visit these URLs when server is running:
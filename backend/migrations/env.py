@@ -0,0 +1,73 @@
+"""
+Alembic Environment
+Connects Alembic to our database and models
+
+DATABASE_URL is read the same way as the app does (database.py), and the
+models' metadata is used for `alembic revision --autogenerate`.
+
+database.upgrade_database() runs these migrations from the app: it passes
+its own connection (see run_migrations_online) and keeps the app's logging.
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from database import DATABASE_URL, Base
+import models  # noqa: F401  (registers the tables on Base.metadata)
+
+config = context.config
+
+# Logging setup from alembic.ini (only for the alembic command)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """
+    Print the SQL instead of running it:
+        alembic upgrade head --sql
+    """
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run the migrations against the database"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        # Called from database.upgrade_database()
+        run_migrations(connection)
+        return
+
+    connectable = create_engine(DATABASE_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        run_migrations(connection)
+
+
+def run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite can't ALTER most things; batch mode rebuilds the table instead
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,34 @@
+"""designs.design_blob: compact binary grid storage
+
+Adds the column design_codec writes to. design_data becomes nullable,
+since rows stored in the compact format leave it empty.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-06-01 00:00:01
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {column["name"]: column for column in sa.inspect(op.get_bind()).get_columns("designs")}
+
+    with op.batch_alter_table("designs") as batch:
+        if "design_blob" not in columns:
+            batch.add_column(sa.Column("design_blob", sa.LargeBinary(), nullable=True))
+        if not columns["design_data"]["nullable"]:
+            batch.alter_column("design_data", existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    # Rows stored only as blobs would lose their data: decode them first
+    # (set DESIGN_STORAGE_FORMAT=json and re-save) before downgrading
+    with op.batch_alter_table("designs") as batch:
+        batch.drop_column("design_blob")
@@ -0,0 +1,35 @@
+"""designs.version: optimistic concurrency counter
+
+SQLAlchemy bumps this on every update and adds "AND version = ?" to the
+UPDATE, so two saves of the same design can't silently overwrite each
+other. Existing rows start at version 1.
+
+Must be applied before code using Design.version runs: every Design
+query selects the column and every update filters on it. The API and
+the import worker apply it on startup (database.upgrade_database).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-06-01 00:00:02
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("designs")}
+
+    if "version" not in columns:
+        with op.batch_alter_table("designs") as batch:
+            batch.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("designs") as batch:
+        batch.drop_column("version")
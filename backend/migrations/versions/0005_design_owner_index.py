@@ -0,0 +1,45 @@
+"""designs (owner_id, created_at DESC, id DESC) index
+
+Every design route filters by owner, and listing pages through
+(created_at, id) newest first. Without an index each of those scans the
+whole table and sorts it; with this one Postgres seeks to the owner's
+newest design and reads rows in order.
+
+Replaces the ascending ix_designs_owner_created_id that create_all()
+made on some databases. See benchmarks/bench_design_indexes.py for the
+query plans before and after.
+
+On a large Postgres table, create the index by hand first to avoid
+locking writes, then run this migration (it skips existing indexes):
+    CREATE INDEX CONCURRENTLY ix_designs_owner_created_desc
+        ON designs (owner_id, created_at DESC, id DESC);
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-06-01 00:00:04
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    indexes = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("designs")}
+
+    if "ix_designs_owner_created_desc" not in indexes:
+        op.create_index(
+            "ix_designs_owner_created_desc",
+            "designs",
+            ["owner_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        )
+    if "ix_designs_owner_created_id" in indexes:
+        op.drop_index("ix_designs_owner_created_id", table_name="designs")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_designs_owner_created_desc", table_name="designs")
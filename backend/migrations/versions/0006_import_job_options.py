@@ -0,0 +1,32 @@
+"""import_jobs.options: the optional /images/upload settings of a job
+
+JSON with preview size, grid lines, color metric, palette mode, thread
+codes, quantizer and dither, so background imports accept the same form
+fields as /images/upload. Jobs queued before this column existed have
+NULL and are processed with the defaults.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-06-01 00:00:05
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("import_jobs")}
+
+    if "options" not in columns:
+        with op.batch_alter_table("import_jobs") as batch:
+            batch.add_column(sa.Column("options", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("import_jobs") as batch:
+        batch.drop_column("options")
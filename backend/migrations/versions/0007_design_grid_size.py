@@ -0,0 +1,38 @@
+"""designs.grid_width / grid_height: size of the stored grid
+
+width and height are the size the client declared, which can differ
+from the grid it sent. The gallery shows the real size, and reading it
+from design_data would mean loading every grid just to list designs.
+
+Existing rows stay NULL here (filling them needs every grid decoded);
+the API fills them in the background on startup together with missing
+thumbnails, or run `python -m thumbnails` (see thumbnails.py).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-06-01 00:00:06
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("designs")}
+
+    with op.batch_alter_table("designs") as batch:
+        if "grid_width" not in columns:
+            batch.add_column(sa.Column("grid_width", sa.Integer(), nullable=True))
+        if "grid_height" not in columns:
+            batch.add_column(sa.Column("grid_height", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("designs") as batch:
+        batch.drop_column("grid_height")
+        batch.drop_column("grid_width")
@@ -3,10 +3,11 @@ Database Models
 Defines the structure of your database tables using SQLAlchemy ORM
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
+import design_codec
 
 
 class User(Base):
@@ -35,6 +36,9 @@ class User(Base):
     # This lets you do: user.designs to get all designs for a user
     designs = relationship("Design", back_populates="owner", cascade="all, delete-orphan")
 
+    # Relationship: One user has many image import jobs
+    import_jobs = relationship("ImportJob", back_populates="owner", cascade="all, delete-orphan")
+
 
 class Design(Base):
     """
@@ -54,10 +58,22 @@ class Design(Base):
     width = Column(Integer, nullable=False)   # Grid width in stitches
     height = Column(Integer, nullable=False)  # Grid height in stitches
 
-    # Design data - stored as JSON string
-    # Contains grid data: colors for each cell
-    # Example: {"grid": [[{"color": "#FF0000"}, ...], ...], "palette": ["#FF0000", ...]}
-    design_data = Column(Text, nullable=False)
+    # Design data - clients always read and write this as a JSON string
+    # Example: {"grid": [["#FF0000", ...], ...], "palette": ["#FF0000", ...]}
+    #
+    # It is stored in one of two columns (see the design_data property below):
+    # - design_blob: compact binary format from design_codec (palette + index array)
+    # - design_data: plain JSON text, for older rows and data the codec can't pack
+    # (design_blob and nullable design_data come from migration 0002)
+    _design_data = Column("design_data", Text, nullable=True)
+    design_blob = Column(LargeBinary, nullable=True)
+
+    # Size of the stored grid (rows, cells in the first row), kept up to date
+    # by the setters below. width/height are what the client declared and
+    # can differ; the gallery shows these. NULL for rows saved before
+    # migration 0007 until the thumbnail backfill fills them in
+    grid_width = Column(Integer, nullable=True)
+    grid_height = Column(Integer, nullable=True)
 
     # Optional: Store generated image path
     thumbnail_path = Column(String, nullable=True)
@@ -72,6 +88,132 @@ class Design(Base):
     # Relationship: Design belongs to one user
     owner = relationship("User", back_populates="designs")
 
+    # Bumped on every change to the row. SQLAlchemy adds "AND version = ?"
+    # to each UPDATE, so concurrent saves can't silently overwrite each other
+    # (added by migration 0003; existing rows start at 1 via server_default)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+    @property
+    def design_data(self) -> str:
+        """
+        Design JSON string, decoded from the compact blob when there is one
+        """
+        if self.design_blob is not None:
+            return design_codec.decode_design_data(self.design_blob)
+        return self._design_data
+
+    @design_data.setter
+    def design_data(self, value: str):
+        """
+        Store design JSON, packing it into the compact format when possible
+        """
+        blob = None
+        if design_codec.DESIGN_STORAGE_FORMAT == "compact":
+            blob = design_codec.encode_design_data(value)
+
+        if blob is not None:
+            self.design_blob = blob
+            self._design_data = None
+            size = design_codec.blob_grid_size(blob)
+        else:
+            self.design_blob = None
+            self._design_data = value
+            size = design_codec.json_grid_size(value)
+        self.grid_height, self.grid_width = size or (None, None)
+
+    def get_grid(self):
+        """
+        Design grid as (indices, colors, fields), see design_codec
+        Returns None if the stored JSON isn't a rectangular grid
+        """
+        if self.design_blob is not None:
+            return design_codec.unpack_grid(self.design_blob)
+        return design_codec.grid_from_json(self._design_data)
+
+    def grid_size(self):
+        """
+        (height, width) of the stored grid, or None if there is no grid
+        """
+        if self.design_blob is not None:
+            return design_codec.blob_grid_size(self.design_blob)
+        return design_codec.json_grid_size(self._design_data)
+
+    def set_grid(self, indices, colors, fields):
+        """
+        Store a design grid given as (indices, colors, fields)
+        """
+        self.grid_height, self.grid_width = indices.shape
+        if design_codec.DESIGN_STORAGE_FORMAT == "compact":
+            self.design_blob = design_codec.pack_grid(indices, colors, fields)
+            self._design_data = None
+        else:
+            self.design_blob = None
+            self._design_data = design_codec.grid_to_json(indices, colors, fields)
+
+
+# Listing filters by owner and pages through (created_at, id) newest first.
+# This index has the same order, so keyset pagination seeks straight to
+# each page and reads rows in index order (no sort step). Every lookup of
+# a user's designs can use its owner_id prefix too.
+# Created by migration 0005 (see migrations/versions)
+Index(
+    "ix_designs_owner_created_desc",
+    Design.owner_id,
+    Design.created_at.desc(),
+    Design.id.desc(),
+)
+
+
+class ImportJob(Base):
+    """
+    Import Job Model - an image upload waiting to be (or being) processed
+    Table name: import_jobs
+
+    Jobs are created by POST /images/jobs and picked up by the workers in
+    import_jobs.py, which update status/stage/progress as they go.
+
+    Created by migration 0004, options added by 0006 (see migrations/versions)
+    """
+    __tablename__ = "import_jobs"
+
+    # Primary key - random hex id, so job URLs can't be guessed
+    id = Column(String(32), primary_key=True)
+
+    # Foreign key - links to User table
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    # Processing state
+    # status: queued -> running -> succeeded / failed
+    status = Column(String(16), nullable=False, default="queued", index=True)
+    stage = Column(String(16), nullable=True)   # decode, quantize, preview
+    progress = Column(Integer, nullable=False, default=0)  # 0-100
+    attempts = Column(Integer, nullable=False, default=0)
+
+    # Processing parameters
+    target_width = Column(Integer, nullable=False)
+    target_height = Column(Integer, nullable=False)
+    num_colors = Column(Integer, nullable=False)
+    # JSON of the other /images/upload settings (preview size, quantizer, ...);
+    # NULL for jobs queued before migration 0006, which use the defaults
+    options = Column(Text, nullable=True)
+
+    # Uploaded image, stored on disk until the job finishes
+    input_path = Column(String, nullable=True)
+
+    # Outcome - result is the ImageProcessResponse as a JSON string
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationship: Job belongs to one user
+    owner = relationship("User", back_populates="import_jobs")
+
 
 # When you run the application, these models will create tables in PostgreSQL:
 #
@@ -81,6 +223,11 @@ class Design(Base):
 # +----+------------+----------+------------------+------------+------------+-----------+
 #
 # designs table:
-# +----+-------+-------------+-------+--------+-------------+----------------+----------+------------+------------+
-# | id | title | description | width | height | design_data | thumbnail_path | owner_id | created_at | updated_at |
-# +----+-------+-------------+-------+--------+-------------+----------------+----------+------------+------------+
+# +----+-------+-------------+-------+--------+-------------+-------------+----------------+----------+------------+------------+---------+
+# | id | title | description | width | height | design_data | design_blob | grid_width | grid_height | thumbnail_path | owner_id | created_at | updated_at | version |
+# +----+-------+-------------+-------+--------+-------------+-------------+----------------+----------+------------+------------+---------+
+#
+# import_jobs table:
+# +----+----------+--------+-------+----------+----------+--------------+---------------+------------+------------+--------+-------+------------+------------+-------------+
+# | id | owner_id | status | stage | progress | attempts | target_width | target_height | num_colors | options | input_path | result | error | created_at | updated_at | finished_at |
+# +----+----------+--------+-------+----------+----------+--------------+---------------+------------+------------+--------+-------+------------+------------+-------------+
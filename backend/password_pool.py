@@ -0,0 +1,168 @@
+"""
+Password Hashing Pool
+Runs bcrypt in a small dedicated thread pool, with limits
+
+bcrypt is slow on purpose (~250 ms per hash at cost 12). Running it in
+the request handler or in the shared thread pool means a burst of logins
+can occupy every thread and slow down unrelated endpoints. Instead all
+password hashing goes through this pool:
+
+- at most PASSWORD_HASH_WORKERS hashes run at once (bcrypt releases the
+  GIL, so they really run in parallel)
+- at most PASSWORD_HASH_QUEUE_LIMIT are running or waiting; beyond that
+  requests get 503 with Retry-After instead of piling up
+- one client IP may have at most PASSWORD_HASH_PER_CLIENT in flight;
+  beyond that it gets 429, so one client can't take the whole pool
+
+Behind a reverse proxy every request comes from the proxy's address, which
+would put all users under one per-client limit. For requests from an
+address in TRUSTED_PROXIES the client is read from X-Forwarded-For instead
+(the right-most address that isn't itself a trusted proxy, so clients
+can't pick their own). Direct requests from other addresses ignore the
+header.
+
+Configuration (environment variables):
+    PASSWORD_HASH_WORKERS       Threads hashing at once (default: 2)
+    PASSWORD_HASH_QUEUE_LIMIT   Max hashes running + waiting (default: 32)
+    PASSWORD_HASH_PER_CLIENT    Max hashes in flight per client IP (default: 2)
+    TRUSTED_PROXIES             Comma-separated proxy addresses/networks whose
+                                X-Forwarded-For is believed
+                                (default: loopback and private networks)
+"""
+
+import ipaddress
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from bounded_pool import BoundedPool, PoolSaturated
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+PASSWORD_HASH_PER_CLIENT = int(os.getenv("PASSWORD_HASH_PER_CLIENT", "2"))
+
+# Loopback plus the private ranges Docker networks use
+TRUSTED_PROXIES = os.getenv(
+    "TRUSTED_PROXIES",
+    "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,fc00::/7"
+)
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(value: str) -> List[IPNetwork]:
+    """Networks from a comma-separated list like "10.0.0.0/8,192.168.1.5" """
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in value.split(",") if part.strip()]
+
+
+_trusted_proxies = parse_networks(TRUSTED_PROXIES)
+
+
+def _is_trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_proxies)
+
+
+def client_address(peer: Optional[str], forwarded_for: Optional[str]) -> str:
+    """
+    Address of the client a request came from, for the per-client limit
+
+    Args:
+        peer: Address of the connection (request.client.host)
+        forwarded_for: X-Forwarded-For header, if any
+
+    Example:
+        client_address("172.18.0.5", "203.0.113.7, 172.18.0.3")  # "203.0.113.7"
+        client_address("198.51.100.2", "203.0.113.7")             # "198.51.100.2"
+    """
+    if not peer:
+        return "unknown"
+    if not forwarded_for or not _is_trusted(peer):
+        return peer
+
+    # Each proxy appends the address it received the request from
+    for address in reversed([part.strip() for part in forwarded_for.split(",")]):
+        if address and not _is_trusted(address):
+            return address
+    return peer  # Only proxies in the chain
+
+
+class PasswordPoolSaturated(PoolSaturated):
+    """Raised when the pool already has queue_limit hashes running or waiting"""
+
+
+class ClientLimitExceeded(Exception):
+    """Raised when one client already has per_client_limit hashes in flight"""
+
+
+class PasswordHashPool(BoundedPool):
+    """
+    Bounded thread pool for password hashing, with a per-client limit
+
+    The queue limit and counters come from BoundedPool (bounded_pool.py);
+    this class adds the per-client limit on top.
+
+    Usage:
+        hashed = await password_pool.run(client_ip, pwd_context.hash, password)
+    """
+
+    saturated_error = PasswordPoolSaturated
+
+    def __init__(self, max_workers: int, queue_limit: int, per_client_limit: int):
+        super().__init__(max_workers, queue_limit)
+        self.per_client_limit = max(1, per_client_limit)
+        self._per_client: Dict[str, int] = {}
+        self.rejected_client = 0
+
+    def _create_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="password-hash",
+        )
+
+    def _reserve_client(self, client: str) -> None:
+        with self._lock:
+            if self._per_client.get(client, 0) >= self.per_client_limit:
+                self.rejected_client += 1
+                raise ClientLimitExceeded()
+            self._per_client[client] = self._per_client.get(client, 0) + 1
+
+    def _release_client(self, client: str) -> None:
+        with self._lock:
+            remaining = self._per_client[client] - 1
+            if remaining:
+                self._per_client[client] = remaining
+            else:
+                del self._per_client[client]
+
+    async def run(self, client: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run fn(*args) in the pool and wait for the result
+
+        Raises:
+            ClientLimitExceeded: this client already has too many in flight
+            PasswordPoolSaturated: too many hashes running or waiting
+        """
+        self._reserve_client(client)
+        try:
+            return await super().run(fn, *args)
+        finally:
+            self._release_client(client)
+
+    def stats(self) -> Dict[str, Any]:
+        """Load and rejection counters for the /metrics endpoint"""
+        stats = super().stats()
+        with self._lock:
+            stats.update({
+                "per_client_limit": self.per_client_limit,
+                "clients": len(self._per_client),
+                "rejected_client": self.rejected_client,
+            })
+        return stats
+
+
+# Shared by the auth routes
+password_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT, PASSWORD_HASH_PER_CLIENT)
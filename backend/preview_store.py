@@ -0,0 +1,283 @@
+"""
+Preview Storage
+Saves rendered preview images where the /uploads static mount serves them
+
+Previews are named after the SHA-256 of their bytes, so the same pattern
+rendered twice (the same photo uploaded again, or by someone else) is
+stored once. Files go in two-character subdirectories to keep each
+directory small:
+
+    /app/uploads/previews/3f/3f2a9c...e5.png  ->  /uploads/previews/3f/3f2a9c...e5.png
+
+Previews are only needed while someone is looking at an upload, so a
+background sweeper deletes them again:
+- files not saved again for PREVIEW_TTL_HOURS are removed
+- if the store is still over PREVIEW_DISK_MB, least recently saved
+  files go first until it fits (saving an existing preview again marks
+  it as recently used)
+
+Files written before this layout (preview_<user>_<random>.png directly in
+UPLOADS_DIR) are swept the same way.
+
+Import job results store a preview_url too. start_sweeper() takes a
+function listing the URLs still in use (import_jobs.recent_preview_urls:
+jobs finished less than PREVIEW_TTL_HOURS ago), and those files are never
+evicted, even over the quota. Older job results lose their preview: GET
+/images/jobs/{id} then reports preview_url as null.
+
+Configuration (environment variables):
+    UPLOADS_DIR            Directory served at /uploads (default: /app/uploads)
+    PREVIEW_TTL_HOURS      How long an unused preview is kept (default: 24)
+    PREVIEW_DISK_MB        Size quota for all previews in megabytes (default: 1024)
+    PREVIEW_SWEEP_SECONDS  Time between sweeps (default: 300)
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Served by main.py at /uploads
+UPLOADS_DIR = os.getenv("UPLOADS_DIR", "/app/uploads")
+PREVIEW_DIR = os.path.join(UPLOADS_DIR, "previews")
+
+PREVIEW_TTL_HOURS = float(os.getenv("PREVIEW_TTL_HOURS", "24"))
+PREVIEW_DISK_MB = int(os.getenv("PREVIEW_DISK_MB", "1024"))
+PREVIEW_SWEEP_SECONDS = float(os.getenv("PREVIEW_SWEEP_SECONDS", "300"))
+
+# "<2 hex>/<sha256>.png" after the URL prefix, as made by PreviewStore.save
+_URL_NAME = re.compile(r"[0-9a-f]{2}/([0-9a-f]{64})\.png")
+
+
+class PreviewStore:
+    """
+    Content-addressed preview files with TTL and size-quota eviction
+
+    Usage:
+        url = preview_store.save(preview_bytes)   # "/uploads/previews/3f/3f2a...png"
+        preview_store.sweep()                     # normally done by the sweeper thread
+    """
+
+    def __init__(self, directory: str, url_prefix: str, ttl_seconds: float, limit_bytes: int):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.ttl_seconds = ttl_seconds
+        self.limit_bytes = limit_bytes
+        self._lock = threading.Lock()
+
+        # Counters
+        self.writes = 0
+        self.dedup_hits = 0
+        self.ttl_evictions = 0
+        self.quota_evictions = 0
+        self.bytes_used = 0  # Exact after each sweep, kept up to date by save() in between
+        self.files = 0
+        self.last_sweep_at: Optional[float] = None
+        self.last_sweep_seconds = 0.0
+
+    def _path(self, digest: str) -> str:
+        # Two-character subdirectories keep each directory small
+        return os.path.join(self.directory, digest[:2], f"{digest}.png")
+
+    def path_for_url(self, url: str) -> Optional[str]:
+        """File behind a URL returned by save(), or None for other URLs"""
+        prefix = f"{self.url_prefix}/"
+        match = _URL_NAME.fullmatch(url[len(prefix):]) if url.startswith(prefix) else None
+        if match is None:
+            return None
+        return self._path(match.group(1))
+
+    def exists(self, url: str) -> bool:
+        """Whether a preview URL still has its file (it may have been swept)"""
+        path = self.path_for_url(url)
+        return path is not None and os.path.isfile(path)
+
+    def save(self, preview_bytes: bytes) -> str:
+        """
+        Store a preview PNG, reusing the file if the same bytes were saved before
+
+        Returns:
+            URL path of the file, e.g. "/uploads/previews/3f/3f2a...e5.png"
+        """
+        digest = hashlib.sha256(preview_bytes).hexdigest()
+        path = self._path(digest)
+        url = f"{self.url_prefix}/{digest[:2]}/{digest}.png"
+
+        try:
+            os.utime(path)  # Already stored: mark as recently used
+            with self._lock:
+                self.dedup_hits += 1
+            return url
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file then rename, so readers never see half a file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(preview_bytes)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.writes += 1
+            self.files += 1
+            self.bytes_used += len(preview_bytes)
+        return url
+
+    def _list_files(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every stored preview, including old-style ones"""
+        entries = []
+
+        def add(path: str) -> None:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return  # Removed meanwhile
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".png"):
+                    add(os.path.join(root, name))
+
+        # Flat preview_<user>_<random>.png files from before the sharded layout
+        parent = os.path.dirname(self.directory)
+        if os.path.isdir(parent):
+            for entry in os.scandir(parent):
+                if entry.name.startswith("preview_") and entry.name.endswith(".png") and entry.is_file():
+                    add(entry.path)
+
+        return entries
+
+    def _remove(self, path: str, mtime: float) -> bool:
+        try:
+            # Skip files saved again since they were listed
+            if os.stat(path).st_mtime != mtime:
+                return False
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def sweep(self, now: Optional[float] = None, keep: Iterable[str] = ()) -> None:
+        """
+        Delete expired previews, then least recently used ones until under the quota
+
+        Args:
+            keep: URLs (as returned by save) whose files must stay
+        """
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        entries = self._list_files()
+        entries.sort()  # Oldest first
+        keep_paths: Set[str] = {path for path in map(self.path_for_url, keep) if path}
+
+        total = sum(size for _, size, _ in entries)
+        ttl_evictions = quota_evictions = 0
+        kept = len(entries)
+
+        for mtime, size, path in entries:
+            expired = now - mtime > self.ttl_seconds
+            if not expired and total <= self.limit_bytes:
+                break  # Everything after this is newer and fits
+            if path in keep_paths:
+                continue
+            if self._remove(path, mtime):
+                total -= size
+                kept -= 1
+                if expired:
+                    ttl_evictions += 1
+                else:
+                    quota_evictions += 1
+
+        with self._lock:
+            self.ttl_evictions += ttl_evictions
+            self.quota_evictions += quota_evictions
+            self.bytes_used = total
+            self.files = kept
+            self.last_sweep_at = now
+            self.last_sweep_seconds = time.perf_counter() - started
+
+        if ttl_evictions or quota_evictions:
+            logger.info(
+                "Preview sweep removed %d expired and %d over-quota files, %d bytes left",
+                ttl_evictions, quota_evictions, total
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Disk usage and eviction counters for the /metrics endpoint"""
+        with self._lock:
+            return {
+                "files": self.files,
+                "bytes_used": self.bytes_used,
+                "limit_bytes": self.limit_bytes,
+                "writes": self.writes,
+                "dedup_hits": self.dedup_hits,
+                "ttl_evictions": self.ttl_evictions,
+                "quota_evictions": self.quota_evictions,
+                "last_sweep_at": self.last_sweep_at,
+                "last_sweep_ms": self.last_sweep_seconds * 1000,
+            }
+
+
+# Shared by the image routes and import jobs
+preview_store = PreviewStore(
+    PREVIEW_DIR,
+    "/uploads/previews",
+    PREVIEW_TTL_HOURS * 3600,
+    PREVIEW_DISK_MB * 1024 * 1024,
+)
+
+
+def save_preview(preview_bytes: bytes) -> str:
+    """
+    Write a preview PNG to the uploads directory (deduplicated by content)
+
+    Returns:
+        URL path of the saved file, e.g. "/uploads/previews/3f/3f2a9c...e5.png"
+    """
+    return preview_store.save(preview_bytes)
+
+
+# ============= Background Sweeper =============
+
+_stop = threading.Event()
+_sweeper: Optional[threading.Thread] = None
+
+
+def _run_sweeper(interval: float, in_use: Optional[Callable[[], Iterable[str]]]) -> None:
+    while True:
+        try:
+            preview_store.sweep(keep=in_use() if in_use else ())
+        except Exception:
+            logger.exception("Preview sweep failed")
+        if _stop.wait(interval):
+            return
+
+
+def start_sweeper(
+    interval: float = PREVIEW_SWEEP_SECONDS,
+    in_use: Optional[Callable[[], Iterable[str]]] = None
+) -> None:
+    """
+    Start the sweeper thread (called on API startup, sweeps straight away)
+
+    Args:
+        in_use: Called before each sweep, returns preview URLs to keep
+    """
+    global _sweeper
+    if _sweeper is not None and _sweeper.is_alive():
+        return
+    _stop.clear()
+    _sweeper = threading.Thread(target=_run_sweeper, args=(interval, in_use), name="preview-sweeper", daemon=True)
+    _sweeper.start()
+
+
+def stop_sweeper() -> None:
+    """Ask the sweeper thread to stop (called on API shutdown)"""
+    _stop.set()
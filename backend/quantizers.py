@@ -0,0 +1,236 @@
+"""
+Quantization Engines
+Registry of the ways an image can be reduced to num_colors
+
+Every engine takes an RGB image and a color count and returns
+(indices, palette_rgb): a grid of palette slots plus the palette. The
+palette may contain unused or duplicate slots; image_processor cleans
+that up with compact_palette().
+
+    median_cut     Pillow median cut: splits the color box with most pixels
+    max_coverage   Pillow maximum coverage: splits the widest color box
+    fast_octree    Pillow fast octree (default, fastest)
+    libimagequant  Pillow + libimagequant, best quality (only if Pillow was
+                   built with it, see available_quantizers())
+    kmeans         NumPy mini-batch k-means on a pixel sample, fixed seed
+
+Each run is timed and its error measured (mean squared RGB error per
+channel), and QuantizerStats keeps per-engine totals for /metrics, so
+engines can be compared on real traffic.
+
+Configuration (environment variables):
+    KMEANS_SAMPLE_SIZE   Pixels sampled for k-means training (default: 10000)
+    KMEANS_ITERATIONS    Mini-batch steps (default: 50)
+    KMEANS_SEED          Random seed, same image = same palette (default: 0)
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image, features
+
+from color_science import squared_euclidean
+
+KMEANS_SAMPLE_SIZE = int(os.getenv("KMEANS_SAMPLE_SIZE", "10000"))
+KMEANS_ITERATIONS = int(os.getenv("KMEANS_ITERATIONS", "50"))
+KMEANS_BATCH_SIZE = 1024
+KMEANS_SEED = int(os.getenv("KMEANS_SEED", "0"))
+
+DEFAULT_QUANTIZER = "fast_octree"
+
+# name -> function(image, num_colors) -> (indices, palette_rgb)
+QuantizerFn = Callable[[Image.Image, int], Tuple[np.ndarray, np.ndarray]]
+QUANTIZERS: Dict[str, QuantizerFn] = {}
+
+
+@dataclass
+class QuantizeResult:
+    """Output of one quantization run, with its cost and quality"""
+    indices: np.ndarray  # 2D array of palette indices
+    palette: List[str]  # Hex colors, sorted by RGB
+    engine: str
+    seconds: float
+    mse: float  # Mean squared RGB error per channel (0 = exact)
+
+    def report(self) -> Dict[str, Any]:
+        """Timing and error as a plain dict (small enough to send between processes)"""
+        return {"engine": self.engine, "seconds": self.seconds, "mse": self.mse}
+
+
+def register_quantizer(name: str) -> Callable[[QuantizerFn], QuantizerFn]:
+    """
+    Decorator adding a function to the registry
+
+    Example:
+        @register_quantizer("my_engine")
+        def my_engine(image, num_colors):
+            return indices, palette_rgb
+    """
+    def decorator(fn: QuantizerFn) -> QuantizerFn:
+        QUANTIZERS[name] = fn
+        return fn
+    return decorator
+
+
+def available_quantizers() -> List[str]:
+    """Names of the engines that can run in this installation"""
+    return list(QUANTIZERS)
+
+
+def get_quantizer(name: str) -> QuantizerFn:
+    """
+    Look up an engine by name
+
+    Raises:
+        ValueError: if there is no engine with that name
+    """
+    if name not in QUANTIZERS:
+        raise ValueError(f"Unknown quantizer {name!r}. Choose from: {', '.join(QUANTIZERS)}")
+    return QUANTIZERS[name]
+
+
+def quantization_error(pixels: np.ndarray, indices: np.ndarray, palette_rgb: np.ndarray) -> float:
+    """Mean squared error per channel between pixels and their palette colors"""
+    diff = pixels.astype(np.int32) - palette_rgb[indices].astype(np.int32)
+    return float(np.mean(diff * diff))
+
+
+# ============= Pillow Engines =============
+
+def _pillow_quantize(image: Image.Image, num_colors: int, method: Image.Quantize) -> Tuple[np.ndarray, np.ndarray]:
+    # The quantized image is already a grid of palette indices,
+    # so read them out directly instead of converting back to RGB
+    quantized = image.quantize(colors=num_colors, method=method)
+    indices = np.asarray(quantized)
+    palette_rgb = np.array(quantized.getpalette(), dtype=np.uint8).reshape(-1, 3)
+    return indices, palette_rgb
+
+
+@register_quantizer("median_cut")
+def median_cut(image: Image.Image, num_colors: int) -> Tuple[np.ndarray, np.ndarray]:
+    return _pillow_quantize(image, num_colors, Image.Quantize.MEDIANCUT)
+
+
+@register_quantizer("max_coverage")
+def max_coverage(image: Image.Image, num_colors: int) -> Tuple[np.ndarray, np.ndarray]:
+    return _pillow_quantize(image, num_colors, Image.Quantize.MAXCOVERAGE)
+
+
+@register_quantizer("fast_octree")
+def fast_octree(image: Image.Image, num_colors: int) -> Tuple[np.ndarray, np.ndarray]:
+    return _pillow_quantize(image, num_colors, Image.Quantize.FASTOCTREE)
+
+
+# libimagequant is an optional Pillow build feature
+if features.check_feature("libimagequant"):
+    @register_quantizer("libimagequant")
+    def libimagequant(image: Image.Image, num_colors: int) -> Tuple[np.ndarray, np.ndarray]:
+        return _pillow_quantize(image, num_colors, Image.Quantize.LIBIMAGEQUANT)
+
+
+# ============= K-Means Engine =============
+
+def _kmeans_plus_plus(sample: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """Pick k starting centers, each new one far from those already picked"""
+    centers = np.empty((k, 3), dtype=np.float64)
+    centers[0] = sample[rng.integers(len(sample))]
+    closest = squared_euclidean(sample, centers[:1]).ravel()
+
+    for i in range(1, k):
+        total = closest.sum()
+        if total == 0:
+            centers[i:] = centers[0]  # Fewer distinct colors than k
+            break
+        centers[i] = sample[rng.choice(len(sample), p=closest / total)]
+        closest = np.minimum(closest, squared_euclidean(sample, centers[i:i + 1]).ravel())
+
+    return centers
+
+
+@register_quantizer("kmeans")
+def kmeans(image: Image.Image, num_colors: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mini-batch k-means (Sculley 2010) in RGB
+
+    Trains on a random sample of KMEANS_SAMPLE_SIZE pixels in batches,
+    moving each center towards the mean of its batch pixels with a
+    per-center learning rate of 1/(pixels seen). Every distinct color of
+    the full image is then assigned to its nearest center once.
+    """
+    pixels = np.asarray(image).reshape(-1, 3)
+    rng = np.random.default_rng(KMEANS_SEED)
+
+    # Assign distinct colors, not pixels (far fewer at pattern sizes)
+    packed = (pixels[:, 0].astype(np.uint32) << 16) | (pixels[:, 1].astype(np.uint32) << 8) | pixels[:, 2]
+    unique, inverse = np.unique(packed, return_inverse=True)
+    unique_rgb = np.stack([(unique >> 16) & 0xFF, (unique >> 8) & 0xFF, unique & 0xFF], axis=1)
+    height, width = np.asarray(image).shape[:2]
+
+    if len(unique) <= num_colors:
+        # Nothing to reduce: every color gets its own slot
+        return inverse.reshape(height, width), unique_rgb.astype(np.uint8)
+
+    sample_size = min(KMEANS_SAMPLE_SIZE, len(pixels))
+    sample = pixels[rng.choice(len(pixels), sample_size, replace=False)].astype(np.float64)
+    centers = _kmeans_plus_plus(sample, num_colors, rng)
+    seen = np.zeros(num_colors)
+
+    for _ in range(KMEANS_ITERATIONS):
+        batch = sample[rng.integers(0, sample_size, KMEANS_BATCH_SIZE)]
+        nearest_center = squared_euclidean(batch, centers).argmin(axis=1)
+
+        batch_counts = np.bincount(nearest_center, minlength=num_colors)
+        hit = batch_counts > 0
+        sums = np.stack(
+            [np.bincount(nearest_center, weights=batch[:, c], minlength=num_colors) for c in range(3)],
+            axis=1
+        )
+        seen += batch_counts
+        rate = batch_counts[hit] / seen[hit]
+        centers[hit] += rate[:, None] * (sums[hit] / batch_counts[hit, None] - centers[hit])
+
+    palette_rgb = np.clip(np.rint(centers), 0, 255).astype(np.uint8)
+    color_slots = squared_euclidean(unique_rgb.astype(np.float64), palette_rgb.astype(np.float64)).argmin(axis=1)
+    return color_slots[inverse].reshape(height, width), palette_rgb
+
+
+# ============= Statistics =============
+
+class QuantizerStats:
+    """
+    Per-engine run counts, average time and average error
+
+    Usage:
+        quantizer_stats.record(result.report())
+        quantizer_stats.stats()   # {"fast_octree": {"runs": 3, "avg_ms": 4.1, "avg_mse": 92.5}}
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, List[float]] = {}  # engine -> [runs, seconds, mse]
+
+    def record(self, report: Dict[str, Any]) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(report["engine"], [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += report["seconds"]
+            totals[2] += report["mse"]
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals for the /metrics endpoint"""
+        with self._lock:
+            return {
+                engine: {
+                    "runs": runs,
+                    "avg_ms": seconds / runs * 1000,
+                    "avg_mse": mse / runs,
+                }
+                for engine, (runs, seconds, mse) in self._totals.items()
+            }
+
+
+# Shared by the image routes (workers send their reports back with the result)
+quantizer_stats = QuantizerStats()
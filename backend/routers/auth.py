@@ -3,32 +3,44 @@ Authentication Routes
 Handles user registration, login, and profile management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from database import get_db
 import models
 import schemas
 from auth import (
-    hash_password,
-    authenticate_user,
+    hash_password_async,
+    authenticate_user_async,
     create_access_token,
-    get_current_user
+    get_current_user,
+    invalidate_user
 )
+from password_pool import client_address
 
 # Create router
 router = APIRouter()
 
 
+def client_ip(request: Request) -> str:
+    """
+    Client address used for the per-client password hashing limit
+    (X-Forwarded-For is used when the request came through a trusted proxy)
+    """
+    peer = request.client.host if request.client else None
+    return client_address(peer, request.headers.get("x-forwarded-for"))
+
+
 @router.post("/register", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: schemas.UserCreate, request: Request, db: Session = Depends(get_db)):
     """
     Register a new user account
 
     Process:
     1. Check if email already exists
     2. Check if username already exists
-    3. Hash the password
+    3. Hash the password (in the password pool, see password_pool.py)
     4. Create user in database
     5. Return user data (without password)
 
@@ -42,7 +54,9 @@ def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
     """
 
     # Check if email already registered
-    existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
+    existing_user = await run_in_threadpool(
+        lambda: db.query(models.User).filter(models.User.email == user_data.email).first()
+    )
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -50,7 +64,9 @@ def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
         )
 
     # Check if username already taken
-    existing_username = db.query(models.User).filter(models.User.username == user_data.username).first()
+    existing_username = await run_in_threadpool(
+        lambda: db.query(models.User).filter(models.User.username == user_data.username).first()
+    )
     if existing_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -61,24 +77,25 @@ def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
     new_user = models.User(
         email=user_data.email,
         username=user_data.username,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await hash_password_async(user_data.password, client_ip(request)),
         is_active=True
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)  # Get the ID and timestamps from database
+    await run_in_threadpool(db.commit)
+    await run_in_threadpool(db.refresh, new_user)  # Get the ID and timestamps from database
 
     return new_user
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(login_data: schemas.UserLogin, db: Session = Depends(get_db)):
+async def login(login_data: schemas.UserLogin, request: Request, db: Session = Depends(get_db)):
     """
     Login and receive JWT token
 
     Process:
-    1. Verify email and password
+    1. Verify email and password (in the password pool; hashes made with
+       an older BCRYPT_ROUNDS are upgraded here)
     2. Generate JWT token
     3. Return token and user data
 
@@ -103,10 +120,13 @@ def login(login_data: schemas.UserLogin, db: Session = Depends(get_db)):
 
     Use token in subsequent requests:
         Headers: Authorization: Bearer <access_token>
+
+    Returns 429 if this client has too many logins in progress and 503
+    if password checking is at capacity (both with Retry-After).
     """
 
     # Authenticate user
-    user = authenticate_user(db, login_data.email, login_data.password)
+    user = await authenticate_user_async(db, login_data.email, login_data.password, client_ip(request))
 
     if not user:
         raise HTTPException(
@@ -143,6 +163,20 @@ def get_current_user_profile(current_user: models.User = Depends(get_current_use
     return current_user
 
 
+def load_own_user(db: Session, current_user: models.User) -> models.User:
+    """
+    Load the current user into this request's session so it can be changed
+    (get_current_user returns a cached, detached copy)
+    """
+    user = db.query(models.User).filter(models.User.id == current_user.id).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
+
 @router.put("/me", response_model=schemas.UserResponse)
 def update_profile(
     username: str,
@@ -169,8 +203,36 @@ def update_profile(
                 detail="Username already taken"
             )
 
-    current_user.username = username
+    user = load_own_user(db, current_user)
+    user.username = username
     db.commit()
-    db.refresh(current_user)
+    db.refresh(user)
+    invalidate_user(user.id)
 
-    return current_user
+    return user
+
+
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+def deactivate_account(
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Deactivate current user's account
+
+    The account and its designs are kept, but the user can no longer log
+    in and existing tokens stop working.
+
+    Requires authentication
+
+    Example request:
+        DELETE /auth/me
+        Headers: Authorization: Bearer <token>
+    """
+
+    user = load_own_user(db, current_user)
+    user.is_active = False
+    db.commit()
+    invalidate_user(user.id)
+
+    return None  # 204 No Content
@@ -1,25 +1,283 @@
 """
 Design Management Routes
 CRUD operations for cross-stitch designs
-"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+These routes are fully async: they use AsyncSession (get_async_db), so a
+request waiting on the database doesn't hold a thread. CPU work such as
+rendering thumbnails runs in the thread pool.
+"""
 
-from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy import DateTime, Row, Select, String, bindparam, delete, func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.types import TypeDecorator
+from datetime import datetime
+from typing import List, Optional, Tuple
+import base64
+import json
+import os
+
+from database import get_async_db
 import models
 import schemas
+import design_codec
 from auth import get_current_user
+from caching import TTLCache
+from thumbnails import THUMBNAIL_CACHE_CONTROL, thumbnail_file, thumbnail_for, thumbnail_url
 
 router = APIRouter()
 
+# How long a user's total design count may be served from cache (seconds)
+DESIGN_COUNT_TTL = int(os.getenv("DESIGN_COUNT_TTL", "60"))
+_design_counts = TTLCache(maxsize=10000, ttl=DESIGN_COUNT_TTL)
+
+# Columns of schemas.DesignSummary (everything except the grid data)
+SUMMARY_COLUMNS = (
+    models.Design.id,
+    models.Design.title,
+    models.Design.description,
+    models.Design.width,
+    models.Design.height,
+    models.Design.grid_width,
+    models.Design.grid_height,
+    models.Design.thumbnail_path,
+    models.Design.owner_id,
+    models.Design.created_at,
+    models.Design.updated_at,
+    models.Design.version,
+)
+
+
+# ============= Concurrency Helpers =============
+
+def version_conflict(current_version: int) -> HTTPException:
+    """409 error telling the client to reload the design"""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Design was changed by another save (current version: {current_version})"
+    )
+
+
+async def commit_versioned(db: AsyncSession, design: models.Design) -> None:
+    """
+    Commit changes to a design and reload it
+
+    SQLAlchemy only updates the row if its version hasn't moved since we
+    loaded it; if another request saved in between we answer 409.
+    """
+    try:
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        await db.refresh(design)
+        raise version_conflict(design.version)
+    await db.refresh(design)
+
+
+# ============= Ownership Helpers =============
+#
+# Reads and writes filter on "id = ? AND owner_id = ?", so the usual case
+# (your own design) takes one query. Only when nothing matched do we look
+# the design up again to tell "doesn't exist" (404) from "not yours" (403).
+
+def miss_error(
+    row: Optional[Row],
+    owner_id: int,
+    action: str,
+    expected_version: Optional[int] = None
+) -> HTTPException:
+    """
+    Error for a design the user can't change, given its (owner_id, version) row
+
+    Returns:
+        404 if there is no row, 403 if it belongs to someone else,
+        409 if expected_version was given and the design has moved on
+    """
+    if row is not None and row.owner_id != owner_id:
+        return HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this design"
+        )
+    if row is not None and expected_version is not None and expected_version != row.version:
+        return version_conflict(row.version)
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Design not found"
+    )
+
+
+async def design_miss_error(
+    db: AsyncSession,
+    design_id: int,
+    owner_id: int,
+    action: str,
+    expected_version: Optional[int] = None
+) -> HTTPException:
+    """
+    Explain why an owner-scoped query matched no design (see miss_error)
+    """
+    row = (await db.execute(
+        select(models.Design.owner_id, models.Design.version)
+        .where(models.Design.id == design_id)
+    )).first()
+    if row is not None and row.owner_id == owner_id and expected_version is not None:
+        # Ours, so the version check is what failed (even if it matches by now)
+        return version_conflict(row.version)
+    return miss_error(row, owner_id, action, expected_version)
+
+
+async def get_owned_design(
+    db: AsyncSession,
+    design_id: int,
+    owner_id: int,
+    action: str = "access"
+) -> models.Design:
+    """
+    Load a design owned by owner_id in one query
+
+    Raises:
+        HTTPException: 404 if it doesn't exist, 403 if it isn't owner_id's
+    """
+    design = await db.scalar(
+        select(models.Design)
+        .where(models.Design.id == design_id, models.Design.owner_id == owner_id)
+    )
+    if design is None:
+        raise await design_miss_error(db, design_id, owner_id, action)
+    return design
+
+
+# ============= Pagination Helpers =============
+
+class CursorTimestamp(TypeDecorator):
+    """
+    Type of the created_at value in a cursor query
+
+    SQLite has no timestamp type: it compares created_at as text. The
+    server default (CURRENT_TIMESTAMP) stores "2024-01-01 12:00:00", but
+    SQLAlchemy would send "2024-01-01 12:00:00.000000", which sorts after
+    it, so rows from the cursor's own second would come back again. On
+    SQLite this type sends the value in the stored format instead; other
+    databases get a regular timestamp.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime(timezone=True))
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name != "sqlite" or value is None:
+            return value
+        timespec = "microseconds" if value.microsecond else "seconds"
+        return value.replace(tzinfo=None).isoformat(" ", timespec=timespec)
+
+
+def encode_cursor(design: models.Design) -> str:
+    """
+    Build an opaque cursor pointing just after this design
+
+    Listing is ordered by (created_at, id) descending, so the pair
+    identifies a position even when several designs share a timestamp.
+    """
+    raw = json.dumps({"c": design.created_at.isoformat(), "i": design.id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Read a cursor made by encode_cursor
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(raw["c"]), int(raw["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def paginate_designs(
+    db: AsyncSession,
+    query: Select,
+    cursor: Optional[str],
+    skip: int,
+    limit: int
+) -> Tuple[List[models.Design], Optional[str]]:
+    """
+    Apply keyset pagination to a designs query and run it
+
+    With a cursor, rows are found by seeking the (owner_id, created_at, id)
+    index, so every page costs the same as the first one. Without a cursor
+    the old skip/limit offset paging still works.
+
+    Returns:
+        Tuple of (designs, next_cursor) - next_cursor is None on the last page
+    """
+    if cursor:
+        created_at, design_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(models.Design.created_at, models.Design.id)
+            < tuple_(bindparam("cursor_created_at", created_at, type_=CursorTimestamp()), design_id)
+        )
+    elif skip:
+        query = query.offset(skip)
+
+    # Fetch one extra row to know whether there is a next page
+    result = await db.execute(
+        query
+        .order_by(models.Design.created_at.desc(), models.Design.id.desc())
+        .limit(limit + 1)
+    )
+    designs = list(result.scalars().all())
+
+    if len(designs) > limit:
+        designs = designs[:limit]
+        return designs, encode_cursor(designs[-1])
+    return designs, None
+
+
+async def count_designs(db: AsyncSession, owner_id: int) -> int:
+    """
+    Total number of designs a user owns (cached for DESIGN_COUNT_TTL seconds)
+    """
+    total = _design_counts.get(owner_id)
+    if total is None:
+        total = await db.scalar(
+            select(func.count(models.Design.id))
+            .where(models.Design.owner_id == owner_id)
+        )
+        _design_counts.set(owner_id, total)
+    return total
+
+
+def invalidate_design_count(owner_id: int) -> None:
+    """Forget a user's cached design count (call after create/delete)"""
+    _design_counts.discard(owner_id)
+
+
+def design_count_stats() -> dict:
+    """Cache counters for the /metrics endpoint"""
+    return _design_counts.stats()
+
+
 
 @router.post("/", response_model=schemas.DesignResponse, status_code=status.HTTP_201_CREATED)
-def create_design(
+async def create_design(
     design_data: schemas.DesignCreate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new design
@@ -46,20 +304,25 @@ def create_design(
         design_data=design_data.design_data,
         owner_id=current_user.id
     )
+    new_design.thumbnail_path = await run_in_threadpool(thumbnail_for, new_design)
 
     db.add(new_design)
-    db.commit()
-    db.refresh(new_design)
+    await db.commit()
+    await db.refresh(new_design)
+    invalidate_design_count(current_user.id)
 
     return new_design
 
 
 @router.get("/", response_model=List[schemas.DesignResponse])
-def get_my_designs(
+async def get_my_designs(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all designs for current user
@@ -67,61 +330,396 @@ def get_my_designs(
     Requires authentication
 
     Query parameters:
-        - skip: Number of records to skip (for pagination)
+        - skip: Number of records to skip (offset pagination)
         - limit: Maximum number of records to return
+        - cursor: Value of X-Next-Cursor from the previous page (keyset pagination)
+        - include_total: Also return the total count in X-Total-Count
+
+    Response headers:
+        - X-Next-Cursor: Cursor for the next page (absent on the last page)
+        - X-Total-Count: Total designs owned (only with include_total=true)
 
     Example request:
-        GET /designs?skip=0&limit=20
+        GET /designs?limit=20&cursor=eyJjIjogIjIwMjQt...
         Headers: Authorization: Bearer <token>
     """
 
-    designs = db.query(models.Design)\
-        .filter(models.Design.owner_id == current_user.id)\
-        .order_by(models.Design.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    query = select(models.Design)\
+        .where(models.Design.owner_id == current_user.id)
+    designs, next_cursor = await paginate_designs(db, query, cursor, skip, limit)
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        response.headers["X-Total-Count"] = str(await count_designs(db, current_user.id))
 
     return designs
 
 
-@router.get("/{design_id}", response_model=schemas.DesignResponse)
-def get_design(
-    design_id: int,
+@router.get("/summary", response_model=schemas.DesignSummaryList)
+async def get_my_design_summaries(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get a specific design by ID
+    Get lightweight summaries of all designs for current user
+
+    Like GET /designs but without design_data: only the columns the
+    gallery needs are selected, so grid data never leaves the database.
 
     Requires authentication
-    User can only access their own designs
+
+    Query parameters:
+        - limit: Maximum number of records to return
+        - cursor: next_cursor from the previous page
+        - include_total: Also count all designs (cached briefly)
+
+    Example request:
+        GET /designs/summary?limit=20&include_total=true
+        Headers: Authorization: Bearer <token>
+
+    Example response:
+        {
+            "designs": [{"id": 7, "title": "Heart", ...}, ...],
+            "next_cursor": "eyJjIjogIjIwMjQt...",
+            "total": 143
+        }
     """
 
-    design = db.query(models.Design).filter(models.Design.id == design_id).first()
+    query = select(models.Design)\
+        .options(load_only(*SUMMARY_COLUMNS))\
+        .where(models.Design.owner_id == current_user.id)
+    designs, next_cursor = await paginate_designs(db, query, cursor, 0, limit)
 
-    if not design:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Design not found"
+    return {
+        "designs": designs,
+        "next_cursor": next_cursor,
+        "total": await count_designs(db, current_user.id) if include_total else None,
+    }
+
+
+# ============= Bulk Operations =============
+#
+# For tools that manage many designs (migrations, importing a pattern
+# library). Each request is one transaction with a fixed number of
+# statements, however many items it has. Items are checked one by one:
+# ones that fail (not found, not yours, stale version) are reported in
+# their result and the rest still go through.
+
+def bulk_response(results: List[schemas.DesignBulkResult]) -> schemas.DesignBulkResponse:
+    """Wrap per-item results with success/failure counts"""
+    succeeded = sum(1 for result in results if result.status < 400)
+    return schemas.DesignBulkResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+def bulk_failure(index: int, design_id: int, error: HTTPException) -> schemas.DesignBulkResult:
+    """Per-item result for an error the single-design endpoint would raise"""
+    return schemas.DesignBulkResult(index=index, id=design_id, status=error.status_code, detail=error.detail)
+
+
+def duplicate_failure(index: int, design_id: int) -> schemas.DesignBulkResult:
+    return schemas.DesignBulkResult(
+        index=index,
+        id=design_id,
+        status=status.HTTP_400_BAD_REQUEST,
+        detail="Design is listed more than once"
+    )
+
+
+def stage_new_designs(items: List[schemas.DesignCreate], owner_id: int) -> List[dict]:
+    """
+    Column values for new designs: grids encoded, thumbnails rendered
+    Runs in the thread pool (CPU work)
+    """
+    rows = []
+    for item in items:
+        staged = models.Design(design_data=item.design_data)
+        rows.append({
+            "title": item.title,
+            "description": item.description,
+            "width": item.width,
+            "height": item.height,
+            "design_blob": staged.design_blob,
+            "_design_data": staged._design_data,
+            "grid_width": staged.grid_width,
+            "grid_height": staged.grid_height,
+            "thumbnail_path": thumbnail_for(staged),
+            "owner_id": owner_id,
+        })
+    return rows
+
+
+@router.post("/bulk", response_model=schemas.DesignBulkResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_create_designs(
+    payload: schemas.DesignBulkCreate,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create up to MAX_BULK_DESIGNS designs in one transaction
+
+    All rows go in with one multi-row INSERT ... RETURNING. Results list
+    the new designs (without design_data) in request order.
+
+    All or nothing: the request is validated as a whole, so one invalid
+    item rejects it with 422 and no design is created. Every result
+    therefore has status 201 (unlike bulk update and delete, which
+    report failures per item).
+
+    Requires authentication
+
+    Example request:
+        POST /designs/bulk
+        Headers: Authorization: Bearer <token>
+        {
+            "designs": [
+                {"title": "Heart", "width": 50, "height": 50, "design_data": "{...}"},
+                {"title": "Star", "width": 40, "height": 40, "design_data": "{...}"}
+            ]
+        }
+
+    Example response:
+        {
+            "results": [{"index": 0, "id": 12, "status": 201, "design": {...}}, ...],
+            "succeeded": 2,
+            "failed": 0
+        }
+    """
+
+    rows = await run_in_threadpool(stage_new_designs, payload.designs, current_user.id)
+
+    # sort_by_parameter_order: RETURNING rows come back in the order of `rows`
+    # (on PostgreSQL still one batched INSERT; SQLite inserts row by row)
+    result = await db.scalars(
+        insert(models.Design).returning(models.Design, sort_by_parameter_order=True),
+        rows
+    )
+    designs = result.all()
+    await db.commit()
+    invalidate_design_count(current_user.id)
+
+    return bulk_response([
+        schemas.DesignBulkResult(
+            index=index,
+            id=design.id,
+            status=status.HTTP_201_CREATED,
+            design=schemas.DesignSummary.model_validate(design)
         )
+        for index, design in enumerate(designs)
+    ])
 
-    # Check ownership
-    if design.owner_id != current_user.id:
+
+@router.patch("/bulk", response_model=schemas.DesignBulkResponse)
+async def bulk_update_designs(
+    payload: schemas.DesignBulkUpdate,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Change the title and/or description of up to MAX_BULK_DESIGNS designs
+
+    One SELECT ... FOR UPDATE checks every item (exists, yours, version),
+    then one executemany UPDATE changes the ones that passed. Fields left
+    out (or null) keep their value, like PUT /designs/{id}.
+
+    Requires authentication
+
+    Example request:
+        PATCH /designs/bulk
+        Headers: Authorization: Bearer <token>
+        {
+            "designs": [
+                {"id": 12, "title": "Heart (large)", "version": 3},
+                {"id": 13, "description": "From the 2023 collection"}
+            ]
+        }
+
+    Items fail with 404, 403 or 409 (version given and stale) without
+    affecting the others.
+    """
+
+    items = payload.designs
+
+    # Lock the rows so nobody saves them between the check and the update
+    rows = {
+        row.id: row
+        for row in (await db.execute(
+            select(models.Design.id, models.Design.owner_id, models.Design.version)
+            .where(models.Design.id.in_([item.id for item in items]))
+            .with_for_update()
+        )).all()
+    }
+
+    results: List[Optional[schemas.DesignBulkResult]] = [None] * len(items)
+    accepted = {}  # design id -> index
+    changes = []
+    seen = set()
+    for index, item in enumerate(items):
+        row = rows.get(item.id)
+        if item.id in seen:
+            results[index] = duplicate_failure(index, item.id)
+        elif row is None or row.owner_id != current_user.id or (
+            item.version is not None and item.version != row.version
+        ):
+            results[index] = bulk_failure(index, item.id, miss_error(row, current_user.id, "update", item.version))
+        else:
+            accepted[item.id] = index
+            if item.title is not None or item.description is not None:
+                changes.append({"b_id": item.id, "b_title": item.title, "b_description": item.description})
+        seen.add(item.id)
+
+    if changes:
+        designs_table = models.Design.__table__
+        await db.execute(
+            update(designs_table)
+            .where(designs_table.c.id == bindparam("b_id"))
+            .values(
+                title=func.coalesce(bindparam("b_title"), designs_table.c.title),
+                description=func.coalesce(bindparam("b_description"), designs_table.c.description),
+                version=designs_table.c.version + 1,
+            ),
+            changes
+        )
+
+    if accepted:
+        updated = await db.scalars(
+            select(models.Design)
+            .options(load_only(*SUMMARY_COLUMNS))
+            .where(models.Design.id.in_(list(accepted)))
+        )
+        for design in updated:
+            index = accepted[design.id]
+            results[index] = schemas.DesignBulkResult(
+                index=index,
+                id=design.id,
+                status=status.HTTP_200_OK,
+                design=schemas.DesignSummary.model_validate(design)
+            )
+    await db.commit()
+
+    return bulk_response(results)
+
+
+@router.post("/bulk/delete", response_model=schemas.DesignBulkResponse)
+async def bulk_delete_designs(
+    payload: schemas.DesignBulkDelete,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Delete up to MAX_BULK_DESIGNS designs in one transaction
+
+    One DELETE ... WHERE id IN (...) AND owner_id = ? RETURNING id removes
+    everything the user owns; only ids it didn't match are looked up again
+    to report 404 or 403. (POST rather than DELETE because DELETE requests
+    shouldn't carry a body.)
+
+    Requires authentication
+
+    Example request:
+        POST /designs/bulk/delete
+        Headers: Authorization: Bearer <token>
+        {"ids": [12, 13, 99]}
+
+    Example response:
+        {
+            "results": [
+                {"index": 0, "id": 12, "status": 204},
+                {"index": 1, "id": 13, "status": 204},
+                {"index": 2, "id": 99, "status": 404, "detail": "Design not found"}
+            ],
+            "succeeded": 2,
+            "failed": 1
+        }
+    """
+
+    ids = list(dict.fromkeys(payload.ids))
+
+    deleted = set((await db.scalars(
+        delete(models.Design)
+        .where(models.Design.id.in_(ids), models.Design.owner_id == current_user.id)
+        .returning(models.Design.id)
+        .execution_options(synchronize_session=False)
+    )).all())
+
+    missing = [design_id for design_id in ids if design_id not in deleted]
+    rows = {}
+    if missing:
+        rows = {
+            row.id: row
+            for row in (await db.execute(
+                select(models.Design.id, models.Design.owner_id, models.Design.version)
+                .where(models.Design.id.in_(missing))
+            )).all()
+        }
+    await db.commit()
+    if deleted:
+        invalidate_design_count(current_user.id)
+
+    results = []
+    seen = set()
+    for index, design_id in enumerate(payload.ids):
+        if design_id in seen:
+            results.append(duplicate_failure(index, design_id))
+        elif design_id in deleted:
+            results.append(schemas.DesignBulkResult(index=index, id=design_id, status=status.HTTP_204_NO_CONTENT))
+        else:
+            results.append(bulk_failure(index, design_id, miss_error(rows.get(design_id), current_user.id, "delete")))
+        seen.add(design_id)
+
+    return bulk_response(results)
+
+
+@router.get("/thumbnails/{filename}")
+def get_thumbnail(filename: str):
+    """
+    Serve a design thumbnail (the URL in a design's thumbnail_path)
+
+    No authentication, so the gallery can use plain <img> tags: names are
+    hashes of the design data and can't be guessed. This is intended:
+    like a share link, anyone given the URL can see the thumbnail (the
+    API only hands it to the design's owner). A name always refers to the
+    same image, so browsers may cache it for a year.
+
+    Example request:
+        GET /designs/thumbnails/3f2a9c0d5e7b41a8c6f0e2d4b8a1c3e5.png
+    """
+    path = thumbnail_file(filename)
+    if path is None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this design"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thumbnail not found"
         )
+    return FileResponse(path, headers={"Cache-Control": THUMBNAIL_CACHE_CONTROL})
+
+
+@router.get("/{design_id}", response_model=schemas.DesignResponse)
+async def get_design(
+    design_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a specific design by ID
+
+    Requires authentication
+    User can only access their own designs
+    """
+
+    design = await get_owned_design(db, design_id, current_user.id, "access")
 
     return design
 
 
 @router.put("/{design_id}", response_model=schemas.DesignResponse)
-def update_design(
+async def update_design(
     design_id: int,
     design_data: schemas.DesignUpdate,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a design
@@ -134,76 +732,184 @@ def update_design(
         Headers: Authorization: Bearer <token>
         {
             "title": "Updated Title",
-            "design_data": "{...new data...}"
+            "design_data": "{...new data...}",
+            "version": 3
         }
-    """
-
-    design = db.query(models.Design).filter(models.Design.id == design_id).first()
 
-    if not design:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Design not found"
-        )
-
-    # Check ownership
-    if design.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this design"
-        )
+    version is optional: when given, the update is rejected with
+    409 Conflict if someone saved the design after that version.
+    """
 
-    # Update fields (only if provided)
+    # Work out the new column values without loading the stored design
+    values = {}
     if design_data.title is not None:
-        design.title = design_data.title
+        values[models.Design.title] = design_data.title
     if design_data.description is not None:
-        design.description = design_data.description
+        values[models.Design.description] = design_data.description
     if design_data.width is not None:
-        design.width = design_data.width
+        values[models.Design.width] = design_data.width
     if design_data.height is not None:
-        design.height = design_data.height
+        values[models.Design.height] = design_data.height
+    staged = None
     if design_data.design_data is not None:
-        design.design_data = design_data.design_data
-
-    db.commit()
-    db.refresh(design)
+        # Encode the grid on an unsaved Design, then copy the storage
+        # columns into the UPDATE. The thumbnail is only rendered once the
+        # UPDATE has matched (below), so rejected saves never write files
+        staged = models.Design(design_data=design_data.design_data)
+        values[models.Design.design_blob] = staged.design_blob
+        values[models.Design._design_data] = staged._design_data
+        values[models.Design.grid_width] = staged.grid_width
+        values[models.Design.grid_height] = staged.grid_height
+        values[models.Design.thumbnail_path] = thumbnail_url(staged)
+
+    if not values:
+        # Nothing to change: just return the design (checking the version)
+        design = await get_owned_design(db, design_id, current_user.id, "update")
+        if design_data.version is not None and design_data.version != design.version:
+            raise version_conflict(design.version)
+        return design
+
+    # One round trip: UPDATE ... WHERE id AND owner_id [AND version] RETURNING *
+    # The version is bumped here because bulk UPDATEs bypass the mapper's
+    # version counter
+    query = update(models.Design)\
+        .where(models.Design.id == design_id, models.Design.owner_id == current_user.id)\
+        .values({**values, models.Design.version: models.Design.version + 1})\
+        .returning(models.Design)\
+        .execution_options(synchronize_session=False)
+    if design_data.version is not None:
+        query = query.where(models.Design.version == design_data.version)
+
+    design = (await db.execute(query)).scalar_one_or_none()
+    if design is None:
+        await db.rollback()
+        raise await design_miss_error(db, design_id, current_user.id, "update", design_data.version)
+
+    if staged is not None:
+        thumbnail_path = await run_in_threadpool(thumbnail_for, staged)
+        if thumbnail_path != design.thumbnail_path:
+            # Not renderable (grid isn't rectangular, disk error): store None
+            # instead of a URL with no file behind it
+            await db.execute(
+                update(models.Design)
+                .where(models.Design.id == design.id)
+                .values({models.Design.thumbnail_path: thumbnail_path})
+                .execution_options(synchronize_session=False)
+            )
+            set_committed_value(design, "thumbnail_path", thumbnail_path)
+    await db.commit()
 
     return design
 
 
-@router.delete("/{design_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_design(
+@router.patch("/{design_id}/cells", response_model=schemas.DesignResponse)
+async def patch_design_cells(
     design_id: int,
+    patch: schemas.DesignPatch,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Delete a design
+    Change individual stitches of a design
+
+    Only the changed cells are sent; they are applied to the stored grid
+    on the server. Rectangular runs are applied first, then single edits.
 
     Requires authentication
-    User can only delete their own designs
+    User can only update their own designs
 
     Example request:
-        DELETE /designs/1
+        PATCH /designs/1/cells
         Headers: Authorization: Bearer <token>
+        {
+            "version": 3,
+            "runs": [{"x": 0, "y": 0, "width": 10, "height": 2, "color": "#FF0000"}],
+            "edits": [{"x": 4, "y": 7, "color": "TRANSPARENT"}]
+        }
+
+    Returns 409 Conflict if version is not the design's current version
+    (reload the design and apply the edits again).
     """
 
-    design = db.query(models.Design).filter(models.Design.id == design_id).first()
+    design = await get_owned_design(db, design_id, current_user.id, "update")
 
-    if not design:
+    if patch.version != design.version:
+        raise version_conflict(design.version)
+
+    grid = design.get_grid()
+    if grid is None:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Design not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Design grid is not rectangular, save the full design instead"
         )
-
-    # Check ownership
-    if design.owner_id != current_user.id:
+    indices, colors, fields = grid
+
+    # Check every edit lands inside the grid
+    grid_height, grid_width = indices.shape
+    for run in patch.runs:
+        if run.x + run.width > grid_width or run.y + run.height > grid_height:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Run at ({run.x}, {run.y}) is outside the {grid_width}x{grid_height} grid"
+            )
+    for edit in patch.edits:
+        if edit.x >= grid_width or edit.y >= grid_height:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cell ({edit.x}, {edit.y}) is outside the {grid_width}x{grid_height} grid"
+            )
+
+    try:
+        indices, colors = design_codec.apply_cell_edits(
+            indices,
+            colors,
+            runs=[(run.x, run.y, run.width, run.height, run.color) for run in patch.runs],
+            edits=[(edit.x, edit.y, edit.color) for edit in patch.edits],
+        )
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this design"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
 
-    db.delete(design)
-    db.commit()
+    # Keep the "palette" field in sync with the colors actually used
+    if isinstance(fields.get("palette"), list):
+        fields = dict(fields, palette=design_codec.used_palette(indices, colors))
+
+    design.set_grid(indices, colors, fields)
+    design.thumbnail_path = await run_in_threadpool(thumbnail_for, design)
+    await commit_versioned(db, design)
+
+    return design
+
+
+@router.delete("/{design_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_design(
+    design_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Delete a design
+
+    Requires authentication
+    User can only delete their own designs
+
+    Example request:
+        DELETE /designs/1
+        Headers: Authorization: Bearer <token>
+    """
+
+    # Delete by id and owner without loading the row (or its grid data)
+    result = await db.execute(
+        delete(models.Design)
+        .where(models.Design.id == design_id, models.Design.owner_id == current_user.id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        raise await design_miss_error(db, design_id, current_user.id, "delete")
+    await db.commit()
+    invalidate_design_count(current_user.id)
 
     return None  # 204 No Content
@@ -4,25 +4,41 @@ Handles image upload and conversion to cross-stitch patterns
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+import asyncio
 import json
-import os
-from typing import Optional
+from typing import List, Optional, Tuple, Union
 
-from database import get_db
+from database import get_async_db, get_db
 import models
 import schemas
 from auth import get_current_user
-from image_processor import (
-    process_image_for_crossstitch,
-    create_preview_image,
-    map_to_thread_colors
+from image_processor import indices_to_hex_grid, resolve_metric
+from image_workers import (
+    image_pool,
+    run_decode_variants,
+    run_upload_pipeline,
+    run_variant_pipeline,
+    PoolSaturated
 )
+from preview_store import preview_store, save_preview
+from image_cache import image_cache, cache_key
+from upload_ingest import ingest_image_upload
+from thread_catalog import dmc_catalog
+from quantizers import DEFAULT_QUANTIZER, available_quantizers, quantizer_stats
+from dithering import DITHER_METHODS
+from import_jobs import submit_job
+from routers.designs import invalidate_design_count
+from thumbnails import thumbnail_for
 
 router = APIRouter()
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+PREVIEW_GRID_LINE_COLOR = "#C8C8C8"  # Light gray lines between stitches
+MAX_BATCH_VARIANTS = 8  # Variants per /images/batch request
 
 
 def allowed_file(filename: str) -> bool:
@@ -30,12 +46,116 @@ def allowed_file(filename: str) -> bool:
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def check_file_type(file: UploadFile) -> None:
+    """Raise 400 if the upload doesn't have an allowed image extension"""
+    if not allowed_file(file.filename):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+
+
+def check_pattern_params(target_width: int, target_height: int, num_colors: int) -> None:
+    """Raise 400 if the requested pattern size or color count is out of range"""
+    # Validate dimensions
+    if not (10 <= target_width <= 200 and 10 <= target_height <= 200):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Width and height must be between 10 and 200"
+        )
+
+    if not (2 <= num_colors <= 64):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Number of colors must be between 2 and 64"
+        )
+
+
+def check_processing_options(
+    palette_mode: str,
+    color_metric: Optional[str],
+    thread_codes: Union[str, List[str], None],
+    quantizer: str,
+    dither: str
+) -> Tuple[str, Optional[List[str]]]:
+    """
+    Raise 400 on an unknown palette mode, color metric, thread code,
+    quantizer or dither method
+
+    thread_codes may be a list or a comma-separated string.
+
+    Returns:
+        Tuple of (color_metric with its default filled in, sorted thread codes or None)
+    """
+    if quantizer not in available_quantizers():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Quantizer must be one of: {', '.join(available_quantizers())}"
+        )
+    if dither not in DITHER_METHODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Dither must be one of: {', '.join(DITHER_METHODS)}"
+        )
+
+    try:
+        metric = resolve_metric(palette_mode, color_metric)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if palette_mode != "dmc" or not thread_codes:
+        return metric, None
+
+    if isinstance(thread_codes, str):
+        thread_codes = thread_codes.split(",")
+    codes = [code.strip() for code in thread_codes if code.strip()]
+    try:
+        dmc_catalog.subset(codes)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return metric, sorted(set(codes))
+
+
+def check_preview_cell_size(preview_cell_size: int) -> None:
+    """Raise 400 if the preview cell size is out of range"""
+    if not (1 <= preview_cell_size <= 20):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Preview cell size must be between 1 and 20"
+        )
+
+
+def pool_busy() -> HTTPException:
+    """
+    503 error telling the client to retry once the image workers have capacity
+    (also used for PoolBroken: the crashed workers have been replaced by then)
+    """
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Image processing is busy, please try again shortly",
+        headers={"Retry-After": "5"}
+    )
+
+
 @router.post("/upload", response_model=schemas.ImageProcessResponse)
 async def upload_and_process_image(
     file: UploadFile = File(...),
     target_width: int = Form(...),
     target_height: int = Form(...),
     num_colors: int = Form(16),
+    preview_cell_size: int = Form(10),
+    preview_grid_lines: bool = Form(False),
+    color_metric: Optional[str] = Form(None),
+    palette_mode: str = Form("adaptive"),
+    thread_codes: Optional[str] = Form(None),
+    quantizer: str = Form(DEFAULT_QUANTIZER),
+    dither: str = Form("none"),
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -43,8 +163,8 @@ async def upload_and_process_image(
     Upload an image and convert it to a cross-stitch pattern
 
     Process:
-    1. Validate file type and size
-    2. Read image bytes
+    1. Validate file type and parameters
+    2. Stream the upload to a temp file (size capped) and check the image header
     3. Resize and quantize colors
     4. Return grid data and color palette
 
@@ -58,6 +178,16 @@ async def upload_and_process_image(
             target_width: 50
             target_height: 50
             num_colors: 16
+            preview_cell_size: 10      (optional, pixels per stitch in the preview)
+            preview_grid_lines: false  (optional, draw lines between stitches)
+            color_metric: rgb          (optional, rgb / cie76 / cie94 / ciede2000:
+                                        how pixels are matched to palette colors;
+                                        default rgb, or COLOR_METRIC for dmc)
+            palette_mode: adaptive     (optional, "dmc" = use DMC thread colors only)
+            thread_codes: 310,321,blanc (optional, with dmc: only these threads)
+            quantizer: fast_octree     (optional, engine for adaptive palettes,
+                                        see GET /images/quantizers)
+            dither: none               (optional, none / ordered / floyd_steinberg)
 
     Returns:
         {
@@ -70,56 +200,66 @@ async def upload_and_process_image(
     """
 
     # Validate file extension
-    if not allowed_file(file.filename):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-
-    # Read file content
-    try:
-        contents = await file.read()
+    check_file_type(file)
 
-        # Check file size
-        if len(contents) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024} MB"
-            )
+    # Check parameters before reading the file
+    check_pattern_params(target_width, target_height, num_colors)
+    check_preview_cell_size(preview_cell_size)
+    color_metric, codes = check_processing_options(
+        palette_mode, color_metric, thread_codes, quantizer, dither
+    )
 
-        # Validate dimensions
-        if not (10 <= target_width <= 200 and 10 <= target_height <= 200):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Width and height must be between 10 and 200"
-            )
+    # Copy the upload to a temp file (size capped) and check the image header
+    upload = await ingest_image_upload(file)
 
-        if not (2 <= num_colors <= 64):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Number of colors must be between 2 and 64"
-            )
+    try:
+        grid_line_color = PREVIEW_GRID_LINE_COLOR if preview_grid_lines else None
 
-        # Process image
-        grid_data, palette = process_image_for_crossstitch(
-            contents,
+        # Same image with the same settings? Reuse the earlier result
+        key = cache_key(
+            upload.digest,
             target_width,
             target_height,
-            num_colors
+            num_colors,
+            method=quantizer,
+            cell=preview_cell_size,
+            lines=grid_line_color,
+            metric=color_metric,
+            palette=palette_mode,
+            threads=codes,
+            dither=dither
         )
-
-        # Create preview image
-        preview_bytes = create_preview_image(grid_data, cell_size=10)
+        cached = image_cache.get(key)
+
+        if cached is None:
+            # Process image and create the preview in a worker process,
+            # so the event loop stays free for other requests meanwhile
+            try:
+                indices, palette, preview_bytes, report = await image_pool.run(
+                    run_upload_pipeline,
+                    upload.path,
+                    target_width,
+                    target_height,
+                    num_colors,
+                    preview_cell_size,
+                    grid_line_color,
+                    color_metric,
+                    palette_mode,
+                    codes,
+                    quantizer,
+                    dither
+                )
+            except PoolSaturated:
+                raise pool_busy()
+            quantizer_stats.record(report)
+            cached = (indices, palette, preview_bytes)
+            image_cache.put(key, cached)
+
+        indices, palette, preview_bytes = cached
+        grid_data = indices_to_hex_grid(indices, palette)
 
         # Save preview to uploads directory
-        uploads_dir = "/app/uploads"
-        os.makedirs(uploads_dir, exist_ok=True)
-
-        preview_filename = f"preview_{current_user.id}_{os.urandom(8).hex()}.png"
-        preview_path = os.path.join(uploads_dir, preview_filename)
-
-        with open(preview_path, "wb") as f:
-            f.write(preview_bytes)
+        preview_url = save_preview(preview_bytes)
 
         # Return processed data
         return {
@@ -127,14 +267,344 @@ async def upload_and_process_image(
             "height": target_height,
             "grid_data": json.dumps(grid_data),
             "palette": palette,
-            "preview_url": f"/uploads/{preview_filename}"
+            "preview_url": preview_url
         }
 
+    except HTTPException:
+        raise  # Validation and busy errors keep their own status code
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing image: {str(e)}"
         )
+    finally:
+        upload.cleanup()
+
+
+def parse_variants(variants: str) -> List[schemas.ImageVariant]:
+    """Parse the JSON list of /images/batch settings, raising 400 if it is invalid"""
+    try:
+        raw = json.loads(variants)
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Variants must be a JSON list"
+        )
+    if not isinstance(raw, list) or not raw:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Variants must be a non-empty JSON list"
+        )
+    if len(raw) > MAX_BATCH_VARIANTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_VARIANTS} variants per request"
+        )
+
+    try:
+        return [schemas.ImageVariant.model_validate(item) for item in raw]
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid variant: {e.errors()[0]['msg']}"
+        )
+
+
+@router.post("/batch", response_model=schemas.ImageBatchResponse)
+async def batch_process_image(
+    file: UploadFile = File(...),
+    variants: str = Form(...),
+    preview_cell_size: int = Form(10),
+    preview_grid_lines: bool = Form(False),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Convert one image into several patterns with different settings
+
+    Compared to calling /upload once per variant, the file is uploaded
+    and decoded only once (at the largest requested size), each distinct
+    size is pixelated once, and the variants are quantized in parallel
+    in the image worker pool.
+
+    Requires authentication
+
+    Example usage (multipart/form-data):
+        POST /images/batch
+        Headers: Authorization: Bearer <token>
+        Form data:
+            file: [image file]
+            variants: [
+                {"target_width": 50, "target_height": 50, "num_colors": 16},
+                {"target_width": 100, "target_height": 100, "num_colors": 32,
+                 "palette_mode": "dmc", "dither": "floyd_steinberg"}
+            ]
+            preview_cell_size: 10      (optional, same for all variants)
+            preview_grid_lines: false  (optional, same for all variants)
+
+        Each variant takes the /upload settings: target_width,
+        target_height, num_colors, color_metric, palette_mode,
+        thread_codes (a list), quantizer and dither.
+
+    Returns:
+        {
+            "results": [
+                {"width": 50, "height": 50, "grid_data": "...", "palette": [...],
+                 "preview_url": "/uploads/preview_123.png", "variant": {...}},
+                ...
+            ]
+        }
+    """
+
+    # Validate file extension and every variant before reading the file
+    check_file_type(file)
+    check_preview_cell_size(preview_cell_size)
+    requested = parse_variants(variants)
+    options = [
+        check_processing_options(
+            variant.palette_mode, variant.color_metric, variant.thread_codes,
+            variant.quantizer, variant.dither
+        )
+        for variant in requested
+    ]
+
+    upload = await ingest_image_upload(file)
+
+    try:
+        grid_line_color = PREVIEW_GRID_LINE_COLOR if preview_grid_lines else None
+
+        # Batch results are cached apart from /upload ones: the shared decode
+        # can pixelate slightly differently from decoding at each size
+        keys = [
+            cache_key(
+                upload.digest,
+                variant.target_width,
+                variant.target_height,
+                variant.num_colors,
+                method=variant.quantizer,
+                cell=preview_cell_size,
+                lines=grid_line_color,
+                metric=metric,
+                palette=variant.palette_mode,
+                threads=codes,
+                dither=variant.dither,
+                source="batch"
+            )
+            for variant, (metric, codes) in zip(requested, options)
+        ]
+        results = [image_cache.get(key) for key in keys]
+        missing = [i for i, cached in enumerate(results) if cached is None]
+
+        if missing:
+            try:
+                # Decode once, pixelated to every size that still needs work
+                sizes = [(requested[i].target_width, requested[i].target_height) for i in missing]
+                decoded = await image_pool.run(run_decode_variants, upload.path, sizes)
+
+                # Quantize and render the variants in parallel
+                outputs = await asyncio.gather(
+                    *(
+                        image_pool.run(
+                            run_variant_pipeline,
+                            decoded[sizes[n]],
+                            requested[i].num_colors,
+                            preview_cell_size,
+                            grid_line_color,
+                            options[i][0],
+                            requested[i].palette_mode,
+                            options[i][1],
+                            requested[i].quantizer,
+                            requested[i].dither
+                        )
+                        for n, i in enumerate(missing)
+                    ),
+                    return_exceptions=True
+                )
+            except PoolSaturated:
+                raise pool_busy()
+
+            # Keep the variants that finished even if another one failed
+            for i, output in zip(missing, outputs):
+                if isinstance(output, BaseException):
+                    continue
+                indices, palette, preview_bytes, report = output
+                quantizer_stats.record(report)
+                results[i] = (indices, palette, preview_bytes)
+                image_cache.put(keys[i], results[i])
+
+            for output in outputs:
+                if isinstance(output, PoolSaturated):
+                    raise pool_busy()
+            for output in outputs:
+                if isinstance(output, BaseException):
+                    raise output
+
+        response = []
+        for variant, (indices, palette, preview_bytes) in zip(requested, results):
+            grid_data = indices_to_hex_grid(indices, palette)
+            response.append({
+                "width": variant.target_width,
+                "height": variant.target_height,
+                "grid_data": json.dumps(grid_data),
+                "palette": palette,
+                "preview_url": save_preview(preview_bytes),
+                "variant": variant
+            })
+
+        return {"results": response}
+
+    except HTTPException:
+        raise  # Validation and busy errors keep their own status code
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing image: {str(e)}"
+        )
+    finally:
+        upload.cleanup()
+
+
+@router.get("/quantizers")
+def list_quantizers():
+    """
+    List the quantization engines available for /images/upload,
+    with their average time and error on this server so far
+
+    Example response:
+        {
+            "default": "fast_octree",
+            "available": ["median_cut", "max_coverage", "fast_octree", "kmeans"],
+            "stats": {"fast_octree": {"runs": 12, "avg_ms": 3.2, "avg_mse": 88.1}}
+        }
+    """
+    return {
+        "default": DEFAULT_QUANTIZER,
+        "available": available_quantizers(),
+        "stats": quantizer_stats.stats(),
+    }
+
+
+@router.post("/jobs", response_model=schemas.ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_import_job(
+    file: UploadFile = File(...),
+    target_width: int = Form(...),
+    target_height: int = Form(...),
+    num_colors: int = Form(16),
+    preview_cell_size: int = Form(10),
+    preview_grid_lines: bool = Form(False),
+    color_metric: Optional[str] = Form(None),
+    palette_mode: str = Form("adaptive"),
+    thread_codes: Optional[str] = Form(None),
+    quantizer: str = Form(DEFAULT_QUANTIZER),
+    dither: str = Form("none"),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue an image for background conversion to a cross-stitch pattern
+
+    Same form fields as /upload, but returns immediately with a job id
+    instead of holding the connection open while the image is processed.
+
+    Requires authentication
+
+    Example usage (multipart/form-data):
+        POST /images/jobs
+        Headers: Authorization: Bearer <token>
+        Form data:
+            file: [image file]
+            target_width: 50
+            target_height: 50
+            num_colors: 16
+            (plus any optional /upload field: preview_cell_size,
+             preview_grid_lines, color_metric, palette_mode, thread_codes,
+             quantizer, dither)
+
+    Returns (202 Accepted):
+        {"id": "3f2a...", "status": "queued", "progress": 0, ...}
+
+    Then poll GET /images/jobs/{id} for progress and the result.
+    """
+    check_file_type(file)
+    check_pattern_params(target_width, target_height, num_colors)
+    check_preview_cell_size(preview_cell_size)
+    color_metric, codes = check_processing_options(
+        palette_mode, color_metric, thread_codes, quantizer, dither
+    )
+    options = {
+        "preview_cell_size": preview_cell_size,
+        "grid_line_color": PREVIEW_GRID_LINE_COLOR if preview_grid_lines else None,
+        "color_metric": color_metric,
+        "palette_mode": palette_mode,
+        "thread_codes": codes,
+        "quantizer": quantizer,
+        "dither": dither,
+    }
+    upload = await ingest_image_upload(file)
+
+    try:
+        job = await run_in_threadpool(
+            submit_job, db, current_user.id, upload.path, target_width, target_height, num_colors, options
+        )
+    finally:
+        upload.cleanup()  # No-op once the job has taken the file
+    return job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.ImportJobResponse)
+def get_import_job(
+    job_id: str,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the status of an import job
+
+    Requires authentication
+    User can only see their own jobs
+
+    Example response while running:
+        {"id": "3f2a...", "status": "running", "stage": "quantize", "progress": 40, ...}
+
+    Example response when done:
+        {"id": "3f2a...", "status": "succeeded", "progress": 100,
+         "result": {"width": 50, "height": 50, "grid_data": "...", ...}, ...}
+    """
+    job = db.query(models.ImportJob)\
+        .filter(models.ImportJob.id == job_id, models.ImportJob.owner_id == current_user.id)\
+        .first()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    return job_response(job)
+
+
+def job_response(job: models.ImportJob) -> dict:
+    """
+    Build the ImportJobResponse for a job (result is stored as JSON text)
+
+    A job's preview is kept for PREVIEW_TTL_HOURS after it finishes; once
+    the sweeper has removed it, preview_url is null rather than a dead link.
+    """
+    result = json.loads(job.result) if job.result else None
+    if result and result.get("preview_url") and not preview_store.exists(result["preview_url"]):
+        result["preview_url"] = None
+
+    return {
+        "id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": job.progress,
+        "error": job.error,
+        "result": result,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "finished_at": job.finished_at,
+    }
 
 
 @router.post("/save-from-upload", response_model=schemas.DesignResponse)
@@ -146,7 +616,7 @@ async def save_design_from_upload(
     grid_data: str = Form(...),
     palette: str = Form(...),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Save a processed image as a design
@@ -180,9 +650,11 @@ async def save_design_from_upload(
         design_data=design_data,
         owner_id=current_user.id
     )
+    new_design.thumbnail_path = await run_in_threadpool(thumbnail_for, new_design)
 
     db.add(new_design)
-    db.commit()
-    db.refresh(new_design)
+    await db.commit()
+    await db.refresh(new_design)
+    invalidate_design_count(current_user.id)
 
     return new_design
@@ -0,0 +1,101 @@
+"""
+Thread Color Routes
+The DMC thread catalog and nearest-thread matching
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+
+import models
+import schemas
+from auth import get_current_user
+from design_codec import TRANSPARENT
+from image_processor import grid_to_indices, indices_to_hex_grid
+from thread_catalog import dmc_catalog
+from color_science import DEFAULT_METRIC
+
+router = APIRouter()
+
+MAX_GRID_CELLS = 1_000_000  # Largest grid accepted by /threads/map
+
+
+@router.get("/", response_model=List[schemas.ThreadColor])
+def list_threads():
+    """
+    Get the full DMC thread catalog
+
+    Example response:
+        [{"code": "3713", "name": "Salmon Very Light", "hex": "#FFE2E2"}, ...]
+    """
+    return dmc_catalog.to_list()
+
+
+@router.post("/map", response_model=schemas.ThreadMapResponse)
+def map_to_threads(
+    request: schemas.ThreadMapRequest,
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Map a palette and/or a whole grid to the closest DMC threads in one call
+
+    Requires authentication
+    Each distinct color is matched once, however often it appears.
+    "TRANSPARENT" cells are left as they are.
+    "metric" picks the color distance: rgb, cie76, cie94 or ciede2000
+    (default). rgb gives the same picks as the frontend's findClosestDMCColor.
+
+    Example request:
+        POST /threads/map
+        {
+            "palette": ["#C82020"],
+            "grid": [["#C82020", "TRANSPARENT"]],
+            "metric": "ciede2000"
+        }
+
+    Example response:
+        {
+            "metric": "ciede2000",
+            "matches": {"#C82020": {"code": "347", "name": "Salmon Very Dark", "hex": "#BF2D2D", ...}},
+            "grid": [["#BF2D2D", "TRANSPARENT"]]
+        }
+    """
+    metric = request.metric or DEFAULT_METRIC
+    colors = list(request.palette)
+    indices = None
+    grid_colors: List[str] = []
+
+    if request.grid is not None:
+        width = len(request.grid[0]) if request.grid else 0
+        if width == 0 or any(len(row) != width for row in request.grid):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Grid must be a non-empty list of rows of equal length"
+            )
+        if width * len(request.grid) > MAX_GRID_CELLS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Grid too large. Maximum: {MAX_GRID_CELLS} cells"
+            )
+
+        indices, grid_colors = grid_to_indices(request.grid)
+        colors.extend(color for color in grid_colors if color != TRANSPARENT)
+
+    # Match each distinct color once
+    distinct = list(dict.fromkeys(colors))
+    try:
+        matches = {match["original"]: match for match in dmc_catalog.match_palette(distinct, metric)}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    grid = None
+    if indices is not None:
+        thread_colors = [
+            color if color == TRANSPARENT else matches[color]["hex"]
+            for color in grid_colors
+        ]
+        grid = indices_to_hex_grid(indices, thread_colors)
+
+    return {"metric": metric, "matches": matches, "grid": grid}
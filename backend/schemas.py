@@ -6,7 +6,9 @@ Think of them as contracts: "This is what I expect to receive/send"
 
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
+
+from quantizers import DEFAULT_QUANTIZER
 
 
 # ============= User Schemas =============
@@ -78,6 +80,37 @@ class DesignUpdate(BaseModel):
     width: Optional[int] = Field(None, ge=1, le=500)
     height: Optional[int] = Field(None, ge=1, le=500)
     design_data: Optional[str] = None
+    version: Optional[int] = None  # If given, reject the update when the design changed since
+
+
+class CellEdit(BaseModel):
+    """
+    One stitch to change: x is the column, y is the row (both from 0)
+    """
+    x: int = Field(..., ge=0)
+    y: int = Field(..., ge=0)
+    color: str = Field(..., min_length=1, max_length=32)  # "#RRGGBB" or "TRANSPARENT"
+
+
+class CellRun(BaseModel):
+    """
+    A rectangle of stitches to fill with one color
+    """
+    x: int = Field(..., ge=0)
+    y: int = Field(..., ge=0)
+    width: int = Field(1, ge=1, le=500)
+    height: int = Field(1, ge=1, le=500)
+    color: str = Field(..., min_length=1, max_length=32)
+
+
+class DesignPatch(BaseModel):
+    """
+    Schema for changing individual stitches without re-uploading the grid
+    version must match the design's current version (optimistic concurrency)
+    """
+    version: int
+    runs: List[CellRun] = Field(default_factory=list, max_length=10000)
+    edits: List[CellEdit] = Field(default_factory=list, max_length=250000)
 
 
 class DesignResponse(BaseModel):
@@ -94,11 +127,106 @@ class DesignResponse(BaseModel):
     owner_id: int
     created_at: datetime
     updated_at: Optional[datetime]
+    version: int
 
     class Config:
         from_attributes = True
 
 
+class DesignSummary(BaseModel):
+    """
+    Schema for design listings (gallery pages)
+    Same as DesignResponse without design_data, so listing never ships full grids
+    """
+    id: int
+    title: str
+    description: Optional[str]
+    width: int
+    height: int
+    grid_width: Optional[int]  # Size of the stored grid (None if unknown yet)
+    grid_height: Optional[int]
+    thumbnail_path: Optional[str]
+    owner_id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+    version: int
+
+    class Config:
+        from_attributes = True
+
+
+class DesignSummaryList(BaseModel):
+    """
+    Schema for one page of design summaries
+    Pass next_cursor back as ?cursor= to get the following page
+    """
+    designs: List[DesignSummary]
+    next_cursor: Optional[str] = None  # None on the last page
+    total: Optional[int] = None  # Only filled in when include_total=true
+
+
+# Items per bulk request (/designs/bulk)
+MAX_BULK_DESIGNS = 100
+
+
+class DesignBulkCreate(BaseModel):
+    """
+    Schema for creating many designs at once
+    """
+    designs: List[DesignCreate] = Field(..., min_length=1, max_length=MAX_BULK_DESIGNS)
+
+
+class DesignMetadataUpdate(BaseModel):
+    """
+    Schema for one item of a bulk metadata update
+    Only title and description; grids are saved one design at a time
+    """
+    id: int
+    title: Optional[str] = Field(None, min_length=1, max_length=200)
+    description: Optional[str] = None
+    version: Optional[int] = None  # If given, skip this design when it changed since
+
+
+class DesignBulkUpdate(BaseModel):
+    """
+    Schema for updating the metadata of many designs at once
+    """
+    designs: List[DesignMetadataUpdate] = Field(..., min_length=1, max_length=MAX_BULK_DESIGNS)
+
+
+class DesignBulkDelete(BaseModel):
+    """
+    Schema for deleting many designs at once
+    """
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_DESIGNS)
+
+
+class DesignBulkResult(BaseModel):
+    """
+    Outcome of one item of a bulk request
+    status is the HTTP status the single-design endpoint would have given
+
+    - create: always 201; the designs are inserted together, so an invalid
+      item fails the whole request (422) and nothing is saved
+    - update / delete: 200 / 204 per item, or 400 (duplicate id),
+      403, 404 or 409 with detail for the items that failed
+    """
+    index: int  # Position in the request
+    id: Optional[int] = None
+    status: int
+    detail: Optional[str] = None  # Why the item failed
+    design: Optional[DesignSummary] = None  # Created or updated design
+
+
+class DesignBulkResponse(BaseModel):
+    """
+    Schema for bulk responses: one result per item, in request order
+    """
+    results: List[DesignBulkResult]
+    succeeded: int
+    failed: int
+
+
 class DesignList(BaseModel):
     """
     Schema for listing multiple designs
@@ -131,6 +259,86 @@ class ImageProcessResponse(BaseModel):
     preview_url: Optional[str]  # URL to preview image
 
 
+class ImageVariant(ImageProcessRequest):
+    """
+    Schema for one set of settings in a batch request (/images/batch)
+    Same options as the /images/upload form fields
+    """
+    palette_mode: str = "adaptive"  # "adaptive" or "dmc"
+    thread_codes: Optional[List[str]] = None  # With "dmc": only these DMC codes
+    color_metric: Optional[str] = None  # rgb, cie76, cie94, ciede2000
+    quantizer: str = DEFAULT_QUANTIZER
+    dither: str = "none"  # none, ordered, floyd_steinberg
+
+
+class ImageVariantResult(ImageProcessResponse):
+    """
+    Schema for one processed variant of a batch request
+    """
+    variant: ImageVariant  # The settings this result was made with
+
+
+class ImageBatchResponse(BaseModel):
+    """
+    Schema for a batch request: one result per variant, in request order
+    """
+    results: List[ImageVariantResult]
+
+
+class ImportJobResponse(BaseModel):
+    """
+    Schema for a background image import job
+    Poll GET /images/jobs/{id} until status is "succeeded" or "failed"
+    """
+    id: str
+    status: str  # queued, running, succeeded, failed
+    stage: Optional[str]  # decode, quantize, preview (while running)
+    progress: int  # 0-100
+    error: Optional[str]
+    result: Optional[ImageProcessResponse]  # Only when status is "succeeded"
+    created_at: datetime
+    updated_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
+# ============= Thread Schemas =============
+
+class ThreadColor(BaseModel):
+    """
+    Schema for one thread in the catalog
+    """
+    code: str  # DMC number, e.g. "321"
+    name: str
+    hex: str
+
+
+class ThreadMatch(ThreadColor):
+    """
+    Schema for the closest thread to a design color
+    """
+    original: str  # The design color that was matched
+    distance: float  # Color difference between original and thread (0 = exact)
+
+
+class ThreadMapRequest(BaseModel):
+    """
+    Schema for mapping colors to threads
+    Send a palette, a grid, or both
+    """
+    palette: List[str] = Field(default_factory=list)  # Hex colors
+    grid: Optional[List[List[str]]] = None  # Hex colors or "TRANSPARENT"
+    metric: Optional[str] = None  # rgb, cie76, cie94 or ciede2000 (default: ciede2000)
+
+
+class ThreadMapResponse(BaseModel):
+    """
+    Schema for mapped colors
+    """
+    metric: str  # Distance used for matching
+    matches: Dict[str, ThreadMatch]  # Design color -> closest thread
+    grid: Optional[List[List[str]]] = None  # Request grid with thread colors
+
+
 # Example of how these are used in FastAPI:
 #
 # @app.post("/users", response_model=UserResponse)
@@ -0,0 +1,63 @@
+"""
+Keyset pagination of GET /designs/summary
+
+Run from backend/:
+    python -m pytest -q tests
+"""
+
+import os
+import tempfile
+
+# Settings are read at import time, so point everything at a scratch
+# SQLite database and directories before importing the app
+_tmp = tempfile.mkdtemp(prefix="crossstitch-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["DB_ECHO"] = "false"
+os.environ["IMPORT_JOB_WORKERS"] = "0"
+os.environ["IMAGE_WORKERS"] = "1"
+os.environ["BCRYPT_ROUNDS"] = "4"
+for name in ("UPLOADS_DIR", "THUMBNAIL_DIR", "IMPORT_JOB_DIR", "THREAD_LUT_DIR"):
+    os.environ[name] = os.path.join(_tmp, name.lower())
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import bindparam, text  # noqa: E402
+
+import main  # noqa: E402
+from database import engine  # noqa: E402
+
+
+def test_pages_across_designs_created_in_the_same_second():
+    with TestClient(main.app) as client:
+        client.post("/auth/register", json={
+            "username": "pager", "email": "pager@example.com", "password": "secret123"
+        })
+        token = client.post("/auth/login", json={
+            "email": "pager@example.com", "password": "secret123"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        design = {"title": "D", "width": 1, "height": 1, "design_data": '{"grid": [["#000000"]]}'}
+        created = client.post("/designs/bulk", headers=headers, json={"designs": [design] * 5})
+        ids = [result["id"] for result in created.json()["results"]]
+
+        # The format SQLite's CURRENT_TIMESTAMP default stores: whole seconds
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE designs SET created_at = '2024-01-01 12:00:00' WHERE id IN :ids")
+                .bindparams(bindparam("ids", expanding=True)),
+                {"ids": ids}
+            )
+
+        seen = []
+        cursor = None
+        for _ in range(len(ids)):
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            page = client.get("/designs/summary", headers=headers, params=params).json()
+            seen.extend(d["id"] for d in page["designs"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == sorted(ids, reverse=True)
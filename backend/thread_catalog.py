@@ -0,0 +1,166 @@
+"""
+Thread Catalog
+Nearest-thread lookup against the full DMC catalog
+
+The catalog is turned into NumPy arrays once (when this module is
+imported, i.e. at startup): RGB values and their precomputed CIELAB
+coordinates. Matching a batch of colors is then a single vectorized
+distance computation instead of a Python loop per color and per thread:
+
+    distances[i, j] = distance(color_i, thread_j)     (M colors x N threads)
+    nearest[i]      = argmin_j distances[i, j]
+
+The distance is any metric from color_science.py. The default is
+CIEDE2000; with metric="rgb" the search picks exactly the same thread as
+the frontend's findClosestDMCColor (the first thread at the smallest
+distance). With ~400 threads a brute-force broadcast is faster than
+building a KD-tree, and it works for the non-Euclidean ΔE formulas too.
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from color_science import DEFAULT_METRIC, NEAREST_CANDIDATES, check_metric, nearest, srgb_to_lab
+from dmc_colors import DMC_THREADS
+
+HEX_COLOR = re.compile(r"^#?[0-9A-Fa-f]{6}$")
+
+
+def parse_hex_colors(colors: Iterable[str]) -> np.ndarray:
+    """
+    Parse "#RRGGBB" strings into an (M, 3) int32 array
+
+    Raises:
+        ValueError: if a color isn't a 6-digit hex color
+    """
+    colors = list(colors)
+    for color in colors:
+        if not isinstance(color, str) or not HEX_COLOR.match(color):
+            raise ValueError(f"Invalid hex color: {color!r}")
+
+    packed = np.array([int(color.lstrip('#'), 16) for color in colors], dtype=np.int32)
+    rgb = np.empty((len(colors), 3), dtype=np.int32)
+    rgb[:, 0] = packed >> 16
+    rgb[:, 1] = (packed >> 8) & 0xFF
+    rgb[:, 2] = packed & 0xFF
+    return rgb
+
+
+class ThreadCatalog:
+    """
+    A set of threads with a vectorized nearest-color search
+
+    Usage:
+        catalog = ThreadCatalog(DMC_THREADS)
+        catalog.nearest(np.array([[200, 30, 30]]))   # -> (thread indices, distances)
+        catalog.match_palette(["#C82020"])           # -> [{"code": "347", ...}]
+
+    Args:
+        threads: Sequence of (code, name, hex)
+    """
+
+    def __init__(self, threads: Iterable[Tuple[str, str, str]]):
+        threads = list(threads)
+        if not threads:
+            raise ValueError("Thread catalog is empty")
+
+        self.codes = [code for code, _, _ in threads]
+        self.names = [name for _, name, _ in threads]
+        self.hexes = [hex_color.upper() for _, _, hex_color in threads]
+        self.rgb = parse_hex_colors(self.hexes)
+        self.lab = srgb_to_lab(self.rgb)  # Precomputed for the perceptual metrics
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def coordinates(self, metric: str) -> np.ndarray:
+        """Thread colors in the space a metric compares (RGB or Lab)"""
+        return self.rgb if check_metric(metric) == "rgb" else self.lab
+
+    def nearest(
+        self,
+        rgb: np.ndarray,
+        metric: str = DEFAULT_METRIC,
+        candidates: int = NEAREST_CANDIDATES
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the closest thread for each color
+
+        Args:
+            rgb: (M, 3) array of RGB colors
+            metric: Distance to use (see color_science.METRICS)
+            candidates: ciede2000 shortlist size (0 = exact search,
+                see color_science.nearest)
+
+        Returns:
+            Tuple of (thread_indices, distances), both length M
+        """
+        rgb = np.asarray(rgb).reshape(-1, 3)
+        points = rgb if check_metric(metric) == "rgb" else srgb_to_lab(rgb)
+        return nearest(points, self.coordinates(metric), metric, candidates)
+
+    def thread_info(self, index: int) -> Dict[str, str]:
+        """Code, name and hex of one thread"""
+        return {"code": self.codes[index], "name": self.names[index], "hex": self.hexes[index]}
+
+    def match_palette(self, palette: List[str], metric: str = DEFAULT_METRIC) -> List[Dict[str, Any]]:
+        """
+        Closest thread for each palette color (distance measured with metric)
+
+        Returns:
+            One dict per color: {"original", "code", "name", "hex", "distance"}
+
+        Raises:
+            ValueError: if a color isn't a 6-digit hex color or metric is unknown
+        """
+        check_metric(metric)
+        if not palette:
+            return []
+
+        indices, distances = self.nearest(parse_hex_colors(palette), metric)
+        return [
+            dict(self.thread_info(index), original=color, distance=round(float(distance), 2))
+            for color, index, distance in zip(palette, indices, distances)
+        ]
+
+    def subset(self, codes: Iterable[str]) -> "ThreadCatalog":
+        """
+        A catalog with only the given thread codes (in catalog order)
+
+        Raises:
+            ValueError: if a code isn't in this catalog
+        """
+        wanted = set(codes)
+        unknown = wanted.difference(self.codes)
+        if unknown:
+            raise ValueError(f"Unknown thread codes: {', '.join(sorted(unknown))}")
+        return ThreadCatalog(
+            (code, name, hex_color)
+            for code, name, hex_color in zip(self.codes, self.names, self.hexes)
+            if code in wanted
+        )
+
+    def fingerprint(self) -> str:
+        """Hash of the catalog contents (for naming cached lookup tables)"""
+        raw = ";".join(f"{code}={hex_color}" for code, hex_color in zip(self.codes, self.hexes))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def to_list(self) -> List[Dict[str, str]]:
+        """Every thread as {"code", "name", "hex"}"""
+        return [self.thread_info(i) for i in range(len(self))]
+
+
+# Full DMC catalog, built once at import
+dmc_catalog = ThreadCatalog(DMC_THREADS)
+
+
+def get_catalog(thread_palette: Optional[Dict[str, str]] = None) -> ThreadCatalog:
+    """
+    The DMC catalog, or a catalog built from a {code: hex} dict
+    """
+    if thread_palette is None:
+        return dmc_catalog
+    return ThreadCatalog((code, code, hex_color) for code, hex_color in thread_palette.items())
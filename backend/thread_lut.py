@@ -0,0 +1,176 @@
+"""
+Thread Lookup Tables
+Precomputed RGB cube of nearest-thread indices
+
+Matching every pixel against every thread (thread_catalog.py) is fine
+for a palette but adds up for whole images. Instead the RGB cube is
+divided into 2^bits steps per channel (32x32x32 by default) and the
+nearest thread is computed once for the center of each cell. Mapping an
+image to threads is then a single fancy-index operation:
+
+    thread_indices = lut[r >> shift, g >> shift, b >> shift]
+
+Building a table takes a few seconds (exact CIEDE2000 over 32768 cells;
+about 8x longer at 6 bits), so tables are cached in memory and saved to THREAD_LUT_DIR. Worker
+processes and restarts load the saved file instead of rebuilding it.
+
+Configuration (environment variables):
+    THREAD_LUT_BITS   Cube resolution in bits per channel: 5 = 32^3 cells,
+                      6 = 64^3 cells (default: 5)
+    THREAD_LUT_DIR    Where built tables are saved (default: /app/data/thread_luts)
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from typing import Optional, Sequence
+
+import numpy as np
+
+from caching import TTLCache
+from color_science import DEFAULT_METRIC, check_metric
+from thread_catalog import ThreadCatalog, dmc_catalog
+
+logger = logging.getLogger(__name__)
+
+THREAD_LUT_BITS = int(os.getenv("THREAD_LUT_BITS", "5"))
+THREAD_LUT_DIR = os.getenv("THREAD_LUT_DIR", "/app/data/thread_luts")
+
+# Bump when the way tables are built changes, so old files are ignored
+# (2: exact ciede2000 search instead of the ΔE76 shortlist)
+LUT_FORMAT_VERSION = 2
+
+_tables = TTLCache(maxsize=32, ttl=None)
+_build_lock = threading.Lock()
+
+
+class ThreadLUT:
+    """
+    Nearest-thread lookup table for one catalog and metric
+
+    Usage:
+        lut = get_thread_lut(metric="ciede2000")
+        thread_indices = lut.lookup(pixels)      # (H, W) indices into lut.catalog
+    """
+
+    def __init__(self, catalog: ThreadCatalog, table: np.ndarray, bits: int):
+        self.catalog = catalog
+        self.table = table
+        self.bits = bits
+        self.shift = 8 - bits
+
+    def lookup(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Nearest thread for every pixel
+
+        Args:
+            pixels: (..., 3) uint8 RGB array
+
+        Returns:
+            Array of shape pixels.shape[:-1] with indices into self.catalog
+        """
+        cells = np.asarray(pixels, dtype=np.uint8) >> self.shift
+        return self.table[cells[..., 0], cells[..., 1], cells[..., 2]]
+
+
+def cell_centers(bits: int) -> np.ndarray:
+    """RGB value at the center of every cube cell, as a (size^3, 3) uint8 array"""
+    shift = 8 - bits
+    levels = (np.arange(1 << bits) << shift) + ((1 << shift) >> 1)
+    grid = np.meshgrid(levels, levels, levels, indexing='ij')
+    return np.stack(grid, axis=-1).reshape(-1, 3).astype(np.uint8)
+
+
+def build_table(catalog: ThreadCatalog, metric: str, bits: int) -> np.ndarray:
+    """
+    Compute the nearest thread for every cube cell
+
+    Uses the exact search (no ciede2000 shortlist): cell centers are spread
+    evenly over the whole cube, where the shortlist misses ~6% of threads,
+    and a table is built once and then cached on disk.
+    """
+    size = 1 << bits
+    nearest_threads, _ = catalog.nearest(cell_centers(bits), metric, candidates=0)
+    return nearest_threads.astype(np.uint16).reshape(size, size, size)
+
+
+def _table_path(catalog: ThreadCatalog, metric: str, bits: int) -> str:
+    raw = f"{LUT_FORMAT_VERSION}:{catalog.fingerprint()}:{metric}:{bits}"
+    name = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return os.path.join(THREAD_LUT_DIR, f"lut_{bits}bit_{metric}_{name[:16]}.npy")
+
+
+def _load_table(path: str, catalog: ThreadCatalog, bits: int) -> Optional[np.ndarray]:
+    size = 1 << bits
+    try:
+        table = np.load(path, allow_pickle=False)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("Ignoring unreadable thread lookup table %s", path)
+        return None
+
+    if table.shape != (size, size, size) or table.max() >= len(catalog):
+        logger.warning("Ignoring thread lookup table %s with unexpected contents", path)
+        return None
+    return table
+
+
+def _save_table(path: str, table: np.ndarray) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file then rename, so readers never see half a file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, table)
+        os.replace(tmp_path, path)
+    except OSError:
+        logger.warning("Could not save thread lookup table %s", path, exc_info=True)
+
+
+def get_thread_lut(
+    thread_codes: Optional[Sequence[str]] = None,
+    metric: str = DEFAULT_METRIC,
+    bits: int = THREAD_LUT_BITS
+) -> ThreadLUT:
+    """
+    Lookup table for the DMC catalog (or a subset of it)
+
+    Checks the in-memory cache, then THREAD_LUT_DIR, and only builds the
+    table if neither has it.
+
+    Args:
+        thread_codes: Only match these DMC codes (default: whole catalog)
+        metric: Color distance used to pick the nearest thread
+        bits: Cube resolution in bits per channel (1-8)
+
+    Raises:
+        ValueError: on unknown thread codes, metric or bits
+    """
+    check_metric(metric)
+    if not 1 <= bits <= 8:
+        raise ValueError("Lookup table bits must be between 1 and 8")
+
+    catalog = dmc_catalog.subset(thread_codes) if thread_codes else dmc_catalog
+    key = (catalog.fingerprint(), metric, bits)
+
+    lut = _tables.get(key)
+    if lut is not None:
+        return lut
+
+    # One build at a time; whoever waited finds the table in the cache
+    with _build_lock:
+        lut = _tables.get(key)
+        if lut is not None:
+            return lut
+
+        path = _table_path(catalog, metric, bits)
+        table = _load_table(path, catalog, bits)
+        if table is None:
+            table = build_table(catalog, metric, bits)
+            _save_table(path, table)
+
+        lut = ThreadLUT(catalog, table, bits)
+        _tables.set(key, lut)
+        return lut
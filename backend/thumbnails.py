@@ -0,0 +1,332 @@
+"""
+Design Thumbnails
+Small server-rendered images of each design for the gallery
+
+Thumbnails are rendered when a design is created or its grid changes,
+so the gallery can show an <img> instead of decoding every full grid in
+the browser. Files are named after a hash of the stored design data
+(plus the thumbnail settings), which means:
+
+- a save that doesn't change design_data finds the file already there
+  and skips rendering
+- a name never points to different content, so GET /designs/thumbnails
+  can tell browsers to cache it for a year
+
+Designs saved before thumbnails existed (or before grid_width/grid_height,
+migration 0007) are filled in by the API in a background thread when it
+starts, or by hand with:
+
+    python -m thumbnails          # only designs without an up-to-date thumbnail
+
+Editing or deleting a design leaves its old file behind (another design
+with the same grid may still use it), so the same command then removes
+files no design refers to anymore.
+
+Configuration (environment variables):
+    THUMBNAIL_DIR      Where thumbnail files are written (default: /app/data/thumbnails)
+    THUMBNAIL_SIZE     Longest side in pixels (default: 200)
+    THUMBNAIL_FORMAT   png or webp (lossless; default: png)
+    THUMBNAIL_BACKFILL_ON_STARTUP  Fill in missing thumbnails and grid sizes
+                       when the API starts (default: true)
+"""
+
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from PIL import Image, features
+from sqlalchemy import or_
+
+import models
+from database import SessionLocal
+from image_processor import palette_to_rgb
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = os.getenv("THUMBNAIL_DIR", "/app/data/thumbnails")
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "200"))
+THUMBNAIL_FORMAT = os.getenv("THUMBNAIL_FORMAT", "png").lower()
+THUMBNAIL_BACKFILL_ON_STARTUP = os.getenv("THUMBNAIL_BACKFILL_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# WebP needs Pillow built with libwebp
+if THUMBNAIL_FORMAT not in ("png", "webp") or \
+        (THUMBNAIL_FORMAT == "webp" and not features.check("webp")):
+    THUMBNAIL_FORMAT = "png"
+
+# Served by routers/designs.py
+THUMBNAIL_URL_PREFIX = "/designs/thumbnails"
+THUMBNAIL_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Bump when rendering changes, so every design gets a new file name
+THUMBNAIL_VERSION = 1
+
+BACKFILL_BATCH_SIZE = 200
+
+# Files younger than this are never treated as orphans: a save renders the
+# thumbnail before its transaction commits the new thumbnail_path
+ORPHAN_GRACE_SECONDS = 3600
+
+_FILENAME_PATTERN = re.compile(r"[0-9a-f]{32}\.(png|webp)")
+
+# Cell values drawn as empty, as in the frontend's isTransparent()
+TRANSPARENT_VALUES = ("TRANSPARENT", None)
+
+
+def render_thumbnail(indices: np.ndarray, colors: list, size: int = THUMBNAIL_SIZE) -> bytes:
+    """
+    Render a design grid as a small image
+
+    Each stitch becomes a square block of the same whole number of pixels
+    (NumPy repeat, no per-stitch loop), sized so the longest side fits in
+    size. Grids with more stitches than size are shrunk with box filtering.
+
+    Args:
+        indices: 2D array of indices into colors (height x width)
+        colors: Cell values; "TRANSPARENT" cells are left see-through
+
+    Returns:
+        PNG or WebP bytes (THUMBNAIL_FORMAT)
+    """
+    height, width = indices.shape
+
+    # RGBA value of every color, then of every stitch at once
+    rgba = np.empty((len(colors), 4), dtype=np.uint8)
+    rgba[:, :3] = palette_to_rgb(colors)
+    rgba[:, 3] = [0 if color in TRANSPARENT_VALUES else 255 for color in colors]
+    stitches = rgba[indices]
+
+    scale = max(1, size // max(height, width, 1))
+    pixels = np.repeat(np.repeat(stitches, scale, axis=0), scale, axis=1)
+    image = Image.fromarray(np.ascontiguousarray(pixels), 'RGBA')
+
+    if max(image.size) > size:
+        image.thumbnail((size, size), Image.Resampling.BOX)
+
+    output = io.BytesIO()
+    if THUMBNAIL_FORMAT == "webp":
+        image.save(output, format="WEBP", lossless=True)
+    else:
+        image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def thumbnail_name(design: models.Design) -> str:
+    """
+    File name for a design's thumbnail: a hash of the stored grid data
+    and the thumbnail settings, so it only changes when they do
+    """
+    digest = hashlib.sha256(f"{THUMBNAIL_VERSION}:{THUMBNAIL_SIZE}:".encode("utf-8"))
+    if design.design_blob is not None:
+        digest.update(b"blob:")
+        digest.update(design.design_blob)
+    else:
+        digest.update(b"json:")
+        digest.update((design._design_data or "").encode("utf-8"))
+    return f"{digest.hexdigest()[:32]}.{THUMBNAIL_FORMAT}"
+
+
+def thumbnail_url(design: models.Design) -> str:
+    """
+    URL a design's thumbnail has (or will have once thumbnail_for renders
+    it); only hashes the data, nothing is rendered or written
+    """
+    return f"{THUMBNAIL_URL_PREFIX}/{thumbnail_name(design)}"
+
+
+def thumbnail_file(filename: str) -> Optional[str]:
+    """
+    Path of a stored thumbnail, or None if the name is invalid or missing
+    (only names made by thumbnail_name are accepted, so no path tricks)
+    """
+    if not _FILENAME_PATTERN.fullmatch(filename):
+        return None
+    path = os.path.join(THUMBNAIL_DIR, filename)
+    return path if os.path.isfile(path) else None
+
+
+def _write_file(path: str, data: bytes) -> None:
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    # Write to a temp file then rename, so readers never see half a file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def thumbnail_for(design: models.Design) -> Optional[str]:
+    """
+    URL of an up-to-date thumbnail for a design, rendering it if needed
+
+    Rendering is skipped when the file for the current design data
+    already exists. Failures are logged rather than raised: a missing
+    thumbnail shouldn't stop a design from saving.
+
+    Returns:
+        URL path like "/designs/thumbnails/3f2a...c1.png", or None if the
+        design grid isn't rectangular or the thumbnail couldn't be written
+
+    Usage:
+        design.thumbnail_path = thumbnail_for(design)
+    """
+    filename = thumbnail_name(design)
+    url = thumbnail_url(design)
+    path = os.path.join(THUMBNAIL_DIR, filename)
+
+    if os.path.isfile(path):
+        return url
+
+    try:
+        grid = design.get_grid()
+        if grid is None:
+            return None
+        indices, colors, _ = grid
+        _write_file(path, render_thumbnail(indices, colors))
+    except (OSError, ValueError):
+        logger.warning("Could not create thumbnail for design %s", design.id, exc_info=True)
+        return None
+
+    return url
+
+
+def _grid_size(design: models.Design):
+    try:
+        return design.grid_size() or (None, None)
+    except ValueError:
+        return None, None  # Unreadable blob
+
+
+def backfill_thumbnails(batch_size: int = BACKFILL_BATCH_SIZE, missing_only: bool = False) -> int:
+    """
+    Give every design an up-to-date thumbnail and grid size
+
+    Walks the designs table in id order, batch_size rows at a time.
+    thumbnail_path / grid_width / grid_height are set with a bulk UPDATE,
+    which doesn't bump the design's version, so clients editing a design
+    meanwhile don't get 409s.
+
+    Args:
+        missing_only: Only look at designs without a thumbnail or grid size
+            (quick enough to run on every startup)
+
+    Returns:
+        Number of designs that changed
+    """
+    db = SessionLocal()
+    changed = 0
+    last_id = 0
+    try:
+        while True:
+            query = db.query(models.Design)\
+                .filter(models.Design.id > last_id)
+            if missing_only:
+                query = query.filter(or_(
+                    models.Design.thumbnail_path.is_(None),
+                    models.Design.grid_width.is_(None)
+                ))
+            designs = query\
+                .order_by(models.Design.id)\
+                .limit(batch_size)\
+                .all()
+            if not designs:
+                break
+
+            for design in designs:
+                values = {}
+                url = thumbnail_for(design)
+                if url != design.thumbnail_path:
+                    values[models.Design.thumbnail_path] = url
+                height, width = _grid_size(design)
+                if (height, width) != (design.grid_height, design.grid_width):
+                    values[models.Design.grid_height] = height
+                    values[models.Design.grid_width] = width
+                if values:
+                    db.query(models.Design)\
+                        .filter(models.Design.id == design.id)\
+                        .update(values, synchronize_session=False)
+                    changed += 1
+
+            last_id = designs[-1].id
+            db.commit()
+            db.expunge_all()  # Don't keep every design's data in memory
+            logger.info("Thumbnails checked up to design %d (%d updated)", last_id, changed)
+    finally:
+        db.close()
+
+    return changed
+
+
+def remove_orphaned_thumbnails(grace_seconds: float = ORPHAN_GRACE_SECONDS) -> int:
+    """
+    Delete thumbnail files that no design's thumbnail_path points to
+
+    Files written in the last grace_seconds are kept, as are files whose
+    name isn't one thumbnail_name makes (except leftover temp files).
+
+    Returns:
+        Number of files removed
+    """
+    if not os.path.isdir(THUMBNAIL_DIR):
+        return 0
+
+    db = SessionLocal()
+    try:
+        in_use = {
+            url.rsplit("/", 1)[-1]
+            for (url,) in db.query(models.Design.thumbnail_path)
+                .filter(models.Design.thumbnail_path.isnot(None))
+                .distinct()
+        }
+    finally:
+        db.close()
+
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    for entry in os.scandir(THUMBNAIL_DIR):
+        ours = _FILENAME_PATTERN.fullmatch(entry.name) or entry.name.endswith(".tmp")
+        if not ours or entry.name in in_use or not entry.is_file():
+            continue
+        try:
+            if entry.stat().st_mtime > cutoff:
+                continue
+            os.remove(entry.path)
+            removed += 1
+        except OSError:
+            pass  # Removed meanwhile
+    return removed
+
+
+def start_backfill() -> Optional[threading.Thread]:
+    """
+    Fill in missing thumbnails and grid sizes in a background thread
+    (called when the API starts, unless THUMBNAIL_BACKFILL_ON_STARTUP=false),
+    so the gallery never has to fetch full grids to draw old designs
+    """
+    if not THUMBNAIL_BACKFILL_ON_STARTUP:
+        return None
+
+    def run():
+        try:
+            changed = backfill_thumbnails(missing_only=True)
+            if changed:
+                logger.info("Filled in thumbnails for %d designs", changed)
+        except Exception:
+            logger.exception("Thumbnail backfill failed")
+
+    thread = threading.Thread(target=run, name="thumbnail-backfill", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    # Backfill, then clean up: python -m thumbnails
+    logging.basicConfig(level=logging.INFO)
+    total = backfill_thumbnails()
+    logger.info("Done, %d thumbnails updated", total)
+    removed = remove_orphaned_thumbnails()
+    logger.info("Removed %d thumbnails no design uses", removed)
@@ -0,0 +1,148 @@
+"""
+Upload Ingestion
+Streams image uploads to a temporary file with a size cap and checks the
+image header before anything decodes it
+
+Instead of `await file.read()` (one bytes object holding the whole
+upload), uploads are copied to disk in small chunks. The copy stops as
+soon as MAX_FILE_SIZE is passed, and the SHA-256 used by the image cache
+is computed along the way. The image pipeline then opens the temp file by
+path, so the upload is never held in memory as a whole.
+
+Before any decoding, the file's header is read to check the format and
+pixel dimensions. A small file claiming to be 50000x50000 pixels (a
+"decompression bomb") is rejected without allocating that image.
+
+Configuration (environment variables):
+    UPLOAD_TMP_DIR     Where uploads are spooled (default: system temp dir)
+    MAX_IMAGE_PIXELS   Largest width*height accepted (default: 50 megapixels)
+"""
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, UnidentifiedImageError
+
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", str(50_000_000)))
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Formats Pillow reports for the extensions routers/images.py accepts
+ALLOWED_FORMATS = {'PNG', 'JPEG', 'GIF', 'BMP', 'WEBP'}
+
+# Make Pillow itself refuse anything past our limit as well
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+
+@dataclass
+class SpooledUpload:
+    """
+    An upload copied to a temporary file
+
+    Call cleanup() when done (or move the file somewhere else).
+    """
+    path: str
+    size: int
+    digest: str  # SHA-256 hex of the file contents
+    format: Optional[str] = None
+    width: int = 0
+    height: int = 0
+
+    def cleanup(self) -> None:
+        """Delete the temporary file"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+async def spool_upload(file: UploadFile, max_size: int = MAX_FILE_SIZE) -> SpooledUpload:
+    """
+    Copy an upload to a temporary file in chunks, stopping at max_size
+
+    Raises:
+        HTTPException: 413 if the upload is larger than max_size
+    """
+    hasher = hashlib.sha256()
+    size = 0
+
+    fd, path = tempfile.mkstemp(prefix="upload_", suffix=".img", dir=UPLOAD_TMP_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File too large. Maximum size: {max_size / 1024 / 1024} MB"
+                    )
+
+                hasher.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return SpooledUpload(path=path, size=size, digest=hasher.hexdigest())
+
+
+def sniff_image(upload: SpooledUpload, max_pixels: int = MAX_IMAGE_PIXELS) -> SpooledUpload:
+    """
+    Read the image header to check format and dimensions, without decoding
+
+    Fills in upload.format / width / height.
+
+    Raises:
+        HTTPException: 400 if the file isn't a supported image or has too many pixels
+    """
+    try:
+        with Image.open(upload.path) as image:
+            upload.format = image.format
+            upload.width, upload.height = image.size
+    except Image.DecompressionBombError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Image has too many pixels. Maximum: {max_pixels} pixels"
+        )
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is not a readable image"
+        )
+
+    if upload.format not in ALLOWED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Image format not allowed. Allowed formats: {', '.join(sorted(ALLOWED_FORMATS))}"
+        )
+
+    if upload.width * upload.height > max_pixels:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Image has too many pixels. Maximum: {max_pixels} pixels"
+        )
+
+    return upload
+
+
+async def ingest_image_upload(file: UploadFile) -> SpooledUpload:
+    """
+    Spool an upload to disk and check its header (see spool_upload / sniff_image)
+
+    The temp file is removed again if the checks fail.
+    """
+    upload = await spool_upload(file)
+    try:
+        return sniff_image(upload)
+    except BaseException:
+        upload.cleanup()
+        raise
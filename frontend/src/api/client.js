@@ -60,6 +60,20 @@ apiClient.interceptors.response.use(
   }
 )
 
+/**
+ * Error message for a failed image upload
+ * 413 means the file was over the backend's size limit. A proxy in front
+ * of the backend can also answer 413, and its reply has no JSON detail,
+ * so this case gets its own message.
+ */
+export function uploadErrorMessage(error, fallback) {
+  const detail = error.response?.data?.detail
+  if (error.response?.status === 413) {
+    return typeof detail === 'string' ? detail : 'File too large. Please choose a smaller image.'
+  }
+  return detail || fallback
+}
+
 // ============= Authentication API =============
 
 export const authAPI = {
@@ -90,6 +104,13 @@ export const authAPI = {
   updateProfile(data) {
     return apiClient.put('/auth/me', null, { params: data })
   },
+
+  /**
+   * Deactivate the current account (tokens stop working)
+   */
+  deactivate() {
+    return apiClient.delete('/auth/me')
+  },
 }
 
 // ============= Designs API =============
@@ -102,6 +123,16 @@ export const designsAPI = {
     return apiClient.get('/designs', { params: { skip, limit } })
   },
 
+  /**
+   * Get lightweight summaries (no design_data) for the gallery
+   * Pass the previous response's next_cursor to get the following page
+   */
+  getSummaries(cursor = null, limit = 100, includeTotal = false) {
+    const params = { limit, include_total: includeTotal }
+    if (cursor) params.cursor = cursor
+    return apiClient.get('/designs/summary', { params })
+  },
+
   /**
    * Get a specific design by ID
    */
@@ -123,12 +154,42 @@ export const designsAPI = {
     return apiClient.put(`/designs/${id}`, designData)
   },
 
+  /**
+   * Change individual stitches of a design
+   * edits: [{ x, y, color }], runs: [{ x, y, width, height, color }]
+   * Fails with 409 if the design changed since `version`
+   */
+  patchCells(id, version, edits = [], runs = []) {
+    return apiClient.patch(`/designs/${id}/cells`, { version, edits, runs })
+  },
+
   /**
    * Delete a design
    */
   delete(id) {
     return apiClient.delete(`/designs/${id}`)
   },
+
+  /**
+   * Create many designs in one request (results are per design)
+   */
+  bulkCreate(designs) {
+    return apiClient.post('/designs/bulk', { designs })
+  },
+
+  /**
+   * Change title/description of many designs: [{ id, title, description, version }]
+   */
+  bulkUpdate(designs) {
+    return apiClient.patch('/designs/bulk', { designs })
+  },
+
+  /**
+   * Delete many designs in one request
+   */
+  bulkDelete(ids) {
+    return apiClient.post('/designs/bulk/delete', { ids })
+  },
 }
 
 // ============= Image Processing API =============
@@ -143,6 +204,22 @@ export const imagesAPI = {
     formData.append('target_width', options.target_width)
     formData.append('target_height', options.target_height)
     formData.append('num_colors', options.num_colors || 16)
+    // Optional: 'dmc' quantizes straight to DMC thread colors
+    if (options.palette_mode) {
+      formData.append('palette_mode', options.palette_mode)
+    }
+    if (options.thread_codes) {
+      formData.append('thread_codes', options.thread_codes.join(','))
+    }
+    if (options.color_metric) {
+      formData.append('color_metric', options.color_metric)
+    }
+    if (options.quantizer) {
+      formData.append('quantizer', options.quantizer)
+    }
+    if (options.dither) {
+      formData.append('dither', options.dither)
+    }
 
     return apiClient.post('/images/upload', formData, {
       headers: {
@@ -151,6 +228,28 @@ export const imagesAPI = {
     })
   },
 
+  /**
+   * Convert one image into several patterns in one request
+   * variants: [{ target_width, target_height, num_colors, palette_mode, ... }]
+   */
+  uploadBatch(file, variants, options = {}) {
+    const formData = new FormData()
+    formData.append('file', file)
+    formData.append('variants', JSON.stringify(variants))
+    if (options.preview_cell_size) {
+      formData.append('preview_cell_size', options.preview_cell_size)
+    }
+    if (options.preview_grid_lines) {
+      formData.append('preview_grid_lines', options.preview_grid_lines)
+    }
+
+    return apiClient.post('/images/batch', formData, {
+      headers: {
+        'Content-Type': 'multipart/form-data',
+      },
+    })
+  },
+
   /**
    * Save a processed image as a design
    */
@@ -168,4 +267,22 @@ export const imagesAPI = {
   },
 }
 
+// ============= Threads API =============
+
+export const threadsAPI = {
+  /**
+   * Get the full DMC thread catalog
+   */
+  getAll() {
+    return apiClient.get('/threads/')
+  },
+
+  /**
+   * Map a palette and/or a whole grid to the closest DMC threads
+   */
+  map(palette = [], grid = null) {
+    return apiClient.post('/threads/map', { palette, grid })
+  },
+}
+
 export default apiClient